@@ -1,7 +1,10 @@
-import ast
+import re
 from typing import Optional
 
-from da.db import get_chinook_db
+from da.customer_index import get_customer_index
+
+# A phone number: optional '+', then digits with optional spaces, dashes, dots or parentheses
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{6,}\d")
 
 def get_customer_service_agent_prompt() -> str:
     """
@@ -32,18 +35,12 @@ def get_customer_id_from_identifier(identifier: str) -> Optional[int]:
         Optional[int]: The extracted customer ID or None if not found.
     """
     identifier = identifier.strip()
+    if not identifier:
+        return None
     if identifier.isdigit():
         return int(identifier)
-    elif identifier[0] == '+' and identifier[1:].isdigit():
-        query = f"SELECT CustomerId FROM Customer WHERE Phone = '{identifier}'"
-        result = get_chinook_db().run(query)
-        formatted_result = ast.literal_eval(result)
-        if formatted_result:
-            return formatted_result[0]['CustomerId']
     elif '@' in identifier:
-        query = f"SELECT CustomerId FROM Customer WHERE Email = '{identifier}'"
-        result = get_chinook_db().run(query)
-        formatted_result = ast.literal_eval(result)
-        if formatted_result:
-            return formatted_result[0]['CustomerId']
+        return get_customer_index().get_by_email(identifier)
+    elif PHONE_PATTERN.fullmatch(identifier):
+        return get_customer_index().get_by_phone(identifier)
     return None
\ No newline at end of file
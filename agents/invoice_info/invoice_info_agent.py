@@ -2,6 +2,11 @@ from agents.invoice_info.tools.invoice_tools import get_invoice_tools
 from da.state import State
 from da.memory import get_checkpointer, get_in_memory_store
 from langgraph.prebuilt import create_react_agent
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda
+from utils.context_window import get_context_window
+from utils.tool_node import create_tool_node
+from utils.metrics import instrument_graph
 from utils.agent_graph_display import show_graph
 import utils.llm as llm_utils
 import logging
@@ -19,9 +24,10 @@ def get_invoice_agent_prompt() -> str:
       """
       You are a subagent among a team of assistants. You are specialized for retrieving and processing invoice information. You are routed for invoice-related portion of the questions, so only respond to them.
 
-      You have access to three tools. These tools enable you to retrieve and process invoice information from the database. Here are the tools:
-      - get_invoices_by_customer_sorted_by_date: This tool retrieves all invoices for a customer, sorted by invoice date.
-      - get_invoices_sorted_by_unit_price: This tool retrieves all invoices for a customer, sorted by unit price.
+      You have access to four tools. These tools enable you to retrieve and process invoice information from the database. Here are the tools:
+      - get_invoice_summary: This tool retrieves a customer's invoice count, total spent, item count and most recent invoice. Prefer it for questions about totals or the latest purchase.
+      - get_invoices_by_customer_sorted_by_date: This tool retrieves the most recent invoices for a customer, sorted by invoice date.
+      - get_invoices_sorted_by_unit_price: This tool retrieves the most expensive items a customer bought, sorted by unit price.
       - get_employee_by_invoice_and_customer: This tool retrieves the employee information associated with an invoice and a customer.
       
       If you are unable to retrieve the invoice information, inform the customer you are unable to retrieve the information, and ask if they would like to search for something else.
@@ -35,6 +41,15 @@ def get_invoice_agent_prompt() -> str:
       """
     )
 
+def invoice_agent_messages(state: State) -> list:
+    """
+    Returns the invoice agent prompt: the system message and the history, trimmed to the context window.
+    """
+    return get_context_window().build(SystemMessage(content=get_invoice_agent_prompt()), state.get('messages', []))
+
+async def ainvoice_agent_messages(state: State) -> list:
+    return await get_context_window().abuild(SystemMessage(content=get_invoice_agent_prompt()), state.get('messages', []))
+
 def get_invoice_agent():
     """
     Invoice Agent function to handle invoice-related queries.
@@ -50,15 +65,15 @@ def get_invoice_agent():
     """
     invoice_information_subagent = create_react_agent(
         llm_utils.get_llm(),
-        tools=get_invoice_tools(),
-        prompt=get_invoice_agent_prompt(),
+        tools=create_tool_node(get_invoice_tools()),
+        prompt=RunnableLambda(invoice_agent_messages, afunc=ainvoice_agent_messages, name="invoice_agent_prompt"),
         name="invoice_info_agent",
         state_schema=State,
         checkpointer=get_checkpointer(),
         store=get_in_memory_store()
     )
     logging.info("Created invoice info agent with tools: %s", get_invoice_tools())
-    return invoice_information_subagent
+    return instrument_graph(invoice_information_subagent)
 
 def show_invoice_info_subagent_graph():
     """
@@ -1,17 +1,53 @@
+import os
 from langchain_core.tools import tool
-from da.db import get_chinook_db
+from da import queries
+from utils.executor import offload_tool
 import logging
 
+# Upper bound on the rows any invoice tool returns, so high-volume customers don't flood the context
+INVOICE_TOOL_MAX_ROWS = int(os.getenv("INVOICE_TOOL_MAX_ROWS", 10))
+
+@offload_tool
+@tool
+def get_invoice_summary(customer_id: str) -> list[dict]:
+    """
+    Returns a summary of a customer's purchases: number of invoices, total spent, number of items bought,
+    and the ID, date and total of the most recent invoice.
+    
+    Args:
+        customer_id (str): The ID of the customer whose invoice summary is to be retrieved.
+        
+    Returns:
+        list[dict]: The invoice summary for the customer.
+    """
+    try:
+        if not customer_id or not customer_id.strip():
+            return [{"error": "Customer ID cannot be empty"}]
+        
+        # Validate customer_id is numeric
+        try:
+            customer = int(customer_id)
+        except ValueError:
+            return [{"error": f"Invalid customer ID format: {customer_id}"}]
+
+        summary = queries.get_invoice_summary(customer)
+
+        return [summary._asdict()] if summary else [{"message": f"No invoices found for customer {customer_id}"}]
+    except Exception as e:
+        logging.error(f"Error in get_invoice_summary: {e}")
+        return [{"error": f"Error retrieving invoice summary for customer {customer_id}: {str(e)}"}]
+
+@offload_tool
 @tool
 def get_invoices_by_customer_sorted_by_date(customer_id: str) -> list[dict]:
     """
-    Returns a list of invoices for a specific customer, sorted by date in descending order.
+    Returns the most recent invoices for a specific customer, sorted by date in descending order.
     
     Args:
         customer_id (str): The ID of the customer whose invoices are to be retrieved.
         
     Returns:
-        list[dict]: A list of invoices for the customer sorted by date.
+        list[dict]: Up to INVOICE_TOOL_MAX_ROWS invoices for the customer sorted by date.
     """
     try:
         if not customer_id or not customer_id.strip():
@@ -19,35 +55,28 @@ def get_invoices_by_customer_sorted_by_date(customer_id: str) -> list[dict]:
         
         # Validate customer_id is numeric
         try:
-            int(customer_id)
+            customer = int(customer_id)
         except ValueError:
             return [{"error": f"Invalid customer ID format: {customer_id}"}]
 
-        result = get_chinook_db().run(
-            f"""
-            SELECT *
-            FROM Invoice
-            WHERE Invoice.CustomerId = '{customer_id}'
-            ORDER BY Invoice.InvoiceDate DESC;
-            """,
-            include_columns=True,
-        )
-        
-        return result if result else [{"message": f"No invoices found for customer {customer_id}"}]
+        result = queries.get_invoices_by_customer_sorted_by_date(customer, limit=INVOICE_TOOL_MAX_ROWS)
+
+        return queries.as_dicts(result) if result else [{"message": f"No invoices found for customer {customer_id}"}]
     except Exception as e:
         logging.error(f"Error in get_invoices_by_customer_sorted_by_date: {e}")
         return [{"error": f"Error retrieving invoices for customer {customer_id}: {str(e)}"}]
 
+@offload_tool
 @tool
 def get_invoices_sorted_by_unit_price(customer_id: str) -> list[dict]:
     """
-    Returns a list of invoices for a specific customer sorted by unit price in descending order.
+    Returns the most expensive items a specific customer bought, with their invoice, sorted by unit price in descending order.
     
     Args:
         customer_id (str): The ID of the customer whose invoices are to be retrieved.
         
     Returns:
-        list[dict]: A list of invoices sorted by unit price.
+        list[dict]: Up to INVOICE_TOOL_MAX_ROWS invoice line items sorted by unit price.
     """
     try:
         if not customer_id or not customer_id.strip():
@@ -55,26 +84,18 @@ def get_invoices_sorted_by_unit_price(customer_id: str) -> list[dict]:
         
         # Validate customer_id is numeric
         try:
-            int(customer_id)
+            customer = int(customer_id)
         except ValueError:
             return [{"error": f"Invalid customer ID format: {customer_id}"}]
 
-        result = get_chinook_db().run(
-            f"""
-            SELECT Invoice.*, InvoiceLine.UnitPrice
-            FROM Invoice
-            JOIN InvoiceLine ON Invoice.InvoiceId = InvoiceLine.InvoiceId
-            WHERE Invoice.CustomerId = '{customer_id}'
-            ORDER BY InvoiceLine.UnitPrice DESC;
-            """,
-            include_columns=True,
-        )
-        
-        return result if result else [{"message": f"No invoices found for customer {customer_id}"}]
+        result = queries.get_line_items_sorted_by_unit_price(customer, limit=INVOICE_TOOL_MAX_ROWS)
+
+        return queries.as_dicts(result) if result else [{"message": f"No invoices found for customer {customer_id}"}]
     except Exception as e:
         logging.error(f"Error in get_invoices_sorted_by_unit_price: {e}")
         return [{"error": f"Error retrieving invoices for customer {customer_id}: {str(e)}"}]
 
+@offload_tool
 @tool
 def get_employee_by_invoice_and_customer(invoice_id: str, customer_id: str) -> list[dict]:
     """
@@ -95,26 +116,16 @@ def get_employee_by_invoice_and_customer(invoice_id: str, customer_id: str) -> l
         
         # Validate IDs are numeric
         try:
-            int(invoice_id)
-            int(customer_id)
+            invoice = int(invoice_id)
+            customer = int(customer_id)
         except ValueError:
             return [{"error": f"Invalid ID format: invoice_id={invoice_id}, customer_id={customer_id}"}]
-        
-        query = f"""
-            SELECT Employee.FirstName, Employee.Title, Employee.Email
-            FROM Employee
-            JOIN Customer ON Customer.SupportRepId = Employee.EmployeeId
-            JOIN Invoice ON Invoice.CustomerId = Customer.CustomerId
-            WHERE Invoice.InvoiceId = '{invoice_id}' AND Invoice.CustomerId = '{customer_id}';
-            """
-        employee_info = get_chinook_db().run(
-            query,
-            include_columns=True
-        )
+
+        employee_info = queries.get_employee_by_invoice_and_customer(invoice, customer)
 
         if not employee_info:
             return [{"message": f"No employee found for invoice {invoice_id} and customer {customer_id}."}]
-        return employee_info if isinstance(employee_info, list) else [employee_info]
+        return queries.as_dicts(employee_info)
     except Exception as e:
         logging.error(f"Error in get_employee_by_invoice_and_customer: {e}")
         return [{"error": f"Error retrieving employee info: {str(e)}"}]
@@ -129,6 +140,7 @@ def get_invoice_tools():
         list: A list of tools for invoice management.
     """
     return [
+        get_invoice_summary,
         get_invoices_by_customer_sorted_by_date,
         get_invoices_sorted_by_unit_price,
         get_employee_by_invoice_and_customer
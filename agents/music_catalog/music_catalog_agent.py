@@ -1,10 +1,12 @@
 from agents.music_catalog.edge.music_assistant_tool import should_continue
-from agents.music_catalog.nodes.music_assistant import music_assistant
+from agents.music_catalog.nodes.music_assistant import music_assistant, amusic_assistant
 from agents.music_catalog.nodes.music_tool import get_music_tool_node
 from da.memory import get_checkpointer, get_in_memory_store
 from da.state import State
 from langgraph.graph import StateGraph, START, END
+from langchain_core.runnables import RunnableLambda
 from utils.agent_graph_display import show_graph
+from utils.metrics import instrument_graph
 
 
 def get_music_assistant_agent():
@@ -22,7 +24,8 @@ def get_music_assistant_agent():
     """
     music_workflow = StateGraph(State)
 
-    music_workflow.add_node('music_assistant', music_assistant)
+    # Sync and async variants, so both invoke and ainvoke run the node natively
+    music_workflow.add_node('music_assistant', RunnableLambda(music_assistant, afunc=amusic_assistant, name='music_assistant'))
     music_workflow.add_node('music_tool_node', get_music_tool_node())
 
     music_workflow.add_edge(START, 'music_assistant')
@@ -40,7 +43,7 @@ def get_music_assistant_agent():
 
     music_catalog_subagent = music_workflow.compile(name="music_catalog_subagent", checkpointer=get_checkpointer(), store=get_in_memory_store())
 
-    return music_catalog_subagent
+    return instrument_graph(music_catalog_subagent)
 
 
 def show_music_catalog_subagent_graph():
@@ -2,7 +2,8 @@ from da.state import State
 from langchain_core.messages import SystemMessage
 from langchain_core.runnables import RunnableConfig
 import utils.llm as llm_utils
-from da.memory_utils import save_user_preferences, extract_preferences_from_messages
+from utils.context_window import get_context_window
+from da.memory_utils import save_user_preferences, asave_user_preferences, extract_preferences_from_messages
 import logging
 
 
@@ -41,6 +42,9 @@ def generate_music_assistant_prompt(memory: str = "None") -> str:
        - Mention the album when relevant
        - Note if it's part of any playlists
        - Indicate if there are multiple versions
+    4. Tool results are paginated: each call returns one page of "results", a "total" count and a "next_cursor".
+       Summarize the first page and mention the total; only pass "next_cursor" back to the same tool when the
+       customer asks for more.
     
     Additional context is provided below: 
 
@@ -49,6 +53,35 @@ def generate_music_assistant_prompt(memory: str = "None") -> str:
     Message history is also attached.  
     """
 
+def _new_preferences(state: State):
+    """
+    Returns preferences mentioned in the messages that should be saved for the customer, if any.
+    """
+    customer_id = state.get('customer_id', "")
+    if not customer_id or customer_id == "":
+        return None
+    extracted_prefs = extract_preferences_from_messages(state.get('messages', []))
+    return extracted_prefs if extracted_prefs and extracted_prefs != "None" else None
+
+def _memory_with(state: State, preferences) -> str:
+    """
+    Returns the memory for the prompt, falling back to newly found preferences if none were loaded.
+    """
+    memory = state.get('loaded_memory', "None")
+    # Update memory if new preferences were found
+    if preferences and (memory == "None" or memory == ""):
+        memory = preferences
+    return memory
+
+def _music_assistant_messages(state: State, memory: str) -> list:
+    """
+    Returns the prompt: the system message and the history, trimmed to the context window.
+    """
+    return get_context_window().build(SystemMessage(content=generate_music_assistant_prompt(memory)), state.get('messages', []))
+
+async def _amusic_assistant_messages(state: State, memory: str) -> list:
+    return await get_context_window().abuild(SystemMessage(content=generate_music_assistant_prompt(memory)), state.get('messages', []))
+
 def music_assistant(state: State, config: RunnableConfig):
     """
     Music Assistant function to handle music-related queries.
@@ -63,26 +96,38 @@ def music_assistant(state: State, config: RunnableConfig):
     Returns:
         SystemMessage: A system message that provides context and instructions for the music assistant.
     """
-    memory = state.get('loaded_memory', "None")
-    customer_id = state.get('customer_id', "")
-
     # Extract and save preferences if detected in messages
-    if customer_id and customer_id != "":
-        extracted_prefs = extract_preferences_from_messages(state.get('messages', []))
-        if extracted_prefs and extracted_prefs != "None":
-            save_user_preferences(customer_id, extracted_prefs, config)
-            # Update memory if new preferences were found
-            if memory == "None" or memory == "":
-                memory = extracted_prefs
-
-    music_assistant_prompt = generate_music_assistant_prompt(memory)
+    preferences = _new_preferences(state)
+    if preferences:
+        save_user_preferences(state.get('customer_id'), preferences, config)
+
     llm_with_music_tools = llm_utils.get_llm_bind(llm_utils.get_llm())
 
-    response = llm_with_music_tools.invoke(
-        [SystemMessage(content=music_assistant_prompt)] + state.get('messages', []))
+    response = llm_with_music_tools.invoke(_music_assistant_messages(state, _memory_with(state, preferences)))
     
     logging.debug("Response from LLM: %s", response)
 
     return {'messages': [response]}
 
- 
\ No newline at end of file
+async def amusic_assistant(state: State, config: RunnableConfig):
+    """
+    Async variant of music_assistant, used when the graph runs with `ainvoke`.
+    
+    Args:
+        state (State): The current state of the conversation, including user preferences and message history.
+        config (RunnableConfig): Configuration for the runnable, including any necessary parameters.
+        
+    Returns:
+        dict: The LLM response to append to the messages.
+    """
+    preferences = _new_preferences(state)
+    if preferences:
+        await asave_user_preferences(state.get('customer_id'), preferences, config)
+
+    llm_with_music_tools = llm_utils.get_llm_bind(llm_utils.get_llm())
+
+    response = await llm_with_music_tools.ainvoke(await _amusic_assistant_messages(state, _memory_with(state, preferences)))
+
+    logging.debug("Response from LLM: %s", response)
+
+    return {'messages': [response]}
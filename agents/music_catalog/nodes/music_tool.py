@@ -1,15 +1,17 @@
 from langgraph.prebuilt import ToolNode
 from agents.music_catalog.tools import music_tools
+from utils.tool_node import create_tool_node
 
 def get_music_tool_node() -> ToolNode:
     """
     Returns a ToolNode instance for music-related operations.
     
     This function creates and returns a ToolNode instance that can be used to interact with music-related functionalities.
+    Tool calls from one LLM turn run concurrently, with per-tool timeouts (see utils.tool_node).
     
     Returns:
         ToolNode: An instance of ToolNode configured for music operations.
     """
-    tool_node = ToolNode(music_tools.get_music_tools())
+    tool_node = create_tool_node(music_tools.get_music_tools())
 
     return tool_node
\ No newline at end of file
@@ -1,169 +1,221 @@
+import os
+from typing import Any, Callable, Optional, Sequence, Union
 from langchain_core.tools import tool
-from da.db import get_chinook_db
-import ast
+from da.catalog_engine import get_catalog_backend, get_catalog_backend_name
+from da.db import on_chinook_db_reset
+from da.queries import get_search_mode
+from utils.cache import LRUCache, normalize_cache_key
+from utils.pagination import InvalidCursorError, get_page_size, paginate
+from utils.executor import offload_tool
 import logging
 
+# Tools return one page of results at a time so a prolific artist cannot flood the conversation.
+# Lookups fetch at most MUSIC_TOOL_MAX_ROWS rows, which are cached and paged through with cursors.
+DEFAULT_PAGE_SIZE = int(os.getenv("MUSIC_TOOL_PAGE_SIZE", 20))
+MAX_PAGE_SIZE = int(os.getenv("MUSIC_TOOL_MAX_PAGE_SIZE", 50))
+MAX_ROWS = int(os.getenv("MUSIC_TOOL_MAX_ROWS", 500))
+
+# Catalog lookups are pure functions of their normalized argument over a read-only catalog,
+# so results are cached until the catalog is rebuilt (or the optional TTL expires)
+catalog_cache = LRUCache(
+    maxsize=int(os.getenv("MUSIC_TOOL_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("MUSIC_TOOL_CACHE_TTL", 0))
+)
+on_chinook_db_reset(catalog_cache.clear)
+
+
+def cached_lookup(name: str, term: str, load: Callable[[], Any]) -> Any:
+    """
+    Returns the result of a catalog lookup, using the shared catalog cache.
+
+    The key includes the catalog backend and search mode, which select the rows a lookup
+    returns, so changing either at runtime never serves rows cached under the other.
+
+    Args:
+        name (str): The lookup name, part of the cache key.
+        term (str): The free-text argument, normalized for the cache key.
+        load (Callable): Runs the lookup on a cache miss.
+
+    Returns:
+        Any: The (possibly cached) lookup result.
+    """
+    key = (get_catalog_backend_name(), get_search_mode(), name, normalize_cache_key(term))
+    return catalog_cache.get_or_load(key, load)
+
+
+def paged_result(
+    name: str,
+    term: str,
+    rows: Sequence[Any],
+    page_size: Optional[int],
+    cursor: Optional[str],
+    to_dict: Callable[[Any], dict] = lambda row: row._asdict()
+) -> dict:
+    """
+    Returns one page of a cached lookup result.
+
+    Args:
+        name (str): The lookup name, part of the cursor scope.
+        term (str): The free-text argument, normalized for the cursor scope.
+        rows (Sequence): The full lookup result, capped at MAX_ROWS.
+        page_size (int): Requested rows per page, defaulting to MUSIC_TOOL_PAGE_SIZE.
+        cursor (str): The next_cursor of the previous page, if any.
+        to_dict (Callable): Converts a row to the dictionary returned to the LLM.
+
+    Returns:
+        dict: {"results": [...], "total": int, "next_cursor": str or None}. "total_capped"
+              is set when the lookup hit MAX_ROWS, so the total is a lower bound.
+
+    Raises:
+        InvalidCursorError: If the cursor was not issued for this lookup.
+    """
+    size = get_page_size(page_size, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    page = paginate(rows, f"{name}:{normalize_cache_key(term)}", size, cursor)
+    page["results"] = [to_dict(row) for row in page["results"]]
+    if len(rows) >= MAX_ROWS:
+        page["total_capped"] = True
+    return page
+
+
+def get_catalog_cache_stats() -> dict:
+    """
+    Returns the size and hit/miss counters of the catalog cache.
+
+    Returns:
+        dict: The cache statistics.
+    """
+    return catalog_cache.stats()
+
+
+@offload_tool
 @tool
-def get_albums_by_artist(artist: str) -> str:
+def get_albums_by_artist(artist: str, page_size: Optional[int] = None, cursor: Optional[str] = None) -> Union[dict, str]:
     """
-    Returns a list of albums by the specified artist.
+    Returns a page of albums by the specified artist.
     
     Args:
         artist (str): The name of the artist to search for.
+        page_size (int): Optional number of albums per page.
+        cursor (str): Optional next_cursor from a previous call, to fetch the following page.
         
     Returns:
-        list[dict]: A list of albums that match the specified artist.
+        dict: "results" (albums that match the specified artist), "total" and "next_cursor".
     """
     try:
         if not artist or not artist.strip():
             return "Error: Artist name cannot be empty."
         
-        # Execute the query to get albums by the artist from Album and Artist tables
-        # `db.run` is a utility from LangChain to execute SQL queries
-        # `include_columns=True` indicates that the result should include column names
+        # Query albums by the artist from Album and Artist tables
         # Note: Album table has Title column, not Name
-        result = get_chinook_db().run(
-            f"""
-            SELECT Album.Title, Artist.Name as ArtistName
-            FROM Album
-            JOIN Artist ON Album.ArtistId = Artist.ArtistId
-            WHERE Artist.Name like '%{artist}%'
-            """,
-            include_columns=True,
-        )
-        return result if result else f"No albums found for artist '{artist}'"
+        result = cached_lookup("albums_by_artist", artist, lambda: get_catalog_backend().get_albums_by_artist(artist, limit=MAX_ROWS))
+        if not result:
+            return f"No albums found for artist '{artist}'"
+        return paged_result("albums_by_artist", artist, result, page_size, cursor)
+    except InvalidCursorError as e:
+        return f"Error: {e}. Call the tool again without a cursor."
     except Exception as e:
         logging.error(f"Error in get_albums_by_artist: {e}")
         return f"Error retrieving albums for artist '{artist}': {str(e)}"
 
+@offload_tool
 @tool
-def get_tracks_by_artist(artist: str) -> str:
+def get_tracks_by_artist(artist: str, page_size: Optional[int] = None, cursor: Optional[str] = None) -> Union[dict, str]:
     """
-    Returns a list of tracks by the specified artist.
+    Returns a page of tracks by the specified artist.
     
     Args:
         artist (str): The name of the artist to search for.
+        page_size (int): Optional number of tracks per page.
+        cursor (str): Optional next_cursor from a previous call, to fetch the following page.
         
     Returns:
-        list[dict]: A list of tracks that match the specified artist.
+        dict: "results" (tracks that match the specified artist), "total" and "next_cursor".
     """
     try:
         if not artist or not artist.strip():
             return "Error: Artist name cannot be empty."
         
-        # Execute the query to get tracks by the artist from Track, Album, and Artist tables
-        result = get_chinook_db().run(
-            f"""
-            SELECT Track.Name as SongName, Artist.Name as ArtistName
-            FROM Album
-            LEFT JOIN Track ON Track.AlbumId = Album.AlbumId
-            LEFT JOIN Artist ON Album.ArtistId = Artist.ArtistId
-            WHERE Artist.Name like '%{artist}%'
-            """,
-            include_columns=True,
-        )
-        return result if result else f"No tracks found for artist '{artist}'"
+        # Query tracks by the artist from Track, Album, and Artist tables
+        result = cached_lookup("tracks_by_artist", artist, lambda: get_catalog_backend().get_tracks_by_artist(artist, limit=MAX_ROWS))
+        if not result:
+            return f"No tracks found for artist '{artist}'"
+        return paged_result("tracks_by_artist", artist, result, page_size, cursor)
+    except InvalidCursorError as e:
+        return f"Error: {e}. Call the tool again without a cursor."
     except Exception as e:
         logging.error(f"Error in get_tracks_by_artist: {e}")
         return f"Error retrieving tracks for artist '{artist}': {str(e)}"
 
+@offload_tool
 @tool
-def get_songs_by_genre(genre: str) -> list:
+def get_songs_by_genre(genre: str, page_size: Optional[int] = None, cursor: Optional[str] = None) -> Union[dict, list]:
     """
-    Returns a list of songs by the specified genre.
+    Returns a page of songs by the specified genre.
     
     Args:
         genre (str): The name of the genre to search for.
+        page_size (int): Optional number of songs per page.
+        cursor (str): Optional next_cursor from a previous call, to fetch the following page.
         
     Returns:
-        list[dict]: A list of songs that match the specified genre.
+        dict: "results" (songs that match the specified genre), "total" and "next_cursor".
     """
     try:
         if not genre or not genre.strip():
             return ["Error: Genre name cannot be empty."]
         
-        # Execute the query to get songs by the genre from Track and Genre tables
-        db = get_chinook_db()
-        # First, get the GenreId for the specified genre
-        genre_id_query = f"Select GenreId from Genre where Name like '%{genre}%'"
-        genre_id_result = db.run(genre_id_query, include_columns=True)
-
-        # If no genre is found, return an empty list
-        if not genre_id_result or not genre_id_result[0]:
+        # Sample songs from the genre index built with the catalog
+        songs = cached_lookup("songs_by_genre", genre, lambda: get_catalog_backend().get_songs_by_genre(genre))
+
+        # If nothing matched, tell apart an unknown genre from an empty one
+        if not songs and not cached_lookup("genres_by_name", genre, lambda: get_catalog_backend().get_genres_by_name(genre)):
             return [f"No genre found for '{genre}'"]
-        
-        # Safely evaluate the result to get the genre_ids
-        genre_ids = ast.literal_eval(genre_id_result)
-
-        # Extract the GenreId from the result - validate it's numeric
-        try:
-            genre_id_list = ", ".join([str(int(genre_id['GenreId'])) for genre_id in genre_ids])
-        except (ValueError, KeyError) as e:
-            logging.error(f"Error parsing genre IDs: {e}")
-            return [f"Error processing genre '{genre}': Invalid genre ID format"]
-
-        # Now, query the Track table for songs with the specified GenreId
-        songs = db.run(
-            f"""
-            SELECT Track.Name as SongName, Artist.Name as ArtistName
-            FROM Track
-            LEFT JOIN Album ON Track.AlbumId = Album.AlbumId
-            LEFT JOIN Artist ON Album.ArtistId = Artist.ArtistId
-            WHERE Track.GenreId IN ({genre_id_list})
-            GROUP BY Artist.Name
-            LIMIT 10;
-            """,
-            include_columns=True,
-        )
 
         # If no songs are found, return a message
         if not songs:
             return [f"No songs found for genre '{genre}'"]
-        
-        formatted_songs = ast.literal_eval(songs)
-        logging.debug(f"Found {len(formatted_songs)} songs for genre '{genre}'")
-        return [
-            {
-                "Song": str(song["SongName"]),
-                "Artist": str(song["ArtistName"])
-            } for song in formatted_songs
-        ]
+
+        logging.debug(f"Found {len(songs)} songs for genre '{genre}'")
+        return paged_result(
+            "songs_by_genre", genre, songs, page_size, cursor,
+            to_dict=lambda song: {
+                "Song": str(song.SongName),
+                "Artist": str(song.ArtistName)
+            }
+        )
+    except InvalidCursorError as e:
+        return [f"Error: {e}. Call the tool again without a cursor."]
     except Exception as e:
         logging.error(f"Error in get_songs_by_genre: {e}")
         return [f"Error retrieving songs for genre '{genre}': {str(e)}"]
 
+@offload_tool
 @tool
-def check_for_songs(song_title: str) -> str:
+def check_for_songs(song_title: str, page_size: Optional[int] = None, cursor: Optional[str] = None) -> Union[dict, str]:
     """
     Checks if songs with the specified title exist in the catalog.
     
     Args:
         song_title (str): The title of the song to check.
+        page_size (int): Optional number of songs per page.
+        cursor (str): Optional next_cursor from a previous call, to fetch the following page.
         
     Returns:
-        str: A message indicating whether the song exists or not.
+        dict: "results" (matching songs), "total" and "next_cursor", or a message if none exist.
     """
     try:
         if not song_title or not song_title.strip():
             return "Error: Song title cannot be empty."
         
-        # Execute the query to check if the song exists in the Track table
-        result = get_chinook_db().run(
-            f"""
-            SELECT Track.Name, Album.Title, Artist.Name as ArtistName
-            FROM Track
-            LEFT JOIN Album ON Track.AlbumId = Album.AlbumId
-            LEFT JOIN Artist ON Album.ArtistId = Artist.ArtistId
-            WHERE Track.Name like '%{song_title}%'
-            LIMIT 20
-            """,
-            include_columns=True,
-        )
-        
+        # Query the Track table for songs matching the title
+        result = cached_lookup("songs_by_title", song_title, lambda: get_catalog_backend().get_songs_by_title(song_title, limit=MAX_ROWS))
+
         if not result:
             return f"No songs found with title '{song_title}'"
-        
-        return result
+
+        return paged_result("songs_by_title", song_title, result, page_size, cursor)
+    except InvalidCursorError as e:
+        return f"Error: {e}. Call the tool again without a cursor."
     except Exception as e:
         logging.error(f"Error in check_for_songs: {e}")
         return f"Error checking for songs with title '{song_title}': {str(e)}"
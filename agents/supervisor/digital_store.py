@@ -3,6 +3,7 @@ from agents.music_catalog.music_catalog_agent import get_music_assistant_agent
 from da.memory import get_checkpointer, get_in_memory_store
 from agents.supervisor.supervisor_utils import create_supervisor
 from utils.agent_graph_display import show_graph
+from utils.metrics import instrument_graph
 import utils.llm as llm_utils
 from da.state import State
 
@@ -61,7 +62,7 @@ def get_digital_store_agent():
         checkpointer=get_checkpointer(),
         store=get_in_memory_store()
     )
-    return supervisor_agent
+    return instrument_graph(supervisor_agent)
 
 def show_digital_store_graph():
     """
@@ -0,0 +1,189 @@
+"""
+Deterministic fast path for high-frequency questions.
+
+Questions such as "My customer ID is 1. What was my most recent purchase?" or "What albums do you
+have by U2?" are recognized by templates, answered by calling the tool directly and rendered with a
+fixed response template, skipping the supervisor and both LLM calls of the sub-agent. Anything the
+templates don't match exactly, or whose tool result is ambiguous (e.g. an artist name matching
+several artists), falls through to the full graph.
+
+FAST_PATH_INTENTS selects the enabled intents as a comma-separated list (default: all of them;
+"none" disables the fast path).
+"""
+import os
+import re
+import logging
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+from langchain_core.messages import HumanMessage
+from agents.invoice_info.tools.invoice_tools import get_invoice_summary
+from agents.music_catalog.tools.music_tools import MAX_PAGE_SIZE, get_albums_by_artist
+from agents.supervisor.intent_classifier import (
+    IDENTIFIER_PATTERN,
+    INTENT_INVOICE,
+    INTENT_MUSIC,
+    log_routing_decision,
+    split_sentences,
+)
+from agents.supervisor.nodes.initialize_state import extract_customer_id_from_messages
+
+INTENT_LATEST_PURCHASE = "latest_purchase"
+INTENT_ARTIST_ALBUMS = "artist_albums"
+FAST_PATH_INTENTS = (INTENT_LATEST_PURCHASE, INTENT_ARTIST_ALBUMS)
+# Routing label logged for each fast-path intent, as used by the routing classifier
+ROUTING_INTENTS = {INTENT_LATEST_PURCHASE: INTENT_INVOICE, INTENT_ARTIST_ALBUMS: INTENT_MUSIC}
+
+# Album titles listed in a fast-path answer
+MAX_LISTED_ALBUMS = 10
+
+LATEST_PURCHASE_PATTERN = re.compile(
+    r"^(?:how\s+much\s+was|what\s+was|when\s+was|what\s+is|what's)\s+my\s+(?:most\s+recent|last|latest)\s+"
+    r"(?:purchase|invoice|order)\s*[?.!]*$",
+    re.IGNORECASE
+)
+ARTIST_ALBUMS_PATTERN = re.compile(
+    r"^(?:(?:what|which)\s+albums\s+(?:do\s+you\s+have|are\s+there|have\s+you\s+got)|"
+    r"(?:show|list|give)\s+(?:me\s+)?(?:the\s+|all\s+)?albums|albums)\s+"
+    r"(?:by|from)\s+(?P<artist>[^?.!]+?)\s*[?.!]*$",
+    re.IGNORECASE
+)
+
+
+def get_fast_path_intents() -> FrozenSet[str]:
+    """
+    Returns the intents enabled for the fast path (FAST_PATH_INTENTS, default all; "none" disables it).
+    """
+    setting = os.getenv("FAST_PATH_INTENTS", ",".join(FAST_PATH_INTENTS)).strip().lower()
+    if setting in ("", "none", "off"):
+        return frozenset()
+    intents = {intent.strip() for intent in setting.split(",") if intent.strip()}
+    unknown = intents.difference(FAST_PATH_INTENTS)
+    if unknown:
+        logging.warning(f"Ignoring unknown fast path intents: {sorted(unknown)}")
+    return frozenset(intents.intersection(FAST_PATH_INTENTS))
+
+
+def fold_artist(name: str) -> str:
+    """Folds an artist name for comparison, so "the rolling stones" matches "The Rolling Stones"."""
+    name = " ".join(name.casefold().split())
+    return name[4:] if name.startswith("the ") else name
+
+
+def render_latest_purchase(args: Dict[str, Any], result: Any) -> Optional[str]:
+    """
+    Renders the get_invoice_summary result, or returns None if there is no latest invoice.
+    """
+    summary = result[0] if isinstance(result, list) and result else {}
+    if not isinstance(summary, dict) or summary.get("LatestInvoiceId") is None:
+        return None
+    date = str(summary["LatestInvoiceDate"]).split(" ")[0]
+    return (
+        f"Your most recent purchase was invoice {summary['LatestInvoiceId']} on {date}, "
+        f"for a total of ${summary['LatestInvoiceTotal']:.2f}. "
+        f"In all you have made {summary['InvoiceCount']} purchases with us, totalling ${summary['TotalSpent']:.2f}."
+    )
+
+
+def render_artist_albums(args: Dict[str, Any], result: Any) -> Optional[str]:
+    """
+    Renders the get_albums_by_artist result, or returns None unless every album is by the one artist asked for.
+    """
+    if not isinstance(result, dict) or result.get("next_cursor") or not result.get("results"):
+        return None
+    names = {album["ArtistName"] for album in result["results"]}
+    if len(names) != 1 or fold_artist(next(iter(names))) != fold_artist(args["artist"]):
+        return None
+
+    artist = names.pop()
+    titles = [album["Title"] for album in result["results"]]
+    listed = ", ".join(titles[:MAX_LISTED_ALBUMS])
+    more = f", and {len(titles) - MAX_LISTED_ALBUMS} more" if len(titles) > MAX_LISTED_ALBUMS else ""
+    noun = "album" if len(titles) == 1 else "albums"
+    return f"We have {len(titles)} {noun} by {artist}: {listed}{more}."
+
+
+# intent -> (tool, renderer)
+FAST_PATH_TOOLS: Dict[str, Tuple[Any, Callable[[Dict[str, Any], Any], Optional[str]]]] = {
+    INTENT_LATEST_PURCHASE: (get_invoice_summary, render_latest_purchase),
+    INTENT_ARTIST_ALBUMS: (get_albums_by_artist, render_artist_albums),
+}
+
+
+def match_fast_path(state: Dict[str, Any], intents: FrozenSet[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Matches the last message against the fast-path templates.
+
+    The message may only contain the question and sentences identifying the customer.
+
+    Args:
+        state (dict): The graph state.
+        intents (FrozenSet[str]): The enabled intents.
+
+    Returns:
+        tuple: (intent, tool arguments), or None if the message needs the full graph.
+    """
+    messages = state.get('messages', [])
+    last_message = messages[-1] if messages else None
+    if not isinstance(last_message, HumanMessage) or not isinstance(last_message.content, str):
+        return None
+    sentences = [sentence for sentence in split_sentences(last_message.content) if not IDENTIFIER_PATTERN.search(sentence)]
+    if len(sentences) != 1:
+        return None
+    question = sentences[0]
+
+    if INTENT_ARTIST_ALBUMS in intents:
+        match = ARTIST_ALBUMS_PATTERN.match(question)
+        if match:
+            return INTENT_ARTIST_ALBUMS, {"artist": match.group("artist").strip(), "page_size": MAX_PAGE_SIZE}
+
+    if INTENT_LATEST_PURCHASE in intents and LATEST_PURCHASE_PATTERN.match(question):
+        customer_id = state.get('customer_id') or extract_customer_id_from_messages([last_message])[0]
+        if customer_id:
+            return INTENT_LATEST_PURCHASE, {"customer_id": str(customer_id)}
+    return None
+
+
+def fast_path_answer(state: Dict[str, Any], intents: FrozenSet[str]) -> Optional[str]:
+    """
+    Answers the last message from a template, or returns None to fall through to the full graph.
+
+    Args:
+        state (dict): The graph state.
+        intents (FrozenSet[str]): The enabled intents.
+
+    Returns:
+        str: The templated answer, or None.
+    """
+    matched = match_fast_path(state, intents)
+    if matched is None:
+        return None
+    intent, args = matched
+    tool, render = FAST_PATH_TOOLS[intent]
+    try:
+        return _rendered(state, intent, args, render(args, tool.invoke(args)))
+    except Exception as e:
+        logging.error(f"Error in fast path {intent}: {e}")
+        return None
+
+
+async def afast_path_answer(state: Dict[str, Any], intents: FrozenSet[str]) -> Optional[str]:
+    """
+    Async variant of fast_path_answer, running the tool on the blocking executor.
+    """
+    matched = match_fast_path(state, intents)
+    if matched is None:
+        return None
+    intent, args = matched
+    tool, render = FAST_PATH_TOOLS[intent]
+    try:
+        return _rendered(state, intent, args, render(args, await tool.ainvoke(args)))
+    except Exception as e:
+        logging.error(f"Error in fast path {intent}: {e}")
+        return None
+
+
+def _rendered(state: Dict[str, Any], intent: str, args: Dict[str, Any], answer: Optional[str]) -> Optional[str]:
+    if answer is None:
+        logging.debug(f"Fast path {intent} result for {args} is ambiguous, using the full graph")
+        return None
+    log_routing_decision(state['messages'][-1].content, ROUTING_INTENTS[intent], None, "fast_path")
+    return answer
@@ -0,0 +1,169 @@
+"""
+Local intent classifier for supervisor routing.
+
+A TF-IDF + logistic regression model trained from a labelled utterance file routes messages to
+a sub-agent in well under a millisecond, so the supervisor only calls the LLM when the model is
+unsure. Routing decisions can be appended to a JSONL log to grow the training file.
+"""
+import os
+import re
+import csv
+import json
+import math
+import time
+import logging
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+DEFAULT_UTTERANCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_utterances.csv")
+DEFAULT_CONFIDENCE_THRESHOLD = 0.7
+
+INTENT_MUSIC = "music"
+INTENT_INVOICE = "invoice"
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.?!])\s+")
+# Sentences that identify the customer are context for every intent, not an intent of their own
+IDENTIFIER_PATTERN = re.compile(r"\b(?:customer\s*(?:id|#|number)|e-?mail|phone)\b|@", re.IGNORECASE)
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits a message into sentences at ., ? and ! boundaries.
+    """
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence.strip()]
+
+
+def load_routing_utterances(path: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """
+    Loads the labelled routing utterances.
+
+    Args:
+        path (str): A CSV file with `label,utterance` columns. Defaults to ROUTING_UTTERANCES_PATH
+                    or the file bundled with the supervisor.
+
+    Returns:
+        tuple: (utterances, labels).
+    """
+    path = path or os.getenv("ROUTING_UTTERANCES_PATH", DEFAULT_UTTERANCES_PATH)
+    utterances, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("utterance") and row.get("label"):
+                utterances.append(row["utterance"].strip())
+                labels.append(row["label"].strip())
+    return utterances, labels
+
+
+class IntentClassifier:
+    """
+    TF-IDF + logistic regression classifier returning an intent and its probability.
+    """
+
+    def __init__(self, utterances: List[str], labels: List[str]):
+        """
+        Trains the classifier.
+
+        Args:
+            utterances (List[str]): Example messages.
+            labels (List[str]): The intent of each message.
+        """
+        # Character n-grams within words, so misspellings and unseen inflections still match
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 5), sublinear_tf=True, lowercase=True)
+        model = LogisticRegression(C=10.0, max_iter=1000)
+        model.fit(vectorizer.fit_transform(utterances), labels)
+        self.labels = [str(label) for label in model.classes_]
+
+        # Scoring a single message through sklearn costs ~1ms of call overhead, so keep each n-gram's
+        # idf and per-class weights in a dict and score with plain arithmetic instead
+        self._analyze = vectorizer.build_analyzer()
+        coef = model.coef_
+        self._features = {
+            term: (vectorizer.idf_[index], coef[:, index].tolist())
+            for term, index in vectorizer.vocabulary_.items()
+        }
+        self._intercept = model.intercept_.tolist()
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Classifies a message.
+
+        Args:
+            text (str): The message to route.
+
+        Returns:
+            tuple: (intent, confidence), the most likely intent and its probability.
+        """
+        counts = Counter(term for term in self._analyze(text) if term in self._features)
+        # Sublinear tf-idf, L2-normalized as in TfidfVectorizer
+        weights = {term: (1 + math.log(count)) * self._features[term][0] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        scores = list(self._intercept)
+        for term, weight in weights.items():
+            for k, coefficient in enumerate(self._features[term][1]):
+                scores[k] += weight / norm * coefficient
+
+        if len(scores) == 1:
+            # Binary logistic regression scores the second class
+            positive = 1 / (1 + math.exp(-scores[0]))
+            probabilities = [1 - positive, positive]
+        else:
+            top = max(scores)
+            exps = [math.exp(score - top) for score in scores]
+            probabilities = [value / sum(exps) for value in exps]
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+        return self.labels[best], probabilities[best]
+
+
+_intent_classifier: Optional[IntentClassifier] = None
+_intent_classifier_lock = threading.Lock()
+_routing_log_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Returns the shared intent classifier, training it from the utterance file on first use.
+
+    Returns:
+        IntentClassifier: The process-wide classifier.
+    """
+    global _intent_classifier
+    if _intent_classifier is None:
+        with _intent_classifier_lock:
+            if _intent_classifier is None:
+                utterances, labels = load_routing_utterances()
+                _intent_classifier = IntentClassifier(utterances, labels)
+                logging.info(f"Trained routing classifier on {len(utterances)} utterances")
+    return _intent_classifier
+
+
+def get_routing_confidence_threshold() -> float:
+    """
+    Returns the minimum classifier confidence for routing without the LLM (ROUTING_CONFIDENCE_THRESHOLD, default 0.7).
+    """
+    return float(os.getenv("ROUTING_CONFIDENCE_THRESHOLD", DEFAULT_CONFIDENCE_THRESHOLD))
+
+
+def log_routing_decision(message: str, intent: str, confidence: Optional[float], source: str) -> None:
+    """
+    Logs a routing decision and, if ROUTING_LOG_PATH is set, appends it to that JSONL file for retraining.
+
+    Args:
+        message (str): The routed message.
+        intent (str): The chosen intent.
+        confidence (float): The classifier confidence, if the classifier ran.
+        source (str): What decided the route: "keyword", "classifier", "llm", "split" (one part of a
+                      multi-intent message) or "fast_path".
+    """
+    logging.info(f"Routing decision: {intent} via {source} (confidence={confidence})")
+    path = os.getenv("ROUTING_LOG_PATH")
+    if not path:
+        return
+    record = {"time": time.time(), "utterance": message, "label": intent, "confidence": confidence, "source": source}
+    try:
+        with _routing_log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logging.error(f"Error writing routing log: {e}")
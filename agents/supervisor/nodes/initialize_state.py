@@ -4,7 +4,8 @@ Node to initialize state and extract customer ID from messages.
 from da.state import State
 from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import HumanMessage
-from agents.customer_service.customer_service_agent import get_customer_id_from_identifier
+from agents.customer_service.customer_service_agent import get_customer_id_from_identifier, PHONE_PATTERN
+from da.customer_index import get_customer_index
 from da.memory_utils import load_user_preferences
 from typing import Tuple
 import re
@@ -50,7 +51,7 @@ def extract_customer_id_from_messages(messages: list) -> Tuple[str, str]:
             
             # Try to find email or phone number
             email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', message.content)
-            phone_match = re.search(r'\+?\d{10,15}', message.content)
+            phone_match = PHONE_PATTERN.search(message.content)
             
             if email_match:
                 email = email_match.group(0)
@@ -61,7 +62,8 @@ def extract_customer_id_from_messages(messages: list) -> Tuple[str, str]:
             
             if phone_match:
                 phone = phone_match.group(0)
-                customer_id = get_customer_id_from_identifier(phone)
+                # Look the number up directly: digits-only numbers would otherwise be read as a customer ID
+                customer_id = get_customer_index().get_by_phone(phone)
                 if customer_id:
                     logging.info(f"Found customer ID via phone: {customer_id}")
                     return str(customer_id), phone
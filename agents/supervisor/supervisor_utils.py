@@ -2,32 +2,96 @@
 Supervisor utilities for creating multi-agent systems with LangGraph.
 
 This module provides utilities to create a supervisor pattern that routes
-queries to different sub-agents based on the query content.
+queries to different sub-agents based on the query content. Messages that ask about both
+music and invoices are split by intent and answered by both sub-agents concurrently.
 """
-from typing import Dict, Any, List
-from langchain_core.messages import SystemMessage, HumanMessage
+import os
+import uuid
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, START, END
 from da.state import State
+from agents.supervisor.fast_path import afast_path_answer, fast_path_answer, get_fast_path_intents
+from agents.supervisor.intent_classifier import (
+    IDENTIFIER_PATTERN,
+    INTENT_INVOICE,
+    INTENT_MUSIC,
+    IntentClassifier,
+    get_intent_classifier,
+    get_routing_confidence_threshold,
+    log_routing_decision,
+    split_sentences,
+)
 import utils.llm as llm_utils
 import logging
 
+# Node that runs several sub-agents concurrently for a multi-intent message
+FAN_OUT_NODE = "fan_out"
+# Node that answers high-frequency questions from templates ahead of the supervisor
+FAST_PATH_NODE = "fast_path"
+
+def split_by_intent(text: str, classify: Callable[[str], Optional[str]]) -> Dict[str, str]:
+    """
+    Splits a message that asks about several intents into one question per intent.
+
+    Each sentence is classified on its own. Sentences without a confident intent, and sentences
+    that identify the customer, are shared context and kept in every part.
+
+    Args:
+        text (str): The user message.
+        classify (Callable): Returns a sentence's intent, or None when unsure.
+
+    Returns:
+        dict: intent -> the sentences for that intent, in the original order and in order of first
+              mention. Empty unless at least two intents were found.
+    """
+    labelled = []
+    for sentence in split_sentences(text):
+        intent = None if IDENTIFIER_PATTERN.search(sentence) else classify(sentence)
+        labelled.append((sentence, intent))
+
+    intents = list(dict.fromkeys(intent for _, intent in labelled if intent is not None))
+    if len(intents) < 2:
+        return {}
+    return {
+        intent: " ".join(sentence for sentence, label in labelled if label in (intent, None))
+        for intent in intents
+    }
+
 
 def create_supervisor(
     agents: List[Any],
     model=None,
     prompt: str = "",
     state_schema: type = State,
-    output_mode: str = "last_message"
+    output_mode: str = "last_message",
+    intent_classifier: Optional[IntentClassifier] = None,
+    fast_path_intents: Optional[Iterable[str]] = None
 ):
     """
     Create a supervisor agent that routes queries to sub-agents.
     
+    Questions matching a fast-path template are answered directly by the fast_path node, without
+    the supervisor or an LLM call.
+    
+    Messages are routed by keywords first, then by the intent classifier, and only go to the
+    LLM when the classifier's confidence is below ROUTING_CONFIDENCE_THRESHOLD. A message whose
+    sentences have different intents goes to the fan_out node, which runs the sub-agents for
+    each part concurrently and merges their answers into one response.
+    
     Args:
         agents: List of agent runnables (sub-agents)
         model: LLM model to use for routing decisions
         prompt: System prompt for the supervisor
         state_schema: State schema type
         output_mode: How to output results ("last_message" or "all_messages")
+        intent_classifier: Routing classifier. Defaults to the shared one unless ROUTING_CLASSIFIER=off.
+        fast_path_intents: Intents answered by the fast path. Defaults to FAST_PATH_INTENTS; empty disables it.
         
     Returns:
         StateGraph: The compiled supervisor graph
@@ -35,6 +99,12 @@ def create_supervisor(
     if model is None:
         model = llm_utils.get_llm()
     
+    # Load the classifier now so the first message doesn't pay for training
+    if intent_classifier is None and os.getenv("ROUTING_CLASSIFIER", "on").strip().lower() != "off":
+        intent_classifier = get_intent_classifier()
+    confidence_threshold = get_routing_confidence_threshold()
+    fast_path_intents = frozenset(get_fast_path_intents() if fast_path_intents is None else fast_path_intents)
+    
     # Create meaningful agent names
     agent_names = ["music_catalog_subagent", "invoice_info_subagent"]
     
@@ -44,69 +114,231 @@ def create_supervisor(
     
     # Create a mapping of agent names to agents
     agent_map = {name: agent for name, agent in zip(agent_names, agents)}
+    intent_agents = {INTENT_MUSIC: agent_names[0], INTENT_INVOICE: agent_names[-1]}
     
-    def supervisor_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    def classify(text: str) -> Tuple[Optional[str], Optional[float], Optional[str]]:
         """
-        Supervisor node that decides which agent to call.
+        Classifies text without the LLM.
+
+        Returns:
+            tuple: (intent, confidence, source). source is "keyword" or "classifier", or None
+                   when neither is sure and intent is only the classifier's best guess.
         """
-        messages = state.get('messages', [])
-        if not messages:
-            return {}
-        
-        # Get the last user message
-        last_message = messages[-1] if messages else None
-        if not last_message or not hasattr(last_message, 'content'):
-            return {'next_agent': agent_names[0]}
-        
-        message_content = last_message.content.lower()
+        message_content = text.lower()
         
         # Simple keyword-based routing (can be enhanced with LLM)
         # Check for invoice-related keywords
         invoice_keywords = ['invoice', 'purchase', 'bill', 'payment', 'order', 'transaction', 'paid']
         if any(keyword in message_content for keyword in invoice_keywords):
-            logging.info("Supervisor routing to invoice_info_subagent")
-            return {'next_agent': agent_names[1]}
+            return INTENT_INVOICE, None, "keyword"
         
         # Check for music-related keywords
         music_keywords = ['album', 'song', 'artist', 'track', 'music', 'genre', 'playlist']
         if any(keyword in message_content for keyword in music_keywords):
-            logging.info("Supervisor routing to music_catalog_subagent")
+            return INTENT_MUSIC, None, "keyword"
+        
+        # No keyword matched: use the local classifier when it is confident enough
+        if intent_classifier is not None:
+            intent, confidence = intent_classifier.predict(text)
+            if confidence >= confidence_threshold and intent in intent_agents:
+                return intent, confidence, "classifier"
+            return intent, confidence, None
+        return None, None, None
+    
+    def confident_intent(text: str) -> Optional[str]:
+        intent, _, source = classify(text)
+        return intent if source is not None else None
+    
+    def route_without_llm(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Routes on the last message alone; returns None when the LLM has to decide.
+        """
+        messages = state.get('messages', [])
+        if not messages:
+            return {}
+        
+        # Get the last user message
+        last_message = messages[-1] if messages else None
+        if not last_message or not hasattr(last_message, 'content'):
             return {'next_agent': agent_names[0]}
         
-        # If both keywords are present or unclear, use LLM to decide
-        try:
-            routing_prompt = f"""{prompt}
+        # Questions for more than one sub-agent are answered by all of them at once
+        if len(set(intent_agents.values())) > 1:
+            intent_parts = split_by_intent(last_message.content, confident_intent)
+            if intent_parts:
+                for intent, part in intent_parts.items():
+                    log_routing_decision(part, intent, None, "split")
+                return {'next_agent': FAN_OUT_NODE, 'intent_parts': intent_parts}
+        
+        intent, confidence, source = classify(last_message.content)
+        if source is not None:
+            log_routing_decision(last_message.content, intent, confidence, source)
+            return {'next_agent': intent_agents[intent]}
+        if confidence is not None:
+            logging.debug(f"Routing classifier unsure ({intent}, {confidence:.2f}), asking the LLM")
+        return None
+    
+    # The routing answer ("1" or "2") is not part of the reply, so it is not streamed to the user
+    routing_config: RunnableConfig = {'tags': [TAG_NOSTREAM]}
+    
+    def routing_messages(state: Dict[str, Any]) -> list:
+        """
+        Builds the LLM routing prompt for the last message.
+        """
+        routing_prompt = f"""{prompt}
 
 Available agents:
 1. {agent_names[0]} - Handles music catalog queries (artists, albums, songs, genres)
 2. {agent_names[1]} - Handles invoice and purchase history queries
 
-User message: {last_message.content}
+User message: {state['messages'][-1].content}
 
 Which agent should handle this query? Respond with ONLY "1" or "2"."""
-            
-            response = model.invoke([
-                SystemMessage(content=routing_prompt),
-                HumanMessage(content="Respond with just the number: 1 or 2")
-            ])
-            
-            response_text = response.content.strip() if hasattr(response, 'content') else str(response)
-            
-            # Extract number from response
-            if '1' in response_text:
-                selected_agent = agent_names[0]
-            elif '2' in response_text:
-                selected_agent = agent_names[1]
-            else:
-                selected_agent = agent_names[0]  # Default to music agent
-            
-            logging.info(f"Supervisor (LLM) routing to: {selected_agent}")
-            return {'next_agent': selected_agent}
-            
+        
+        return [
+            SystemMessage(content=routing_prompt),
+            HumanMessage(content="Respond with just the number: 1 or 2")
+        ]
+    
+    def route_from_response(state: Dict[str, Any], response) -> Dict[str, Any]:
+        """
+        Maps the LLM routing answer to the next agent.
+        """
+        response_text = response.content.strip() if hasattr(response, 'content') else str(response)
+        
+        # Extract number from response
+        if '1' in response_text:
+            selected_agent = agent_names[0]
+        elif '2' in response_text:
+            selected_agent = agent_names[1]
+        else:
+            selected_agent = agent_names[0]  # Default to music agent
+        
+        intent = INTENT_INVOICE if selected_agent == agent_names[1] else INTENT_MUSIC
+        log_routing_decision(state['messages'][-1].content, intent, None, "llm")
+        return {'next_agent': selected_agent}
+    
+    def supervisor_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Supervisor node that decides which agent to call.
+        """
+        routed = route_without_llm(state)
+        if routed is not None:
+            return routed
+        
+        # If both keywords are present or unclear, use LLM to decide
+        try:
+            return route_from_response(state, model.invoke(routing_messages(state), routing_config))
+        except Exception as e:
+            logging.error(f"Error in supervisor routing: {e}")
+            return {'next_agent': agent_names[0]}  # Default to first agent
+    
+    async def asupervisor_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of supervisor_node, awaiting the LLM when it has to decide.
+        """
+        routed = route_without_llm(state)
+        if routed is not None:
+            return routed
+        
+        try:
+            return route_from_response(state, await model.ainvoke(routing_messages(state), routing_config))
         except Exception as e:
             logging.error(f"Error in supervisor routing: {e}")
             return {'next_agent': agent_names[0]}  # Default to first agent
     
+    def branch_runs(state: Dict[str, Any], config: RunnableConfig) -> List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Builds (agent, input, config) for each part of a multi-intent message.
+
+        Each branch sees the conversation so far with the last message replaced by its part, and
+        runs on a throwaway thread so the branches don't write to the conversation's checkpoints.
+        """
+        configurable = (config or {}).get('configurable', {})
+        thread_id = configurable.get('thread_id', 'fan_out')
+        history = list(state.get('messages', [])[:-1])
+        runs = []
+        for intent, part in state.get('intent_parts', {}).items():
+            agent_input = {
+                'messages': history + [HumanMessage(content=part)],
+                'customer_id': state.get('customer_id'),
+                'loaded_memory': state.get('loaded_memory', ''),
+            }
+            agent_config = {
+                'callbacks': (config or {}).get('callbacks'),
+                'configurable': {'thread_id': f"{thread_id}:{intent}:{uuid.uuid4().hex}"},
+            }
+            runs.append((agent_map[intent_agents[intent]], agent_input, agent_config))
+        return runs
+    
+    def branch_answer(agent, agent_config: Dict[str, Any], result: Any) -> str:
+        """
+        Returns a branch's final answer and drops its throwaway thread.
+        """
+        checkpointer = getattr(agent, 'checkpointer', None)
+        if hasattr(checkpointer, 'delete_thread'):
+            checkpointer.delete_thread(agent_config['configurable']['thread_id'])
+        if isinstance(result, Exception):
+            logging.error(f"Error in fan-out branch: {result}")
+            return "Sorry, I couldn't answer part of your question. Please ask it again on its own."
+        messages = result.get('messages', []) if isinstance(result, dict) else []
+        return messages[-1].content if messages else ""
+    
+    def merge_answers(answers: List[str]) -> Dict[str, Any]:
+        return {'messages': [AIMessage(content="\n\n".join(answer for answer in answers if answer))]}
+    
+    def fan_out(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        """
+        Runs the sub-agent for each part of a multi-intent message in parallel threads and merges the answers.
+        """
+        runs = branch_runs(state, config)
+        
+        def run(agent, agent_input, agent_config):
+            try:
+                return agent.invoke(agent_input, agent_config)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=len(runs), thread_name_prefix="fan_out") as executor:
+            # Copy the context per branch so e.g. the LLM cache scope carries over
+            futures = [
+                executor.submit(contextvars.copy_context().run, run, *branch)
+                for branch in runs
+            ]
+            results = [future.result() for future in futures]
+        return merge_answers([branch_answer(agent, agent_config, result)
+                              for (agent, _, agent_config), result in zip(runs, results)])
+    
+    async def afan_out(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        """
+        Async variant of fan_out, awaiting the sub-agents concurrently.
+        """
+        runs = branch_runs(state, config)
+        results = await asyncio.gather(
+            *(agent.ainvoke(agent_input, agent_config) for agent, agent_input, agent_config in runs),
+            return_exceptions=True
+        )
+        return merge_answers([branch_answer(agent, agent_config, result)
+                              for (agent, _, agent_config), result in zip(runs, results)])
+    
+    def fast_path_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answers the last message from a template, or passes it on to the supervisor.
+        """
+        answer = fast_path_answer(state, fast_path_intents)
+        if answer is None:
+            return {'next_agent': "supervisor"}
+        return {'messages': [AIMessage(content=answer)], 'next_agent': END}
+    
+    async def afast_path_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of fast_path_node.
+        """
+        answer = await afast_path_answer(state, fast_path_intents)
+        if answer is None:
+            return {'next_agent': "supervisor"}
+        return {'messages': [AIMessage(content=answer)], 'next_agent': END}
+    
     def route_to_agent(state: Dict[str, Any]) -> str:
         """
         Routing function that returns the next agent to call.
@@ -117,25 +349,35 @@ Which agent should handle this query? Respond with ONLY "1" or "2"."""
     # Create the supervisor workflow
     workflow = StateGraph(state_schema)
     
-    # Add supervisor node
-    workflow.add_node("supervisor", supervisor_node)
+    # Answer templated questions before routing
+    if fast_path_intents:
+        workflow.add_node(FAST_PATH_NODE, RunnableLambda(fast_path_node, afunc=afast_path_node, name=FAST_PATH_NODE))
+        workflow.add_edge(START, FAST_PATH_NODE)
+        workflow.add_conditional_edges(
+            FAST_PATH_NODE,
+            lambda state: state['next_agent'],
+            {"supervisor": "supervisor", END: END}
+        )
+    else:
+        workflow.add_edge(START, "supervisor")
+    
+    # Add supervisor node, with sync and async variants for invoke and ainvoke
+    workflow.add_node("supervisor", RunnableLambda(supervisor_node, afunc=asupervisor_node, name="supervisor"))
     
     # Add sub-agent nodes
     for name, agent in agent_map.items():
         workflow.add_node(name, agent)
-    
-    # Add START edge to supervisor
-    workflow.add_edge(START, "supervisor")
+    workflow.add_node(FAN_OUT_NODE, RunnableLambda(fan_out, afunc=afan_out, name=FAN_OUT_NODE))
     
     # Add conditional edge from supervisor to agents
     workflow.add_conditional_edges(
         "supervisor",
         route_to_agent,
-        {name: name for name in agent_names}
+        {name: name for name in agent_names + [FAN_OUT_NODE]}
     )
     
     # All agents end after processing
-    for name in agent_names:
+    for name in agent_names + [FAN_OUT_NODE]:
         workflow.add_edge(name, END)
     
     return workflow
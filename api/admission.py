@@ -0,0 +1,323 @@
+"""
+Admission control, deadlines and load shedding for the chat endpoints.
+
+Every chat turn holds one of ADMISSION_MAX_IN_FLIGHT slots (default 32) while it runs, so a burst
+cannot pile unlimited turns onto the catalog database and the LLM provider. When all slots are
+taken, requests wait in a FIFO queue of at most ADMISSION_MAX_QUEUE entries (default 64) for up to
+ADMISSION_QUEUE_TIMEOUT seconds (default 10). Requests are shed instead of waiting indefinitely:
+
+- 429 when the customer (or, without a customer ID, the conversation) already has
+  ADMISSION_MAX_PER_CUSTOMER turns running or queued (default 4; 0 disables the limit);
+- 503 when the queue is full or the wait times out.
+
+Both carry a Retry-After estimated from the recent turn latency. A turn that is still running
+REQUEST_DEADLINE seconds after it arrived (default 120; 0 disables it) is cancelled, and so is a
+turn whose client has disconnected. In-flight turns, queue depth and shed counts are exported at
+/metrics for autoscaling.
+"""
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+from utils.metrics import get_metrics_registry
+
+DEFAULT_MAX_IN_FLIGHT = 32
+DEFAULT_MAX_PER_CUSTOMER = 4
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_QUEUE_TIMEOUT = 10.0
+DEFAULT_REQUEST_DEADLINE = 120.0
+
+# Weight of the latest turn in the moving average used for Retry-After
+LATENCY_SMOOTHING = 0.2
+MAX_RETRY_AFTER = 60
+# Seconds between client disconnect checks while a turn runs
+DISCONNECT_POLL_INTERVAL = 0.25
+
+_registry = get_metrics_registry()
+IN_FLIGHT = _registry.gauge("chat_requests_in_flight", "Chat turns holding an admission slot.")
+QUEUE_DEPTH = _registry.gauge("chat_admission_queue_depth", "Chat turns waiting for an admission slot.")
+SHED = _registry.counter(
+    "chat_requests_shed_total", "Chat requests rejected by admission control.", ("reason",))
+ABORTED = _registry.counter(
+    "chat_requests_aborted_total", "Admitted chat turns cancelled before they finished.", ("reason",))
+QUEUE_WAIT = _registry.histogram(
+    "chat_admission_wait_seconds", "Time chat turns waited for an admission slot.")
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed; maps to an HTTP status with a Retry-After header.
+    """
+
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a turn is cancelled at its deadline."""
+
+
+class ClientDisconnected(Exception):
+    """Raised when a turn is cancelled because its client went away."""
+
+
+def get_request_deadline() -> Optional[float]:
+    """
+    Returns the event loop time by which a request arriving now must finish, or None without a deadline.
+    """
+    seconds = float(os.getenv("REQUEST_DEADLINE", DEFAULT_REQUEST_DEADLINE))
+    return asyncio.get_running_loop().time() + seconds if seconds > 0 else None
+
+
+class AdmissionTicket:
+    """
+    An admission slot held by one turn; releasing it more than once is harmless.
+    """
+
+    def __init__(self, controller: "AdmissionController", key: str):
+        self.controller = controller
+        self.key = key
+        self.started = time.perf_counter()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """
+    Global and per-key in-flight limits with a bounded, deadline-aware FIFO wait queue.
+
+    The controller is used from the event loop only, so it needs no lock.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_per_key: int = DEFAULT_MAX_PER_CUSTOMER,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT
+    ):
+        """
+        Args:
+            max_in_flight (int): Turns running at once.
+            max_per_key (int): Turns running or queued per customer or conversation; 0 disables the limit.
+            max_queue (int): Turns waiting for a slot.
+            queue_timeout (float): Seconds a turn may wait for a slot.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_per_key = max_per_key
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._per_key: Dict[str, int] = {}
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency: Optional[float] = None
+
+    def retry_after(self, position: int) -> int:
+        """
+        Estimates the seconds until a request at the given queue position would be admitted.
+        """
+        if self._latency is None:
+            return 1
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(self._latency * position / self.max_in_flight)))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the in-flight and queued counts and the moving average turn latency.
+        """
+        return {"in_flight": self._in_flight, "queued": len(self._waiters), "latency": self._latency}
+
+    def _shed(self, status_code: int, reason: str, detail: str, position: int) -> AdmissionRejected:
+        SHED.inc(reason=reason)
+        logging.warning(f"Shedding chat request ({reason}): {self._in_flight} in flight, {len(self._waiters)} queued")
+        return AdmissionRejected(status_code, reason, detail, self.retry_after(position))
+
+    def _update_gauges(self) -> None:
+        IN_FLIGHT.set(self._in_flight)
+        QUEUE_DEPTH.set(len(self._waiters))
+
+    def _drop_key(self, key: str) -> None:
+        count = self._per_key.get(key, 0) - 1
+        if count > 0:
+            self._per_key[key] = count
+        else:
+            self._per_key.pop(key, None)
+
+    async def acquire(self, key: str = "", deadline: Optional[float] = None) -> AdmissionTicket:
+        """
+        Admits a turn, waiting in the queue if every slot is taken.
+
+        Args:
+            key (str): The customer ID or conversation the per-key limit applies to; "" has no per-key limit.
+            deadline (float): The event loop time the request must finish by; bounds the queue wait.
+
+        Returns:
+            AdmissionTicket: The slot, to be released when the turn ends.
+
+        Raises:
+            AdmissionRejected: When the request is shed.
+        """
+        if key and self.max_per_key and self._per_key.get(key, 0) >= self.max_per_key:
+            raise self._shed(429, "customer_limit", "Too many concurrent requests for this customer", 1)
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._per_key[key] = self._per_key.get(key, 0) + 1
+            self._update_gauges()
+            return AdmissionTicket(self, key)
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed(503, "queue_full", "The server is overloaded, please retry later", len(self._waiters) + 1)
+
+        loop = asyncio.get_running_loop()
+        timeout = self.queue_timeout
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - loop.time()))
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self._per_key[key] = self._per_key.get(key, 0) + 1
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            # The slot is handed over by _release, which resolves the waiter without freeing it
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted in the same loop iteration as the timeout
+                return AdmissionTicket(self, key)
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._drop_key(key)
+            self._update_gauges()
+            raise self._shed(503, "queue_timeout", "The server is overloaded, please retry later", len(self._waiters) + 1)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as the request was cancelled: pass the slot on
+                AdmissionTicket(self, key).release()
+            else:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._drop_key(key)
+                self._update_gauges()
+            raise
+        QUEUE_WAIT.observe(time.perf_counter() - started)
+        return AdmissionTicket(self, key)
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        elapsed = time.perf_counter() - ticket.started
+        self._latency = elapsed if self._latency is None else \
+            (1 - LATENCY_SMOOTHING) * self._latency + LATENCY_SMOOTHING * elapsed
+        self._drop_key(ticket.key)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self._in_flight -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self, key: str = "", deadline: Optional[float] = None) -> AsyncIterator[AdmissionTicket]:
+        """
+        Holds an admission slot for the duration of the block (see acquire).
+        """
+        ticket = await self.acquire(key, deadline)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+
+async def run_until_done(
+    awaitable: Awaitable[Any],
+    deadline: Optional[float] = None,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+) -> Any:
+    """
+    Awaits a turn, cancelling it at the deadline or when the client disconnects.
+
+    Args:
+        awaitable: The turn, e.g. agent.ainvoke(state, config).
+        deadline (float): The event loop time the turn must finish by, or None.
+        is_disconnected (Callable): Returns whether the client has gone away, e.g. Request.is_disconnected.
+
+    Returns:
+        Any: The turn's result.
+
+    Raises:
+        DeadlineExceeded: When the deadline passes first.
+        ClientDisconnected: When the client disconnects first.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            timeout = DISCONNECT_POLL_INTERVAL if is_disconnected is not None else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - loop.time())
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                if task.exception() is not None and is_disconnected is not None and await is_disconnected():
+                    # e.g. writing to the client's closed socket between two checks
+                    ABORTED.inc(reason="disconnected")
+                    raise ClientDisconnected("The client disconnected") from task.exception()
+                return task.result()
+            if deadline is not None and loop.time() >= deadline:
+                ABORTED.inc(reason="deadline")
+                raise DeadlineExceeded("The request did not finish within its deadline")
+            if is_disconnected is not None and await is_disconnected():
+                ABORTED.inc(reason="disconnected")
+                raise ClientDisconnected("The client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+            # Don't wait for tools still finishing on executor threads; just drop the result
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def next_before_deadline(events: AsyncIterator[Any], deadline: Optional[float]) -> Any:
+    """
+    Returns the next item of an async iterator, raising DeadlineExceeded if it doesn't arrive in time.
+    """
+    if deadline is None:
+        return await events.__anext__()
+    remaining = max(0.0, deadline - asyncio.get_running_loop().time())
+    try:
+        return await asyncio.wait_for(events.__anext__(), remaining)
+    except asyncio.TimeoutError:
+        ABORTED.inc(reason="deadline")
+        raise DeadlineExceeded("The request did not finish within its deadline")
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Returns the process-wide admission controller configured from the ADMISSION_* variables.
+
+    Returns:
+        AdmissionController: The shared controller.
+    """
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+            max_per_key=int(os.getenv("ADMISSION_MAX_PER_CUSTOMER", DEFAULT_MAX_PER_CUSTOMER)),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT))
+        )
+    return _controller
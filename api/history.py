@@ -0,0 +1,181 @@
+"""
+Paginated, cacheable conversation history for /api/conversation/{thread_id}.
+
+History is read straight from the thread's latest checkpoint instead of building a full state
+snapshot. Messages are filtered and sliced before any of them is converted, so a poll of a long
+support thread only serializes the page it returns:
+
+- `limit` bounds the page (HISTORY_PAGE_SIZE, default 50, capped at HISTORY_MAX_PAGE_SIZE, default 200);
+- `before` and `after` take a message ID (the response's prev_cursor and next_cursor) and page
+  backward or forward from it; without either, the latest page is returned;
+- `since` takes the ID of the last message the client has and returns what came after it. If that
+  message is gone (e.g. summarized away), the latest page is returned with `reset` set;
+- `chat_only` drops tool, system and tool-calling messages, leaving the user's turns and the replies.
+
+Each response carries an ETag derived from the checkpoint ID and the query, so polling an
+unchanged thread with If-None-Match returns 304 without converting or serializing any message.
+"""
+import os
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from utils.pagination import get_page_size
+
+DEFAULT_HISTORY_PAGE_SIZE = 50
+DEFAULT_HISTORY_MAX_PAGE_SIZE = 200
+
+
+class UnknownCursorError(ValueError):
+    """Raised when a before/after cursor names a message that is not in the thread."""
+
+
+def get_history_page_size(limit: Optional[int]) -> int:
+    """
+    Returns the page size for a history request, defaulting and capping it from the HISTORY_* variables.
+    """
+    default = int(os.getenv("HISTORY_PAGE_SIZE", DEFAULT_HISTORY_PAGE_SIZE))
+    maximum = int(os.getenv("HISTORY_MAX_PAGE_SIZE", DEFAULT_HISTORY_MAX_PAGE_SIZE))
+    return get_page_size(limit, default, maximum)
+
+
+async def aload_thread(agent: Any, thread_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Loads a thread's latest checkpoint.
+
+    Args:
+        agent: The compiled supervisor graph.
+        thread_id (str): The conversation thread ID.
+
+    Returns:
+        tuple: (checkpoint ID, channel values), or None if the thread has no checkpoint.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    checkpointer = getattr(agent, "checkpointer", None)
+    if checkpointer is None or not hasattr(checkpointer, "aget_tuple"):
+        snapshot = await agent.aget_state(config)
+        if not snapshot or not snapshot.values:
+            return None
+        return snapshot.config["configurable"].get("checkpoint_id", ""), snapshot.values
+    checkpoint = await checkpointer.aget_tuple(config)
+    if checkpoint is None:
+        return None
+    return checkpoint.checkpoint["id"], checkpoint.checkpoint.get("channel_values", {})
+
+
+def history_etag(checkpoint_id: str, **query: Any) -> str:
+    """
+    Returns a weak ETag identifying one page of one version of a thread.
+    """
+    key = "|".join([checkpoint_id] + [f"{name}={query[name]}" for name in sorted(query)])
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Returns whether an If-None-Match header matches the ETag (weak comparison).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def is_chat_message(message: Any) -> bool:
+    """
+    Returns whether a message is a user turn or an assistant reply rather than tool or system traffic.
+    """
+    message_type = getattr(message, "type", None)
+    if message_type == "human":
+        return True
+    if message_type != "ai":
+        return False
+    return bool(message.content) and not getattr(message, "tool_calls", None)
+
+
+def message_id(message: Any, index: int) -> str:
+    """Returns a message's ID, falling back to its position for messages saved without one."""
+    return getattr(message, "id", None) or str(index)
+
+
+def to_chat_message(message: Any, index: int) -> Dict[str, Any]:
+    """
+    Converts a checkpointed message into the API's ChatMessage fields.
+    """
+    role = "user" if getattr(message, "type", None) == "human" else "assistant"
+    content = message.content if hasattr(message, "content") else str(message)
+    if not isinstance(content, str):
+        content = str(content)
+    return {"id": message_id(message, index), "role": role, "content": content}
+
+
+def _position(ids: Sequence[str], cursor: str) -> Optional[int]:
+    # Clients usually page near the end of the thread, so search from there
+    for position in range(len(ids) - 1, -1, -1):
+        if ids[position] == cursor:
+            return position
+    return None
+
+
+def page_history(
+    messages: Sequence[Any],
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[str] = None,
+    chat_only: bool = False
+) -> Dict[str, Any]:
+    """
+    Selects and converts one page of a thread's messages.
+
+    Args:
+        messages (Sequence): The thread's messages, oldest first.
+        limit (int): Messages per page.
+        before (str): Return the messages preceding this message ID.
+        after (str): Return the messages following this message ID.
+        since (str): Like after, but an unknown ID returns the latest page with reset set.
+        chat_only (bool): Drop tool, system and tool-calling messages.
+
+    Returns:
+        dict: {"messages": ChatMessage fields of the page, oldest first, "prev_cursor" and
+               "next_cursor": message IDs to page from when more messages exist, else None,
+               "reset": whether since was not found}.
+
+    Raises:
+        UnknownCursorError: If before or after is not a message of the thread.
+    """
+    indexed: List[Tuple[int, Any]] = [
+        (index, message) for index, message in enumerate(messages)
+        if not chat_only or is_chat_message(message)
+    ]
+    ids = [message_id(message, index) for index, message in indexed]
+    reset = False
+    if after or since:
+        position = _position(ids, after or since)
+        if position is None and after:
+            raise UnknownCursorError(f"Unknown cursor: {after}")
+        reset = position is None
+        start = len(ids) - limit if reset else position + 1
+    elif before:
+        position = _position(ids, before)
+        if position is None:
+            raise UnknownCursorError(f"Unknown cursor: {before}")
+        start = position - limit
+    else:
+        start = len(ids) - limit
+    start = max(0, start)
+    end = min(len(ids), start + limit)
+    if before:
+        end = min(end, position)
+    return {
+        "messages": [to_chat_message(message, index) for index, message in indexed[start:end]],
+        "prev_cursor": ids[start] if 0 < start < end else None,
+        "next_cursor": ids[end - 1] if start < end < len(ids) else None,
+        "reset": reset,
+    }
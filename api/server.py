@@ -1,10 +1,16 @@
 """
 FastAPI server to expose the Digital Music Store AI Agent as an API.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, ValidationError
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
+import asyncio
+import json
+import threading
 import uuid
 import logging
 import sys
@@ -14,8 +20,30 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.supervisor.digital_store import get_digital_store_agent
-from utils.state_utils import create_initial_state
+from api.admission import (
+    AdmissionRejected,
+    ClientDisconnected,
+    DeadlineExceeded,
+    get_admission_controller,
+    get_request_deadline,
+    next_before_deadline,
+    run_until_done,
+)
+from api.history import (
+    UnknownCursorError,
+    aload_thread,
+    etag_matches,
+    get_history_page_size,
+    history_etag,
+    page_history,
+)
+from api.streaming import SSE_HEADERS, astream_chat_events, event_json, format_sse
+from utils.state_utils import acreate_initial_state
 from utils.env import load_environment_variables
+from utils.batch import arun_batch
+from utils.llm_cache import llm_cache_scope
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, get_metrics_registry
+from utils.warmup import WarmupStatus, awarm_up, warmup_enabled
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,11 +52,32 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_environment_variables()
 
+# Startup warm-up progress, reported by /ready
+_warmup_status = WarmupStatus()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warms up the database, indexes, LLM clients and graphs in the background while the server
+    starts accepting connections; /ready succeeds once that is done.
+    """
+    warmup = None
+    if warmup_enabled():
+        warmup = asyncio.create_task(awarm_up(get_agent, _warmup_status))
+    else:
+        _warmup_status.mark_ready()
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Digital Music Store AI Agent API",
     description="API for interacting with the Digital Music Store multi-agent AI system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -40,16 +89,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize agent (lazy loading)
+# Initialize agent (compiled by the startup warm-up, or lazily by the first request)
 _agent = None
+_agent_lock = threading.Lock()
 
 def get_agent():
     """Get or initialize the agent."""
     global _agent
     if _agent is None:
-        logger.info("Initializing digital store agent...")
-        _agent = get_digital_store_agent()
-        logger.info("Agent initialized successfully")
+        with _agent_lock:
+            if _agent is None:
+                logger.info("Initializing digital store agent...")
+                _agent = get_digital_store_agent()
+                logger.info("Agent initialized successfully")
     return _agent
 
 
@@ -58,6 +110,7 @@ class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
     content: str
     timestamp: Optional[str] = None
+    id: Optional[str] = None
 
 
 class ChatRequest(BaseModel):
@@ -73,10 +126,22 @@ class ChatResponse(BaseModel):
     agent_name: Optional[str] = None
 
 
+class BatchItem(ChatRequest):
+    id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    concurrency: Optional[int] = None
+
+
 class ConversationHistory(BaseModel):
     thread_id: str
     messages: List[ChatMessage]
     customer_id: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+    reset: bool = False
 
 
 @app.get("/")
@@ -95,36 +160,76 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness endpoint: 503 until the startup warm-up has finished, with per-phase timings.
+    """
+    status = _warmup_status.snapshot()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Latency and token histograms in the Prometheus text format."""
+    return PlainTextResponse(get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+async def prepare_turn(request: ChatRequest) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """
+    Returns the thread_id, run config and initial state for a chat request.
+    """
+    thread_id = request.thread_id or str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id}}
+    state = await acreate_initial_state(
+        request.message,
+        customer_id=request.customer_id or "",
+        config=config
+    )
+    return thread_id, config, state
+
+
+def admission_key(request: ChatRequest) -> str:
+    """
+    Returns the key the per-customer admission limit applies to: the customer, else the conversation.
+    """
+    return request.customer_id or request.thread_id or ""
+
+
+def overloaded(e: AdmissionRejected) -> HTTPException:
+    """Returns the 429 or 503 response for a shed request."""
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Send a message to the agent and get a response.
     
+    The turn is admitted by the admission controller (429/503 with Retry-After when overloaded)
+    and cancelled at REQUEST_DEADLINE (504) or when the client disconnects.
+    
     Args:
         request: Chat request with message and optional thread_id
         
     Returns:
         ChatResponse with agent's response
     """
+    deadline = get_request_deadline()
     try:
-        # Get or create thread_id
-        thread_id = request.thread_id or str(uuid.uuid4())
-        config = {"configurable": {"thread_id": thread_id}}
-        
-        # Get agent
-        agent = get_agent()
-        
-        # Create initial state
-        state = create_initial_state(
-            request.message,
-            customer_id=request.customer_id or "",
-            config=config
-        )
-        
-        logger.info(f"Processing message for thread {thread_id}: {request.message[:50]}...")
-        
-        # Invoke agent
-        result = agent.invoke(state, config)
+        async with get_admission_controller().admit(admission_key(request), deadline):
+            # Get or create thread_id, and create the initial state
+            thread_id, config, state = await prepare_turn(request)
+            
+            # Get agent
+            agent = get_agent()
+            
+            logger.info(f"Processing message for thread {thread_id}: {request.message[:50]}...")
+            
+            # Invoke agent asynchronously, so LLM round trips don't block other requests on this worker.
+            # Cached LLM responses are scoped to the customer, since prompts carry their preferences.
+            with llm_cache_scope(state.get('customer_id')):
+                result = await run_until_done(agent.ainvoke(state, config), deadline, http_request.is_disconnected)
         
         # Extract the last assistant message
         messages = result.get('messages', [])
@@ -152,57 +257,236 @@ async def chat(request: ChatRequest):
             agent_name="digital_store_agent"
         )
         
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    except DeadlineExceeded as e:
+        logger.warning(f"Chat request cancelled: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnected:
+        logger.info("Chat request cancelled, the client disconnected")
+        # Nobody is listening; 499 is the conventional "client closed request" status
+        return Response(status_code=499)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing chat request: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 
+async def stream_turn(request: ChatRequest, deadline: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs a chat request and yields its progress events (see api/streaming.py), ending with an error event at the deadline.
+    """
+    try:
+        thread_id, config, state = await prepare_turn(request)
+        agent = get_agent()
+    except Exception as e:
+        logger.error(f"Error preparing chat request: {e}", exc_info=True)
+        yield {"type": "error", "detail": f"Error processing request: {str(e)}"}
+        return
+    
+    logger.info(f"Streaming message for thread {thread_id}: {request.message[:50]}...")
+    with llm_cache_scope(state.get('customer_id')):
+        events = astream_chat_events(agent, state, config)
+        try:
+            while True:
+                try:
+                    event = await next_before_deadline(events, deadline)
+                except StopAsyncIteration:
+                    break
+                yield event
+        except DeadlineExceeded as e:
+            logger.warning(f"Streaming chat request cancelled: {e}")
+            yield {"type": "error", "detail": str(e)}
+        finally:
+            await events.aclose()
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Send a message to the agent and stream the response as Server-Sent Events.
+    
+    Routing decisions, tool calls and reply tokens are sent as they happen; the last event is
+    "message" (the same fields as ChatResponse) or "error". Admission control applies as for
+    /api/chat; the turn stops when the client disconnects.
+    
+    Args:
+        request: Chat request with message and optional thread_id
+        
+    Returns:
+        StreamingResponse of text/event-stream events
+    """
+    deadline = get_request_deadline()
+    try:
+        ticket = await get_admission_controller().acquire(admission_key(request), deadline)
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    
+    async def events():
+        try:
+            async for event in stream_turn(request, deadline):
+                yield format_sse(event)
+        finally:
+            ticket.release()
+    
+    # The background task releases the slot if the client disconnects before the stream starts
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS,
+                             background=BackgroundTask(ticket.release))
+
+
+@app.websocket("/api/chat/ws")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Chat over a WebSocket: each text frame is a ChatRequest in JSON, answered with the same
+    events as /api/chat/stream, one JSON frame per event. A shed request is answered with an
+    error event carrying its status and retry_after.
+    
+    Frames are read by a background task while turns run, so a turn is cancelled as soon as
+    the client disconnects instead of at its next event or its deadline.
+    """
+    await websocket.accept()
+    frames: asyncio.Queue = asyncio.Queue()
+    
+    async def read_frames():
+        try:
+            while True:
+                frames.put_nowait(await websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            # Wakes the handler up if it is waiting for the next request
+            frames.put_nowait(None)
+    
+    reader = asyncio.ensure_future(read_frames())
+    
+    async def is_disconnected() -> bool:
+        return reader.done()
+    
+    async def send_turn(request: ChatRequest, deadline: Optional[float]) -> None:
+        events = stream_turn(request, deadline)
+        try:
+            async for event in events:
+                await websocket.send_text(event_json(event))
+        finally:
+            # Close the turn in this task if sending fails, rather than leaving it to the event loop
+            await events.aclose()
+    
+    try:
+        while True:
+            data = await frames.get()
+            if data is None:
+                break
+            try:
+                request = ChatRequest(**json.loads(data))
+            except (ValueError, TypeError, ValidationError) as e:
+                await websocket.send_text(event_json({"type": "error", "detail": f"Invalid request: {str(e)}"}))
+                continue
+            deadline = get_request_deadline()
+            try:
+                async with get_admission_controller().admit(admission_key(request), deadline):
+                    # stream_turn reports the deadline itself, as an error event
+                    await run_until_done(send_turn(request, deadline), None, is_disconnected)
+            except AdmissionRejected as e:
+                await websocket.send_text(event_json({
+                    "type": "error", "detail": e.detail, "status": e.status_code, "retry_after": e.retry_after
+                }))
+            except ClientDisconnected:
+                logger.info("Chat turn cancelled, the WebSocket client disconnected")
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+    logger.info("Chat WebSocket disconnected")
+
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchRequest):
+    """
+    Answer many messages concurrently, streaming one NDJSON result line per item as it completes.
+    
+    Items sharing a thread_id run in order as one conversation. At most `concurrency` turns
+    (default BATCH_CONCURRENCY) run at once, and each takes an admission slot like /api/chat,
+    so batches cannot crowd out interactive requests. The turns stop when the client disconnects.
+    
+    Args:
+        request: Batch request with the items and an optional concurrency
+        
+    Returns:
+        StreamingResponse of application/x-ndjson results with index, id, thread_id, status,
+        message or error, customer_id and elapsed_ms
+    """
+    max_items = int(os.getenv("BATCH_MAX_ITEMS", 10000))
+    if len(request.items) > max_items:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {max_items} items")
+    agent = get_agent()
+    items = [item.model_dump(exclude_none=True) for item in request.items]
+    logger.info(f"Processing batch of {len(items)} items")
+    
+    async def results():
+        async for result in arun_batch(agent, items, request.concurrency, get_admission_controller()):
+            yield json.dumps(result) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @app.get("/api/conversation/{thread_id}", response_model=ConversationHistory)
-async def get_conversation(thread_id: str):
+async def get_conversation(
+    thread_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[str] = None,
+    chat_only: bool = False,
+    if_none_match: Optional[str] = Header(None)
+):
     """
-    Get conversation history for a thread.
+    Get one page of conversation history for a thread.
     
     Args:
         thread_id: The conversation thread ID
+        limit: Messages per page (HISTORY_PAGE_SIZE by default)
+        before: Return the messages preceding this message ID (a prev_cursor)
+        after: Return the messages following this message ID (a next_cursor)
+        since: ID of the last message the client has; returns the newer ones
+        chat_only: Leave out tool, system and tool-calling messages
+        if_none_match: ETag of a page the client already has
         
     Returns:
-        ConversationHistory with all messages
+        ConversationHistory with the page's messages, oldest first, or 304 if unchanged
     """
+    if sum(cursor is not None for cursor in (before, after, since)) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of before, after and since")
     try:
         agent = get_agent()
-        config = {"configurable": {"thread_id": thread_id}}
-        
-        # Get the state from checkpointer
-        try:
-            state_snapshot = agent.get_state(config)
-        except Exception:
-            # State might not exist yet
+        thread = await aload_thread(agent, thread_id)
+        if thread is None:
             raise HTTPException(status_code=404, detail="Conversation not found")
+        checkpoint_id, values = thread
         
-        if not state_snapshot or not hasattr(state_snapshot, 'values'):
-            raise HTTPException(status_code=404, detail="Conversation not found")
+        page_size = get_history_page_size(limit)
+        etag = history_etag(
+            checkpoint_id, limit=page_size, before=before, after=after, since=since, chat_only=chat_only
+        )
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
         
-        # Convert messages to ChatMessage format
-        messages = []
-        for msg in state_snapshot.values.get('messages', []):
-            # Determine role based on message type
-            if hasattr(msg, 'type'):
-                role = "user" if msg.type == "human" else "assistant"
-            else:
-                # Default based on content or class name
-                role = "assistant"
-            
-            content = msg.content if hasattr(msg, 'content') else str(msg)
-            
-            messages.append(ChatMessage(
-                role=role,
-                content=content
-            ))
+        try:
+            page = page_history(
+                values.get('messages', []), page_size,
+                before=before, after=after, since=since, chat_only=chat_only
+            )
+        except UnknownCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return ConversationHistory(
             thread_id=thread_id,
-            messages=messages,
-            customer_id=state_snapshot.values.get('customer_id')
+            customer_id=values.get('customer_id'),
+            **page
         )
         
     except HTTPException:
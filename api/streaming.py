@@ -0,0 +1,153 @@
+"""
+Event streaming for chat turns, used by the SSE and WebSocket chat endpoints.
+
+astream_chat_events() runs one turn with the graph's astream_events and yields JSON-ready events
+as they happen, so the first bytes reach the client long before the turn ends:
+
+- {"type": "start", "thread_id": ...}: the turn has started;
+- {"type": "route", "agent": ...}: who answers ("fast_path", a sub-agent, or "fan_out" with "intents");
+- {"type": "token", "content": ..., "agent": ...}: a piece of the reply from the answering LLM;
+- {"type": "tool_start", "id": ..., "tool": ..., "input": ...} and
+  {"type": "tool_end", "id": ..., "tool": ..., "status": "ok" | "error", "output": ...};
+- {"type": "message", "message": ..., "thread_id": ..., "customer_id": ..., "agent_name": ...}: the
+  final reply, as returned by /api/chat; it replaces the streamed tokens;
+- {"type": "error", "detail": ...}.
+
+LLM calls tagged nostream (supervisor routing, conversation summaries) are not streamed, nor are
+the tokens of fan-out branches, which answer concurrently and arrive merged in the final message.
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+from langgraph.constants import TAG_NOSTREAM
+from agents.supervisor.supervisor_utils import FAN_OUT_NODE, FAST_PATH_NODE
+
+# Characters of a tool result included in tool_end events
+TOOL_OUTPUT_CHARS = 500
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Ask nginx not to buffer the stream
+    "X-Accel-Buffering": "no",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def event_json(event: Dict[str, Any]) -> str:
+    """Serializes an event, falling back to str() for values such as tool inputs that aren't JSON."""
+    return json.dumps(event, default=str)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Formats an event as a Server-Sent Events message named after its type."""
+    return f"event: {event['type']}\ndata: {event_json(event)}\n\n"
+
+
+def chunk_text(chunk: Any) -> str:
+    """Returns the text of a streamed message chunk, whose content may be a list of content blocks."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+        if not isinstance(block, dict) or block.get("type") == "text"
+    )
+
+
+def top_level_node(metadata: Dict[str, Any]) -> Optional[str]:
+    """Returns the supervisor graph node an event belongs to, e.g. "music_catalog_subagent"."""
+    namespace = metadata.get("langgraph_checkpoint_ns")
+    if namespace:
+        return namespace.split("|")[0].split(":")[0]
+    return metadata.get("langgraph_node")
+
+
+def route_event(node: str, output: Any) -> Optional[Dict[str, Any]]:
+    """Returns the route event for the output of the fast path or supervisor node, if it routed the turn."""
+    if not isinstance(output, dict):
+        return None
+    next_agent = output.get("next_agent")
+    if node == FAST_PATH_NODE:
+        return {"type": "route", "agent": FAST_PATH_NODE} if output.get("messages") else None
+    if next_agent == FAN_OUT_NODE:
+        return {"type": "route", "agent": FAN_OUT_NODE, "intents": list(output.get("intent_parts", {}))}
+    return {"type": "route", "agent": next_agent} if next_agent else None
+
+
+def reply_event(result: Any, thread_id: str, customer_id: Optional[str]) -> Dict[str, Any]:
+    """Returns the final message event for the graph's output state."""
+    messages = result.get("messages", []) if isinstance(result, dict) else []
+    if not messages:
+        return {"type": "error", "detail": "No response from agent"}
+    last_message = messages[-1]
+    return {
+        "type": "message",
+        "message": last_message.content if hasattr(last_message, "content") else str(last_message),
+        "thread_id": thread_id,
+        "customer_id": result.get("customer_id", customer_id),
+        "agent_name": "digital_store_agent",
+    }
+
+
+async def astream_chat_events(agent: Any, state: Dict[str, Any], config: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs one chat turn and yields its progress events, ending with a message or error event.
+
+    Args:
+        agent: The compiled supervisor graph.
+        state (dict): The initial state of the turn.
+        config (dict): The run config, with the thread_id.
+
+    Yields:
+        dict: The events described in the module docstring.
+    """
+    thread_id = config["configurable"]["thread_id"]
+    yield {"type": "start", "thread_id": thread_id}
+
+    fan_out_runs = set()
+    result = None
+    try:
+        async for event in agent.astream_events(state, config, version="v2"):
+            kind = event["event"]
+            parents = event.get("parent_ids", [])
+            metadata = event.get("metadata", {})
+
+            if kind == "on_chat_model_stream":
+                if TAG_NOSTREAM in event.get("tags", []) or fan_out_runs.intersection(parents):
+                    continue
+                content = chunk_text(event["data"].get("chunk"))
+                if content:
+                    yield {"type": "token", "content": content, "agent": top_level_node(metadata)}
+
+            elif kind == "on_tool_start":
+                yield {"type": "tool_start", "id": event["run_id"], "tool": event["name"],
+                       "input": event["data"].get("input")}
+
+            elif kind in ("on_tool_end", "on_tool_error"):
+                if kind == "on_tool_error":
+                    status, output = "error", str(event["data"].get("error"))
+                else:
+                    output = event["data"].get("output")
+                    status = "error" if getattr(output, "status", None) == "error" else "ok"
+                    output = getattr(output, "content", output)
+                yield {"type": "tool_end", "id": event["run_id"], "tool": event["name"], "status": status,
+                       "output": str(output)[:TOOL_OUTPUT_CHARS]}
+
+            elif kind == "on_chain_start" and len(parents) == 1 and event["name"] == FAN_OUT_NODE:
+                fan_out_runs.add(event["run_id"])
+
+            elif kind == "on_chain_end" and len(parents) == 1 and event["name"] in (FAST_PATH_NODE, "supervisor"):
+                routed = route_event(event["name"], event["data"].get("output"))
+                if routed:
+                    yield routed
+
+            elif kind == "on_chain_end" and not parents:
+                result = event["data"].get("output")
+    except Exception as e:
+        logger.error(f"Error streaming chat turn for thread {thread_id}: {e}", exc_info=True)
+        yield {"type": "error", "detail": f"Error processing request: {str(e)}"}
+        return
+
+    yield reply_event(result, thread_id, state.get("customer_id"))
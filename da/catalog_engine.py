@@ -0,0 +1,355 @@
+"""
+Array-backed in-memory engine for the read-only music catalog.
+
+The catalog is loaded once into columnar NumPy arrays: integer ID and foreign-key columns,
+interned name tables and precomputed lowercase name buffers. The music tool queries are then
+answered with vectorized filtering in the calling thread instead of SQL, so request threads do
+not contend for database connections.
+
+ColumnarCatalog exposes the same catalog query functions (and row types) as da.queries, and
+get_catalog_backend() returns one or the other depending on MUSIC_CATALOG_BACKEND.
+"""
+import os
+import re
+import sys
+import logging
+import threading
+import unicodedata
+from typing import Any, List, Optional, Sequence
+import numpy as np
+from da import queries
+from da.db import get_chinook_engine, on_chinook_db_reset
+
+CATALOG_BACKEND_SQLITE = "sqlite"
+CATALOG_BACKEND_ARRAYS = "arrays"
+
+ARTIST_COLUMNS = "SELECT ArtistId, Name FROM Artist ORDER BY ArtistId"
+ALBUM_COLUMNS = "SELECT AlbumId, Title, ArtistId FROM Album ORDER BY AlbumId"
+TRACK_COLUMNS = "SELECT TrackId, Name, AlbumId FROM Track ORDER BY TrackId"
+GENRE_COLUMNS = "SELECT GenreId, Name FROM Genre ORDER BY GenreId"
+GENRE_SAMPLE_COLUMNS = """
+    SELECT GenreId, ArtistId, ArtistName, SongName, TrackRank, ArtistTrackCount, ArtistSales
+    FROM GenreArtistSample
+"""
+
+
+# SQLite's built-in LIKE is case-insensitive for ASCII letters only
+ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def like_fold(text: Optional[str]) -> str:
+    """
+    Lowercases ASCII letters only, matching the case folding of SQLite's LIKE.
+    """
+    return (text or "").translate(ASCII_LOWER)
+
+
+def fold(text: Optional[str]) -> str:
+    """
+    Lowercases text and strips diacritics, matching the FTS5 unicode61 tokenizer.
+    """
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def word_buffer(text: Optional[str]) -> str:
+    """
+    Builds the word-prefix search buffer for a name: folded words joined and surrounded by spaces,
+    so `" " + word` occurs in it exactly when some word of the name starts with `word`.
+    """
+    words = re.findall(r"\w+", fold(text))
+    return f" {' '.join(words)} "
+
+
+def load_columns(statement: str) -> List[Sequence[Any]]:
+    """
+    Executes a constant statement and returns its result column by column.
+
+    Args:
+        statement (str): A SQL statement without parameters.
+
+    Returns:
+        List[Sequence]: One sequence per selected column.
+    """
+    connection = get_chinook_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(statement)
+            columns = len(cursor.description)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    finally:
+        connection.close()
+    return list(zip(*rows)) if rows else [()] * columns
+
+
+class NameColumn:
+    """
+    An interned name table with its precomputed search buffers.
+    """
+
+    def __init__(self, names: Sequence[Optional[str]]):
+        self.names = np.array([sys.intern(name) if name is not None else None for name in names], dtype=object)
+        # Fixed-width unicode buffers so np.char can scan them without touching Python objects
+        self.lower = np.array([like_fold(name) for name in names], dtype=str)
+        self.words = np.array([word_buffer(name) for name in names], dtype=str)
+        self.lengths = np.array([len(name or "") for name in names], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def contains(self, term: str) -> np.ndarray:
+        """
+        Returns a mask of names containing the term with SQLite LIKE semantics (LIKE mode):
+        ASCII letters match case-insensitively, diacritics and other letters exactly.
+        """
+        return np.char.find(self.lower, like_fold(term.strip())) >= 0
+
+    def prefix_match(self, term: str) -> np.ndarray:
+        """
+        Returns a mask of names where every word of the term prefixes some word (FTS mode).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        words = re.findall(r"\w+", fold(term))
+        if not words:
+            return np.zeros(len(self), dtype=bool)
+        for word in words:
+            mask &= np.char.find(self.words, f" {word}") >= 0
+        return mask
+
+    def match(self, term: str, mode: str) -> np.ndarray:
+        return self.contains(term) if mode == queries.SEARCH_MODE_LIKE else self.prefix_match(term)
+
+
+def positions(ids: np.ndarray, keys: Sequence[Optional[int]]) -> np.ndarray:
+    """
+    Maps foreign keys to row positions in a sorted ID column, -1 where the key is missing.
+    """
+    keys = np.array([-1 if key is None else key for key in keys], dtype=np.int64)
+    if not len(ids):
+        return np.full(len(keys), -1, dtype=np.int64)
+    found = np.clip(np.searchsorted(ids, keys), 0, len(ids) - 1)
+    return np.where(ids[found] == keys, found, -1)
+
+
+def apply_limit(order: np.ndarray, limit: Optional[int]) -> np.ndarray:
+    return order if limit is None or limit < 0 else order[:limit]
+
+
+class ColumnarCatalog:
+    """
+    Artist, Album, Track and Genre held as columnar arrays, answering the music tool queries.
+
+    FTS-mode results are ranked by the length of the matched name (shorter, closer matches
+    first), approximating the bm25 rank of the SQLite backend.
+    """
+
+    def __init__(self):
+        artist_ids, artist_names = load_columns(ARTIST_COLUMNS)
+        album_ids, album_titles, album_artists = load_columns(ALBUM_COLUMNS)
+        track_ids, track_names, track_albums = load_columns(TRACK_COLUMNS)
+        genre_ids, genre_names = load_columns(GENRE_COLUMNS)
+        sample_genres, sample_artist_ids, sample_artists, sample_songs, sample_ranks, sample_counts, sample_sales = \
+            load_columns(GENRE_SAMPLE_COLUMNS)
+
+        self.artist_ids = np.array(artist_ids, dtype=np.int64)
+        self.artists = NameColumn(artist_names)
+
+        self.album_ids = np.array(album_ids, dtype=np.int64)
+        self.albums = NameColumn(album_titles)
+        self.album_artist = positions(self.artist_ids, album_artists)
+
+        self.track_ids = np.array(track_ids, dtype=np.int64)
+        self.tracks = NameColumn(track_names)
+        self.track_album = positions(self.album_ids, track_albums)
+        self.track_artist = np.where(self.track_album >= 0, self.album_artist[self.track_album], -1) \
+            if len(self.album_ids) else np.full(len(self.track_ids), -1, dtype=np.int64)
+
+        self.genre_ids = np.array(genre_ids, dtype=np.int64)
+        self.genres = NameColumn(genre_names)
+
+        self.sample_genre = np.array(sample_genres, dtype=np.int64)
+        self.sample_artist_id = np.array(sample_artist_ids, dtype=np.int64)
+        self.sample_artist = np.array(sample_artists, dtype=object)
+        self.sample_artist_key = np.array(sample_artists, dtype=str)
+        self.sample_song = np.array(sample_songs, dtype=object)
+        self.sample_rank = np.array(sample_ranks, dtype=np.int64)
+        self.sample_count = np.array(sample_counts, dtype=np.int64)
+        self.sample_sales = np.array(sample_sales, dtype=np.int64)
+        logging.info(
+            "Loaded columnar catalog with %s artists, %s albums and %s tracks",
+            len(self.artist_ids), len(self.album_ids), len(self.track_ids)
+        )
+
+    def _artist_name(self, position: int) -> Optional[str]:
+        return self.artists.names[position] if position >= 0 else None
+
+    def _rank(self, name_lengths: np.ndarray, ids: np.ndarray, mode: str) -> np.ndarray:
+        """Returns the sort order of matched rows: by ID in LIKE mode, by name length then ID in FTS mode."""
+        if mode == queries.SEARCH_MODE_LIKE:
+            return np.argsort(ids, kind="stable")
+        return np.lexsort((ids, name_lengths))
+
+    def get_albums_by_artist(self, artist: str, mode: Optional[str] = None, limit: Optional[int] = None) -> List[queries.AlbumRow]:
+        """Returns the albums of every artist matching `artist` (up to `limit` rows)."""
+        mode = mode or queries.get_search_mode()
+        artist_mask = self.artists.match(artist, mode)
+        selected = np.flatnonzero((self.album_artist >= 0) & artist_mask[self.album_artist])
+        order = self._rank(self.artists.lengths[self.album_artist[selected]], self.album_ids[selected], mode)
+        return [
+            queries.AlbumRow(self.albums.names[i], self._artist_name(self.album_artist[i]))
+            for i in selected[apply_limit(order, limit)]
+        ]
+
+    def get_tracks_by_artist(self, artist: str, mode: Optional[str] = None, limit: Optional[int] = None) -> List[queries.TrackRow]:
+        """Returns the tracks of every artist matching `artist` (up to `limit` rows)."""
+        mode = mode or queries.get_search_mode()
+        artist_mask = self.artists.match(artist, mode)
+        selected = np.flatnonzero((self.track_artist >= 0) & artist_mask[self.track_artist])
+        order = self._rank(self.artists.lengths[self.track_artist[selected]], self.track_ids[selected], mode)
+        return [
+            queries.TrackRow(self.tracks.names[i], self._artist_name(self.track_artist[i]))
+            for i in selected[apply_limit(order, limit)]
+        ]
+
+    def search_albums_by_title(self, title: str, limit: int = 20) -> List[queries.AlbumRow]:
+        """Returns albums whose title prefix-matches `title`, closest matches first."""
+        selected = np.flatnonzero(self.albums.prefix_match(title))
+        order = self._rank(self.albums.lengths[selected], self.album_ids[selected], queries.SEARCH_MODE_FTS)
+        return [
+            queries.AlbumRow(self.albums.names[i], self._artist_name(self.album_artist[i]))
+            for i in selected[apply_limit(order, limit)]
+        ]
+
+    def get_genres_by_name(self, genre: str) -> List[queries.GenreRow]:
+        """Returns the genres whose name contains `genre`."""
+        return [
+            queries.GenreRow(int(self.genre_ids[i]), self.genres.names[i])
+            for i in np.flatnonzero(self.genres.contains(genre))
+        ]
+
+    def get_songs_by_genre(
+        self,
+        genre: str,
+        sample_size: Optional[int] = None,
+        order: Optional[str] = None,
+        tracks_per_artist: int = 1
+    ) -> List[queries.TrackRow]:
+        """
+        Returns representative songs for every genre whose name contains `genre`.
+
+        Args:
+            genre (str): The genre name to search for.
+            sample_size (int): Maximum number of songs. Defaults to GENRE_SAMPLE_SIZE or 10.
+            order (str): One of queries.GENRE_ORDERINGS. Defaults to GENRE_SAMPLE_ORDER or "artist".
+            tracks_per_artist (int): Songs per artist, up to GENRE_SAMPLE_TRACKS_PER_ARTIST.
+
+        Returns:
+            List[TrackRow]: The sampled songs, in the same order as the SQLite backend.
+        """
+        if sample_size is None:
+            sample_size = int(os.getenv("GENRE_SAMPLE_SIZE", queries.DEFAULT_GENRE_SAMPLE_SIZE))
+        order = (order or os.getenv("GENRE_SAMPLE_ORDER", queries.DEFAULT_GENRE_ORDER)).strip().lower()
+        if order not in queries.GENRE_ORDERINGS:
+            raise ValueError(f"Unsupported genre order '{order}', expected one of {sorted(queries.GENRE_ORDERINGS)}")
+
+        genre_ids = self.genre_ids[self.genres.contains(genre)]
+        selected = np.flatnonzero(np.isin(self.sample_genre, genre_ids) & (self.sample_rank <= tracks_per_artist))
+        # Rank each artist's rows across the matched genres, as the SQL window does
+        # (np.lexsort sorts by the last key first)
+        selected = selected[np.lexsort(
+            [self.sample_genre[selected], self.sample_rank[selected], self.sample_artist_id[selected]]
+        )]
+        artists, first, artist_of = np.unique(self.sample_artist_id[selected], return_index=True, return_inverse=True)
+        artist_rank = np.arange(len(selected)) - first[artist_of] + 1
+        leading = self.sample_rank[selected] == 1
+        artist_sales = np.bincount(artist_of, weights=np.where(leading, self.sample_sales[selected], 0), minlength=len(artists))
+        artist_count = np.bincount(artist_of, weights=np.where(leading, self.sample_count[selected], 0), minlength=len(artists))
+
+        kept = artist_rank <= tracks_per_artist
+        selected, artist_of, artist_rank = selected[kept], artist_of[kept], artist_rank[kept]
+        keys = [artist_rank, self.sample_artist_id[selected], self.sample_artist_key[selected]]
+        if order == "popularity":
+            keys.append(-artist_sales[artist_of])
+        elif order == "tracks":
+            keys.append(-artist_count[artist_of])
+        ordered = selected[np.lexsort(keys)][:sample_size]
+        return [queries.TrackRow(self.sample_song[i], self.sample_artist[i]) for i in ordered]
+
+    def get_songs_by_title(self, song_title: str, limit: int = 20, mode: Optional[str] = None) -> List[queries.SongMatchRow]:
+        """Returns songs whose title matches `song_title`, up to `limit` rows."""
+        mode = mode or queries.get_search_mode()
+        selected = np.flatnonzero(self.tracks.match(song_title, mode))
+        order = self._rank(self.tracks.lengths[selected], self.track_ids[selected], mode)
+        rows = []
+        for i in selected[apply_limit(order, limit)]:
+            album = self.track_album[i]
+            rows.append(queries.SongMatchRow(
+                self.tracks.names[i],
+                self.albums.names[album] if album >= 0 else None,
+                self._artist_name(self.album_artist[album]) if album >= 0 else None
+            ))
+        return rows
+
+
+_columnar_catalog: Optional[ColumnarCatalog] = None
+_columnar_catalog_lock = threading.Lock()
+
+
+def _discard_columnar_catalog() -> None:
+    global _columnar_catalog
+    with _columnar_catalog_lock:
+        _columnar_catalog = None
+
+
+on_chinook_db_reset(_discard_columnar_catalog)
+
+
+def get_columnar_catalog() -> ColumnarCatalog:
+    """
+    Returns the shared columnar catalog, loading it from the snapshot on first use.
+
+    The catalog is discarded (and reloaded on the next call) when the database is reset.
+
+    Returns:
+        ColumnarCatalog: The process-wide catalog arrays.
+    """
+    global _columnar_catalog
+    if _columnar_catalog is None:
+        with _columnar_catalog_lock:
+            if _columnar_catalog is None:
+                _columnar_catalog = ColumnarCatalog()
+    return _columnar_catalog
+
+
+def get_catalog_backend_name() -> str:
+    """
+    Returns the configured catalog backend.
+
+    Set MUSIC_CATALOG_BACKEND to "arrays" to answer music tool queries from the columnar
+    in-memory engine instead of SQLite.
+
+    Returns:
+        str: Either CATALOG_BACKEND_SQLITE or CATALOG_BACKEND_ARRAYS.
+    """
+    backend = os.getenv("MUSIC_CATALOG_BACKEND", CATALOG_BACKEND_SQLITE).strip().lower()
+    if backend not in (CATALOG_BACKEND_SQLITE, CATALOG_BACKEND_ARRAYS):
+        raise ValueError(f"Unsupported MUSIC_CATALOG_BACKEND '{backend}', expected 'sqlite' or 'arrays'")
+    return backend
+
+
+def get_catalog_backend() -> Any:
+    """
+    Returns the object answering catalog queries for the configured backend.
+
+    Both backends provide get_albums_by_artist, get_tracks_by_artist, search_albums_by_title,
+    get_genres_by_name, get_songs_by_genre and get_songs_by_title with the same signatures.
+
+    Returns:
+        The da.queries module or the shared ColumnarCatalog.
+    """
+    if get_catalog_backend_name() == CATALOG_BACKEND_ARRAYS:
+        return get_columnar_catalog()
+    return queries
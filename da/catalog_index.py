@@ -0,0 +1,252 @@
+"""
+Derived indexes built into the Chinook snapshot.
+
+These are created when the snapshot is built (and added to older snapshots the first time they
+are loaded), so every engine mode - including the read-only one - can query them. The schema
+version is tracked in `PRAGMA user_version`.
+"""
+import sqlite3
+import logging
+
+# Bump whenever an index is added or changed so existing snapshots are upgraded on load
+CATALOG_INDEX_VERSION = 4
+
+# FTS5 tables over the catalog names. They are external-content tables, so the text lives only
+# in the base tables and the triggers below keep the index in sync with inserts, updates and deletes.
+SEARCH_INDEXES = {
+    # FTS table: (base table, key column, text column)
+    "ArtistSearch": ("Artist", "ArtistId", "Name"),
+    "AlbumSearch": ("Album", "AlbumId", "Title"),
+    "TrackSearch": ("Track", "TrackId", "Name"),
+}
+
+# Base tables whose changes are counted in TableVersion, so in-process indexes know when to refresh
+VERSIONED_TABLES = ("Customer",)
+
+# Number of representative tracks kept per artist and genre in GenreArtistSample
+GENRE_SAMPLE_TRACKS_PER_ARTIST = 3
+
+
+def get_catalog_index_version(connection: sqlite3.Connection) -> int:
+    """
+    Returns the index version recorded in the snapshot.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the snapshot.
+
+    Returns:
+        int: The recorded version, 0 for snapshots built before indexes existed.
+    """
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def create_search_indexes(connection: sqlite3.Connection) -> None:
+    """
+    Creates the FTS5 search tables and their sync triggers, then fills them from the base tables.
+
+    Args:
+        connection (sqlite3.Connection): A writable connection to the snapshot.
+    """
+    for fts_table, (table, key, column) in SEARCH_INDEXES.items():
+        connection.executescript(f"""
+            DROP TABLE IF EXISTS {fts_table};
+            CREATE VIRTUAL TABLE {fts_table} USING fts5(
+                {column},
+                content='{table}',
+                content_rowid='{key}',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table}(rowid, {column}) VALUES (new.{key}, new.{column});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {column}) VALUES ('delete', old.{key}, old.{column});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {column}) VALUES ('delete', old.{key}, old.{column});
+                INSERT INTO {fts_table}(rowid, {column}) VALUES (new.{key}, new.{column});
+            END;
+
+            INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild');
+        """)
+
+
+def create_genre_sample_index(connection: sqlite3.Connection) -> None:
+    """
+    Materializes representative tracks per genre and artist into GenreArtistSample.
+
+    For every (genre, artist) pair the best-selling tracks are kept (up to
+    GENRE_SAMPLE_TRACKS_PER_ARTIST, ties broken by TrackId) together with the artist's
+    track count and sales in that genre, so genre browsing is a single indexed lookup.
+
+    Args:
+        connection (sqlite3.Connection): A writable connection to the snapshot.
+    """
+    connection.executescript(f"""
+        DROP TABLE IF EXISTS GenreArtistSample;
+        CREATE TABLE GenreArtistSample AS
+        WITH TrackSales AS (
+            SELECT Track.TrackId, Track.Name AS SongName, Track.GenreId, Album.ArtistId,
+                   COALESCE(SUM(InvoiceLine.Quantity), 0) AS Sales
+            FROM Track
+            JOIN Album ON Track.AlbumId = Album.AlbumId
+            LEFT JOIN InvoiceLine ON InvoiceLine.TrackId = Track.TrackId
+            WHERE Track.GenreId IS NOT NULL
+            GROUP BY Track.TrackId
+        ),
+        Ranked AS (
+            SELECT TrackSales.*,
+                   ROW_NUMBER() OVER (PARTITION BY GenreId, ArtistId ORDER BY Sales DESC, TrackId) AS TrackRank,
+                   COUNT(*) OVER (PARTITION BY GenreId, ArtistId) AS ArtistTrackCount,
+                   SUM(Sales) OVER (PARTITION BY GenreId, ArtistId) AS ArtistSales
+            FROM TrackSales
+        )
+        SELECT Ranked.GenreId, Ranked.ArtistId, Artist.Name AS ArtistName, Ranked.TrackId,
+               Ranked.SongName, Ranked.TrackRank, Ranked.ArtistTrackCount, Ranked.ArtistSales
+        FROM Ranked
+        JOIN Artist ON Artist.ArtistId = Ranked.ArtistId
+        WHERE Ranked.TrackRank <= {GENRE_SAMPLE_TRACKS_PER_ARTIST};
+
+        CREATE INDEX IX_GenreArtistSample ON GenreArtistSample (GenreId, TrackRank);
+    """)
+
+
+def create_invoice_summary_index(connection: sqlite3.Connection) -> None:
+    """
+    Materializes per-customer invoice data used by the invoice tools.
+
+    CustomerInvoiceSummary holds one row per customer (invoice count, total spent, line item
+    count and latest invoice). CustomerLineItem denormalizes every invoice line with its
+    customer and track name, indexed by (CustomerId, UnitPrice) so the top-priced items are an
+    index range scan. Triggers refresh both incrementally when invoices and invoice lines are added.
+
+    Args:
+        connection (sqlite3.Connection): A writable connection to the snapshot.
+    """
+    connection.executescript("""
+        DROP TABLE IF EXISTS CustomerInvoiceSummary;
+        CREATE TABLE CustomerInvoiceSummary (
+            CustomerId INTEGER PRIMARY KEY,
+            InvoiceCount INTEGER NOT NULL,
+            TotalSpent NUMERIC(10,2) NOT NULL,
+            LineItemCount INTEGER NOT NULL,
+            LatestInvoiceId INTEGER,
+            LatestInvoiceDate DATETIME,
+            LatestInvoiceTotal NUMERIC(10,2)
+        );
+        INSERT INTO CustomerInvoiceSummary
+        SELECT Invoice.CustomerId,
+               COUNT(*),
+               SUM(Invoice.Total),
+               COALESCE(SUM((SELECT COUNT(*) FROM InvoiceLine WHERE InvoiceLine.InvoiceId = Invoice.InvoiceId)), 0),
+               Latest.InvoiceId,
+               Latest.InvoiceDate,
+               Latest.Total
+        FROM Invoice
+        JOIN Invoice AS Latest ON Latest.InvoiceId = (
+            SELECT InvoiceId FROM Invoice AS Candidate
+            WHERE Candidate.CustomerId = Invoice.CustomerId
+            ORDER BY Candidate.InvoiceDate DESC, Candidate.InvoiceId DESC
+            LIMIT 1
+        )
+        GROUP BY Invoice.CustomerId;
+
+        DROP TABLE IF EXISTS CustomerLineItem;
+        CREATE TABLE CustomerLineItem AS
+        SELECT Invoice.CustomerId, InvoiceLine.InvoiceId, Invoice.InvoiceDate, InvoiceLine.InvoiceLineId,
+               InvoiceLine.TrackId, Track.Name AS TrackName, InvoiceLine.UnitPrice, InvoiceLine.Quantity
+        FROM InvoiceLine
+        JOIN Invoice ON Invoice.InvoiceId = InvoiceLine.InvoiceId
+        LEFT JOIN Track ON Track.TrackId = InvoiceLine.TrackId;
+        CREATE INDEX IX_CustomerLineItem_UnitPrice ON CustomerLineItem (CustomerId, UnitPrice DESC, InvoiceLineId);
+
+        CREATE INDEX IF NOT EXISTS IX_Invoice_CustomerDate ON Invoice (CustomerId, InvoiceDate DESC);
+
+        CREATE TRIGGER IF NOT EXISTS CustomerInvoiceSummary_invoice_ai AFTER INSERT ON Invoice BEGIN
+            INSERT INTO CustomerInvoiceSummary (
+                CustomerId, InvoiceCount, TotalSpent, LineItemCount,
+                LatestInvoiceId, LatestInvoiceDate, LatestInvoiceTotal
+            )
+            VALUES (new.CustomerId, 1, new.Total, 0, new.InvoiceId, new.InvoiceDate, new.Total)
+            ON CONFLICT (CustomerId) DO UPDATE SET
+                InvoiceCount = InvoiceCount + 1,
+                TotalSpent = TotalSpent + excluded.TotalSpent,
+                LatestInvoiceId = CASE WHEN excluded.LatestInvoiceDate >= LatestInvoiceDate
+                                       THEN excluded.LatestInvoiceId ELSE LatestInvoiceId END,
+                LatestInvoiceTotal = CASE WHEN excluded.LatestInvoiceDate >= LatestInvoiceDate
+                                          THEN excluded.LatestInvoiceTotal ELSE LatestInvoiceTotal END,
+                LatestInvoiceDate = MAX(LatestInvoiceDate, excluded.LatestInvoiceDate);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS CustomerInvoiceSummary_line_ai AFTER INSERT ON InvoiceLine BEGIN
+            UPDATE CustomerInvoiceSummary
+            SET LineItemCount = LineItemCount + 1
+            WHERE CustomerId = (SELECT CustomerId FROM Invoice WHERE InvoiceId = new.InvoiceId);
+
+            INSERT INTO CustomerLineItem
+            SELECT Invoice.CustomerId, new.InvoiceId, Invoice.InvoiceDate, new.InvoiceLineId,
+                   new.TrackId, Track.Name, new.UnitPrice, new.Quantity
+            FROM Invoice
+            LEFT JOIN Track ON Track.TrackId = new.TrackId
+            WHERE Invoice.InvoiceId = new.InvoiceId;
+        END;
+    """)
+
+
+def create_table_versions(connection: sqlite3.Connection) -> None:
+    """
+    Creates TableVersion, a per-table change counter bumped by triggers on VERSIONED_TABLES.
+
+    In-process indexes built from a table compare the counter with the version they were built
+    from and rebuild when it moved.
+
+    Args:
+        connection (sqlite3.Connection): A writable connection to the snapshot.
+    """
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS TableVersion (
+            TableName TEXT PRIMARY KEY,
+            Version INTEGER NOT NULL
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        connection.execute("INSERT OR IGNORE INTO TableVersion (TableName, Version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            connection.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS TableVersion_{table}_{event.lower()} AFTER {event} ON {table} BEGIN
+                    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = '{table}';
+                END
+            """)
+
+
+def build_catalog_indexes(connection: sqlite3.Connection) -> None:
+    """
+    Builds every derived index and records CATALOG_INDEX_VERSION in the snapshot.
+
+    Args:
+        connection (sqlite3.Connection): A writable connection to the snapshot.
+    """
+    create_search_indexes(connection)
+    create_genre_sample_index(connection)
+    create_invoice_summary_index(connection)
+    create_table_versions(connection)
+    connection.execute(f"PRAGMA user_version = {CATALOG_INDEX_VERSION}")
+    connection.commit()
+    logging.info("Built catalog indexes (version %s)", CATALOG_INDEX_VERSION)
+
+
+def ensure_catalog_indexes(path: str) -> None:
+    """
+    Upgrades a snapshot built with an older index version.
+
+    Args:
+        path (str): The path of the SQLite snapshot file.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        if get_catalog_index_version(connection) < CATALOG_INDEX_VERSION:
+            build_catalog_indexes(connection)
+    finally:
+        connection.close()
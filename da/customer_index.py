@@ -0,0 +1,118 @@
+"""
+In-memory index from customer email and phone number to CustomerId.
+
+Customer identification runs on the first turn of every conversation, so lookups are served
+from two dictionaries built once from the Customer table. The index rebuilds itself when the
+Customer change counter in TableVersion moves (checked at most once per refresh interval) and
+when the shared database is reset.
+"""
+import os
+import re
+import time
+import logging
+import threading
+from typing import Dict, Optional
+from da import queries
+from da.db import on_chinook_db_reset
+
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+
+def normalize_email(email: str) -> str:
+    """
+    Normalizes an email address for lookup: surrounding whitespace is removed and case is folded.
+    """
+    return email.strip().casefold()
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Normalizes a phone number to an E.164-style string.
+
+    Spaces, dashes, dots and parentheses are stripped, keeping a leading '+',
+    e.g. "+55 (12) 3923-5555" becomes "+551239235555".
+    """
+    phone = phone.strip()
+    digits = re.sub(r"\D", "", phone)
+    return f"+{digits}" if phone.startswith("+") else digits
+
+
+class CustomerIdentifierIndex:
+    """
+    Hash index from normalized email and phone number to CustomerId.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        """
+        Args:
+            refresh_interval (float): Minimum seconds between checks of the Customer change counter.
+                                      Defaults to CUSTOMER_INDEX_REFRESH_INTERVAL or 1 second.
+        """
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("CUSTOMER_INDEX_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL))
+        self.refresh_interval = refresh_interval
+        self._by_email: Dict[str, int] = {}
+        self._by_phone: Dict[str, int] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """
+        Forces a rebuild on the next lookup.
+        """
+        with self._lock:
+            self._version = None
+
+    def refresh(self) -> None:
+        """
+        Rebuilds the index if it was never built or the Customer table changed since.
+        """
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            version = queries.get_table_version("Customer")
+            self._checked_at = now
+            if version == self._version:
+                return
+            by_email: Dict[str, int] = {}
+            by_phone: Dict[str, int] = {}
+            for row in queries.get_customer_identifiers():
+                if row.Email:
+                    by_email[normalize_email(row.Email)] = row.CustomerId
+                if row.Phone:
+                    phone = normalize_phone(row.Phone)
+                    by_phone[phone] = row.CustomerId
+                    # Also match numbers given without the leading '+'
+                    by_phone.setdefault(phone.lstrip("+"), row.CustomerId)
+            self._by_email, self._by_phone, self._version = by_email, by_phone, version
+            logging.info("Built customer identifier index with %s emails and %s phones", len(by_email), len(by_phone))
+
+    def get_by_email(self, email: str) -> Optional[int]:
+        """
+        Returns the CustomerId registered with the email, if any.
+        """
+        self.refresh()
+        return self._by_email.get(normalize_email(email))
+
+    def get_by_phone(self, phone: str) -> Optional[int]:
+        """
+        Returns the CustomerId registered with the phone number, if any.
+        """
+        self.refresh()
+        return self._by_phone.get(normalize_phone(phone))
+
+
+_customer_index = CustomerIdentifierIndex()
+on_chinook_db_reset(_customer_index.invalidate)
+
+
+def get_customer_index() -> CustomerIdentifierIndex:
+    """
+    Returns the shared customer identifier index.
+
+    Returns:
+        CustomerIdentifierIndex: The process-wide index.
+    """
+    return _customer_index
@@ -1,30 +1,222 @@
+import os
 import sqlite3
+import logging
+import threading
+from typing import Callable, List, Optional
 import requests
 # LangChain utility to interact with SQL databases
 from langchain_community.utilities.sql_database import SQLDatabase
 # SQLAlchemy function to create an engine
 from sqlalchemy import create_engine
-# SQLAlchemy connection pool class for in-memory databases
-from sqlalchemy.pool import StaticPool
+# SQLAlchemy connection pool classes for in-memory and read-only databases
+from sqlalchemy.pool import QueuePool, StaticPool
+from da.catalog_index import build_catalog_indexes, ensure_catalog_indexes
+from utils.executor import get_blocking_workers
+from utils.metrics import DB_INIT_DURATION
 
-def get_engine_for_chinook_db() -> create_engine:
+CHINOOK_SQL_URL = "https://raw.githubusercontent.com/lerocha/chinook-database/master/ChinookDatabase/DataSources/Chinook_Sqlite.sql"
+
+# Default location of the on-disk Chinook snapshot, relative to the project root
+DEFAULT_CHINOOK_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "chinook.sqlite"
+)
+
+# Engine modes: "memory" copies the snapshot into one shared in-memory connection,
+# "read" serves queries from a pool of read-only connections to the snapshot file
+CHINOOK_DB_MODE_MEMORY = "memory"
+CHINOOK_DB_MODE_READ = "read"
+
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+# Number of prepared statements each SQLite connection keeps in its statement cache
+DEFAULT_STATEMENT_CACHE_SIZE = 128
+
+# Shared instances so the catalog is built once per process
+_engine = None
+_db: Optional[SQLDatabase] = None
+_db_lock = threading.Lock()
+# Callbacks run whenever the shared database is reset, e.g. to drop cached query results
+_reset_listeners: List[Callable[[], None]] = []
+
+
+def get_chinook_db_path() -> str:
     """
-    Returns a SQLAlchemy engine for the Chinook database.
-    
-    This function creates an in-memory SQLite database engine that uses a static pool,
-    which is suitable for testing and development purposes.
-    
+    Returns the path of the on-disk Chinook snapshot.
+
+    The path can be overridden with the CHINOOK_DB_PATH environment variable.
+
     Returns:
-        create_engine: A SQLAlchemy engine connected to the Chinook database.
+        str: The path of the SQLite snapshot file.
+    """
+    return os.getenv("CHINOOK_DB_PATH", DEFAULT_CHINOOK_DB_PATH)
+
+
+def load_chinook_sql_script() -> str:
+    """
+    Returns the Chinook SQL script used to build the snapshot.
+
+    If CHINOOK_SQL_PATH points to a local script it is read from disk, otherwise the script
+    is downloaded from CHINOOK_SQL_URL (or the public Chinook repository).
+
+    Returns:
+        str: The Chinook SQL script.
+    """
+    sql_path = os.getenv("CHINOOK_SQL_PATH")
+    if sql_path:
+        logging.info("Loading Chinook SQL script from %s", sql_path)
+        with open(sql_path, "r", encoding="utf-8-sig") as f:
+            return f.read()
+
+    url = os.getenv("CHINOOK_SQL_URL", CHINOOK_SQL_URL)
+    logging.info("Downloading Chinook SQL script from %s", url)
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    return response.text
+
+
+def remove_sqlite_files(path: str) -> None:
+    """
+    Removes a SQLite database file and its journal files, ignoring those that do not exist.
+    """
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def build_chinook_snapshot(path: Optional[str] = None) -> str:
+    """
+    Builds the on-disk Chinook snapshot from the SQL script.
+
+    The script is executed into a temporary file which is atomically moved into place,
+    so concurrent processes never observe a half-built snapshot.
+
+    Args:
+        path (str): Where to write the snapshot. Defaults to get_chinook_db_path().
+
+    Returns:
+        str: The path of the written snapshot.
+    """
+    path = path or get_chinook_db_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    sql_script = load_chinook_sql_script()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # A build interrupted by a previous run with the same PID leaves its temporary file behind
+    remove_sqlite_files(tmp_path)
+    try:
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.executescript(sql_script)
+            connection.commit()
+            build_catalog_indexes(connection)
+            # WAL lets read-only connections in other threads and processes read without blocking
+            connection.execute("PRAGMA journal_mode=WAL")
+        finally:
+            connection.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_sqlite_files(tmp_path)
+        raise
+
+    logging.info("Built Chinook snapshot at %s", path)
+    return path
+
+
+def ensure_chinook_snapshot() -> str:
+    """
+    Returns the path of the Chinook snapshot, building it first if it does not exist yet.
+
+    Snapshots built by an older version are upgraded with the current catalog indexes.
+
+    Returns:
+        str: The path of the SQLite snapshot file.
+    """
+    path = get_chinook_db_path()
+    if not os.path.exists(path):
+        build_chinook_snapshot(path)
+    else:
+        ensure_catalog_indexes(path)
+    return path
+
+
+def get_chinook_db_mode() -> str:
+    """
+    Returns the configured engine mode for the Chinook database.
+
+    Set CHINOOK_DB_MODE to "read" to serve queries from a pool of read-only connections to the
+    snapshot file, sized by CHINOOK_READ_POOL_SIZE (default: the blocking executor's worker count),
+    otherwise the snapshot is copied into a single in-memory connection.
+
+    Returns:
+        str: Either CHINOOK_DB_MODE_MEMORY or CHINOOK_DB_MODE_READ.
+    """
+    mode = os.getenv("CHINOOK_DB_MODE", CHINOOK_DB_MODE_MEMORY).strip().lower()
+    if mode not in (CHINOOK_DB_MODE_MEMORY, CHINOOK_DB_MODE_READ):
+        raise ValueError(f"Unsupported CHINOOK_DB_MODE '{mode}', expected 'memory' or 'read'")
+    return mode
+
+
+def get_statement_cache_size() -> int:
+    """
+    Returns how many prepared statements each Chinook connection caches.
+
+    Queries issued with a constant SQL text and bound parameters are compiled once per
+    connection and reused from this cache. Override with CHINOOK_STATEMENT_CACHE_SIZE.
+
+    Returns:
+        int: The per-connection statement cache size.
+    """
+    return int(os.getenv("CHINOOK_STATEMENT_CACHE_SIZE", DEFAULT_STATEMENT_CACHE_SIZE))
+
+
+def connect_read_only(path: str) -> sqlite3.Connection:
+    """
+    Opens a read-only connection to the Chinook snapshot.
+
+    The connection is opened with `mode=ro`, has `query_only` enabled and memory-maps the
+    database file (CHINOOK_MMAP_SIZE bytes, 256 MiB by default) so reads avoid extra copies.
+
+    Args:
+        path (str): The path of the SQLite snapshot file.
+
+    Returns:
+        sqlite3.Connection: A read-only SQLite connection.
+    """
+    mmap_size = int(os.getenv("CHINOOK_MMAP_SIZE", DEFAULT_MMAP_SIZE))
+    connection = sqlite3.connect(
+        f"file:{path}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        cached_statements=get_statement_cache_size()
+    )
+    connection.execute("PRAGMA query_only=ON")
+    connection.execute(f"PRAGMA mmap_size={mmap_size}")
+    return connection
+
+
+def get_memory_engine_for_chinook_db() -> create_engine:
     """
-    url = "https://raw.githubusercontent.com/lerocha/chinook-database/master/ChinookDatabase/DataSources/Chinook_Sqlite.sql"
+    Returns a SQLAlchemy engine backed by an in-memory copy of the Chinook snapshot.
 
-    response = requests.get(url)
-    sql_script = response.text
+    All queries share one SQLite connection through a static pool.
 
-    # Create an in-memory SQLite database and execute the SQL script to set it up
-    connection = sqlite3.connect(":memory:", check_same_thread=False)
-    connection.executescript(sql_script)
+    Returns:
+        create_engine: A SQLAlchemy engine connected to the Chinook database.
+    """
+    snapshot_path = ensure_chinook_snapshot()
+
+    # Copy the snapshot into an in-memory SQLite database using the backup API
+    connection = sqlite3.connect(
+        ":memory:",
+        check_same_thread=False,
+        cached_statements=get_statement_cache_size()
+    )
+    source = sqlite3.connect(snapshot_path)
+    try:
+        source.backup(connection)
+    finally:
+        source.close()
 
     # Create a SQLAlchemy engine that uses the in-memory SQLite database
     # `creator=lambda: connection` tells SQLAlchemy to use the existing SQLite connection
@@ -38,15 +230,132 @@ def get_engine_for_chinook_db() -> create_engine:
         poolclass=StaticPool
     )
 
+
+def get_read_engine_for_chinook_db(pool_size: Optional[int] = None) -> create_engine:
+    """
+    Returns a read-optimized SQLAlchemy engine over the on-disk Chinook snapshot.
+
+    Every query checks out its own read-only connection (see connect_read_only), so concurrent
+    requests read in parallel instead of serializing on one shared connection.
+
+    Args:
+        pool_size (int): Number of idle connections to keep open. Defaults to CHINOOK_READ_POOL_SIZE,
+                         or the number of blocking executor threads.
+
+    Returns:
+        create_engine: A SQLAlchemy engine connected to the Chinook database.
+    """
+    snapshot_path = ensure_chinook_snapshot()
+    if pool_size is None:
+        pool_size = int(os.getenv("CHINOOK_READ_POOL_SIZE", 0)) or get_blocking_workers()
+
+    # `QueuePool` never closes a checked-out connection: beyond `pool_size`, extra connections
+    # are opened on demand (`max_overflow=-1`) and closed when returned
+    return create_engine(
+        "sqlite://",
+        creator=lambda: connect_read_only(snapshot_path),
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=-1
+    )
+
+
+def get_engine_for_chinook_db(mode: Optional[str] = None) -> create_engine:
+    """
+    Returns a SQLAlchemy engine for the Chinook database.
+
+    The snapshot is only built from the SQL script the first time, so subsequent starts
+    work fully offline.
+
+    Args:
+        mode (str): "memory" or "read". Defaults to get_chinook_db_mode().
+
+    Returns:
+        create_engine: A SQLAlchemy engine connected to the Chinook database.
+    """
+    mode = mode or get_chinook_db_mode()
+    if mode == CHINOOK_DB_MODE_READ:
+        return get_read_engine_for_chinook_db()
+    return get_memory_engine_for_chinook_db()
+
+
+def get_chinook_engine() -> create_engine:
+    """
+    Returns the shared SQLAlchemy engine for the Chinook database.
+
+    The engine is created once per process and shared by all callers.
+
+    Returns:
+        create_engine: The shared SQLAlchemy engine connected to the Chinook database.
+    """
+    global _engine
+    if _engine is None:
+        with _db_lock:
+            if _engine is None:
+                with DB_INIT_DURATION.time(component="engine"):
+                    _engine = get_engine_for_chinook_db()
+    return _engine
+
+
 def get_chinook_db() -> SQLDatabase:
     """
     Returns a SQLDatabase instance connected to the Chinook database.
-    
-    This function creates a SQLAlchemy engine for the Chinook database and then
-    returns a SQLDatabase instance that can be used to interact with the database.
-    
+
+    The SQLDatabase wraps the shared engine and is created once per process.
+
     Returns:
         SQLDatabase: An instance of SQLDatabase connected to the Chinook database.
     """
-    engine = get_engine_for_chinook_db()
-    return SQLDatabase(engine=engine)
\ No newline at end of file
+    global _db
+    if _db is None:
+        engine = get_chinook_engine()
+        with _db_lock:
+            if _db is None:
+                with DB_INIT_DURATION.time(component="sql_database"):
+                    _db = SQLDatabase(engine=engine)
+    return _db
+
+
+def on_chinook_db_reset(callback: Callable[[], None]) -> None:
+    """
+    Registers a callback to run whenever the shared Chinook database is reset.
+
+    Anything derived from catalog data (caches, in-memory indexes) should register here
+    so it is invalidated when the catalog is rebuilt.
+
+    Args:
+        callback (Callable): A function taking no arguments.
+    """
+    _reset_listeners.append(callback)
+
+
+def reset_chinook_db() -> None:
+    """
+    Drops the shared Chinook database so the next call to get_chinook_db() reloads the snapshot.
+
+    Registered reset listeners are notified afterwards.
+    """
+    global _engine, _db
+    with _db_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _db = None
+    for callback in list(_reset_listeners):
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"Error in Chinook reset listener {callback}: {e}")
+
+
+def rebuild_chinook_db() -> None:
+    """
+    Rebuilds the snapshot from the SQL script and reloads the shared database from it.
+    """
+    build_chinook_snapshot()
+    reset_chinook_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_chinook_snapshot()
@@ -7,6 +7,7 @@ to save and load user preferences and other long-term memory data.
 from typing import Optional
 from langchain_core.runnables import RunnableConfig
 from da.memory import get_preferences_store
+from utils.executor import run_blocking
 import logging
 
 
@@ -70,6 +71,20 @@ def save_user_preferences(customer_id: str, preferences: str, config: Optional[R
         return False
 
 
+async def aload_user_preferences(customer_id: str, config: Optional[RunnableConfig] = None) -> str:
+    """
+    Async variant of load_user_preferences; the store is read on the blocking executor.
+    """
+    return await run_blocking(load_user_preferences, customer_id, config)
+
+
+async def asave_user_preferences(customer_id: str, preferences: str, config: Optional[RunnableConfig] = None) -> bool:
+    """
+    Async variant of save_user_preferences; the store is written on the blocking executor.
+    """
+    return await run_blocking(save_user_preferences, customer_id, preferences, config)
+
+
 def extract_preferences_from_messages(messages: list) -> Optional[str]:
     """
     Extract user preferences from conversation messages.
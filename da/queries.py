@@ -0,0 +1,439 @@
+"""
+Parameterized queries against the Chinook database.
+
+Every statement is a constant SQL string with `?` placeholders. Executing the same text with
+bound parameters lets each SQLite connection reuse the prepared statement from its statement
+cache (see da.db.get_statement_cache_size), keeps user input out of the SQL text and returns
+typed rows directly instead of a stringified result that has to be parsed again.
+"""
+import os
+import re
+from typing import Any, List, NamedTuple, Optional, Sequence, Type, TypeVar
+from da.db import get_chinook_engine
+from utils.metrics import SQL_DURATION
+
+Row = TypeVar("Row", bound=tuple)
+
+# Search modes for name lookups: "fts" uses the FTS5 indexes from da.catalog_index with ranked
+# prefix matching, "like" scans the base tables with a substring LIKE
+SEARCH_MODE_FTS = "fts"
+SEARCH_MODE_LIKE = "like"
+
+# Orderings for genre samples from GenreArtistSample
+GENRE_ORDERINGS = {
+    "artist": "Matched.ArtistName",
+    "popularity": "Matched.MatchedSales DESC, Matched.ArtistName",
+    "tracks": "Matched.MatchedTrackCount DESC, Matched.ArtistName",
+}
+DEFAULT_GENRE_SAMPLE_SIZE = 10
+DEFAULT_GENRE_ORDER = "artist"
+
+
+class AlbumRow(NamedTuple):
+    Title: str
+    ArtistName: str
+
+
+class TrackRow(NamedTuple):
+    SongName: str
+    ArtistName: str
+
+
+class SongMatchRow(NamedTuple):
+    Name: str
+    Title: str
+    ArtistName: str
+
+
+class GenreRow(NamedTuple):
+    GenreId: int
+    Name: str
+
+
+class InvoiceRow(NamedTuple):
+    InvoiceId: int
+    CustomerId: int
+    InvoiceDate: str
+    BillingAddress: Optional[str]
+    BillingCity: Optional[str]
+    BillingState: Optional[str]
+    BillingCountry: Optional[str]
+    BillingPostalCode: Optional[str]
+    Total: float
+
+
+class InvoiceSummaryRow(NamedTuple):
+    CustomerId: int
+    InvoiceCount: int
+    TotalSpent: float
+    LineItemCount: int
+    LatestInvoiceId: Optional[int]
+    LatestInvoiceDate: Optional[str]
+    LatestInvoiceTotal: Optional[float]
+
+
+class LineItemRow(NamedTuple):
+    InvoiceId: int
+    InvoiceDate: str
+    TrackName: Optional[str]
+    UnitPrice: float
+    Quantity: int
+
+
+class CustomerIdentifierRow(NamedTuple):
+    CustomerId: int
+    Email: Optional[str]
+    Phone: Optional[str]
+
+
+class EmployeeRow(NamedTuple):
+    FirstName: str
+    Title: Optional[str]
+    Email: Optional[str]
+
+
+INVOICE_COLUMNS = """
+    Invoice.InvoiceId, Invoice.CustomerId, Invoice.InvoiceDate, Invoice.BillingAddress,
+    Invoice.BillingCity, Invoice.BillingState, Invoice.BillingCountry, Invoice.BillingPostalCode,
+    Invoice.Total
+"""
+
+ALBUMS_BY_ARTIST = """
+    SELECT Album.Title, Artist.Name AS ArtistName
+    FROM Album
+    JOIN Artist ON Album.ArtistId = Artist.ArtistId
+    WHERE Artist.Name LIKE ? ESCAPE '\\'
+    ORDER BY Album.AlbumId
+    LIMIT ?
+"""
+
+TRACKS_BY_ARTIST = """
+    SELECT Track.Name AS SongName, Artist.Name AS ArtistName
+    FROM Album
+    LEFT JOIN Track ON Track.AlbumId = Album.AlbumId
+    LEFT JOIN Artist ON Album.ArtistId = Artist.ArtistId
+    WHERE Artist.Name LIKE ? ESCAPE '\\'
+    ORDER BY Track.TrackId
+    LIMIT ?
+"""
+
+GENRES_BY_NAME = """
+    SELECT GenreId, Name
+    FROM Genre
+    WHERE Name LIKE ? ESCAPE '\\'
+"""
+
+# Several genres can match (e.g. "Rock" and "Rock And Roll"), so an artist's sample rows are
+# ranked across the matched genres and its sales and track counts are summed over them
+GENRE_SAMPLE = """
+    WITH Matched AS (
+        SELECT GenreArtistSample.*,
+               ROW_NUMBER() OVER (PARTITION BY ArtistId ORDER BY TrackRank, GenreId) AS ArtistRank,
+               SUM(CASE WHEN TrackRank = 1 THEN ArtistSales END) OVER (PARTITION BY ArtistId) AS MatchedSales,
+               SUM(CASE WHEN TrackRank = 1 THEN ArtistTrackCount END) OVER (PARTITION BY ArtistId) AS MatchedTrackCount
+        FROM GenreArtistSample
+        WHERE GenreArtistSample.GenreId IN (SELECT GenreId FROM Genre WHERE Name LIKE ? ESCAPE '\\')
+          AND GenreArtistSample.TrackRank <= ?
+    )
+    SELECT Matched.SongName, Matched.ArtistName
+    FROM Matched
+    WHERE Matched.ArtistRank <= ?
+    ORDER BY {ordering}, Matched.ArtistId, Matched.ArtistRank
+    LIMIT ?
+"""
+
+SONGS_BY_TITLE = """
+    SELECT Track.Name, Album.Title, Artist.Name AS ArtistName
+    FROM Track
+    LEFT JOIN Album ON Track.AlbumId = Album.AlbumId
+    LEFT JOIN Artist ON Album.ArtistId = Artist.ArtistId
+    WHERE Track.Name LIKE ? ESCAPE '\\'
+    LIMIT ?
+"""
+
+ALBUMS_BY_ARTIST_SEARCH = """
+    SELECT Album.Title, Artist.Name AS ArtistName
+    FROM ArtistSearch
+    JOIN Artist ON Artist.ArtistId = ArtistSearch.rowid
+    JOIN Album ON Album.ArtistId = Artist.ArtistId
+    WHERE ArtistSearch MATCH ?
+    ORDER BY ArtistSearch.rank, Album.AlbumId
+    LIMIT ?
+"""
+
+TRACKS_BY_ARTIST_SEARCH = """
+    SELECT Track.Name AS SongName, Artist.Name AS ArtistName
+    FROM ArtistSearch
+    JOIN Artist ON Artist.ArtistId = ArtistSearch.rowid
+    JOIN Album ON Album.ArtistId = Artist.ArtistId
+    LEFT JOIN Track ON Track.AlbumId = Album.AlbumId
+    WHERE ArtistSearch MATCH ?
+    ORDER BY ArtistSearch.rank, Track.TrackId
+    LIMIT ?
+"""
+
+ALBUMS_BY_TITLE_SEARCH = """
+    SELECT Album.Title, Artist.Name AS ArtistName
+    FROM AlbumSearch
+    JOIN Album ON Album.AlbumId = AlbumSearch.rowid
+    JOIN Artist ON Artist.ArtistId = Album.ArtistId
+    WHERE AlbumSearch MATCH ?
+    ORDER BY AlbumSearch.rank
+    LIMIT ?
+"""
+
+SONGS_BY_TITLE_SEARCH = """
+    SELECT Track.Name, Album.Title, Artist.Name AS ArtistName
+    FROM TrackSearch
+    JOIN Track ON Track.TrackId = TrackSearch.rowid
+    LEFT JOIN Album ON Track.AlbumId = Album.AlbumId
+    LEFT JOIN Artist ON Album.ArtistId = Artist.ArtistId
+    WHERE TrackSearch MATCH ?
+    ORDER BY TrackSearch.rank
+    LIMIT ?
+"""
+
+INVOICES_BY_CUSTOMER_SORTED_BY_DATE = f"""
+    SELECT {INVOICE_COLUMNS}
+    FROM Invoice
+    WHERE Invoice.CustomerId = ?
+    ORDER BY Invoice.InvoiceDate DESC
+    LIMIT ?
+"""
+
+INVOICE_SUMMARY_BY_CUSTOMER = """
+    SELECT CustomerId, InvoiceCount, ROUND(TotalSpent, 2), LineItemCount,
+           LatestInvoiceId, LatestInvoiceDate, LatestInvoiceTotal
+    FROM CustomerInvoiceSummary
+    WHERE CustomerId = ?
+"""
+
+LINE_ITEMS_BY_CUSTOMER_SORTED_BY_UNIT_PRICE = """
+    SELECT InvoiceId, InvoiceDate, TrackName, UnitPrice, Quantity
+    FROM CustomerLineItem
+    WHERE CustomerId = ?
+    ORDER BY UnitPrice DESC, InvoiceLineId
+    LIMIT ?
+"""
+
+EMPLOYEE_BY_INVOICE_AND_CUSTOMER = """
+    SELECT Employee.FirstName, Employee.Title, Employee.Email
+    FROM Employee
+    JOIN Customer ON Customer.SupportRepId = Employee.EmployeeId
+    JOIN Invoice ON Invoice.CustomerId = Customer.CustomerId
+    WHERE Invoice.InvoiceId = ? AND Invoice.CustomerId = ?
+"""
+
+CUSTOMER_IDENTIFIERS = "SELECT CustomerId, Email, Phone FROM Customer"
+
+TABLE_VERSION = "SELECT Version FROM TableVersion WHERE TableName = ?"
+
+
+def fetch_all(statement: str, params: Sequence[Any], row_type: Type[Row]) -> List[Row]:
+    """
+    Executes a parameterized statement and returns all rows as typed objects.
+
+    Args:
+        statement (str): A constant SQL statement with `?` placeholders.
+        params (Sequence): The values bound to the placeholders.
+        row_type (Type): The NamedTuple each row is converted to.
+
+    Returns:
+        List: The rows returned by the statement.
+    """
+    connection = get_chinook_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        try:
+            with SQL_DURATION.time(query=row_type.__name__):
+                cursor.execute(statement, tuple(params))
+                rows = cursor.fetchall()
+            return [row_type(*row) for row in rows]
+        finally:
+            cursor.close()
+    finally:
+        connection.close()
+
+
+def fetch_scalar(statement: str, params: Sequence[Any]) -> Any:
+    """
+    Executes a parameterized statement and returns the first column of the first row.
+
+    Args:
+        statement (str): A constant SQL statement with `?` placeholders.
+        params (Sequence): The values bound to the placeholders.
+
+    Returns:
+        Any: The value, or None if the statement returned no rows.
+    """
+    connection = get_chinook_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        try:
+            with SQL_DURATION.time(query="scalar"):
+                cursor.execute(statement, tuple(params))
+                row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+    finally:
+        connection.close()
+
+
+def contains_pattern(term: str) -> str:
+    """
+    Builds a LIKE pattern matching values that contain the term.
+
+    LIKE wildcards in the term are escaped so they match literally.
+
+    Args:
+        term (str): The search term.
+
+    Returns:
+        str: The pattern to bind to a `LIKE ? ESCAPE '\\'` placeholder.
+    """
+    escaped = term.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def get_search_mode() -> str:
+    """
+    Returns the configured search mode for name lookups.
+
+    Set MUSIC_SEARCH_MODE to "like" to fall back to substring scans of the base tables.
+
+    Returns:
+        str: Either SEARCH_MODE_FTS or SEARCH_MODE_LIKE.
+    """
+    mode = os.getenv("MUSIC_SEARCH_MODE", SEARCH_MODE_FTS).strip().lower()
+    if mode not in (SEARCH_MODE_FTS, SEARCH_MODE_LIKE):
+        raise ValueError(f"Unsupported MUSIC_SEARCH_MODE '{mode}', expected 'fts' or 'like'")
+    return mode
+
+
+def match_expression(term: str) -> str:
+    """
+    Builds an FTS5 MATCH expression that prefix-matches every word of the term.
+
+    Each word is quoted so FTS5 operators in user input are treated as plain text,
+    e.g. "rolling sto" becomes `"rolling"* "sto"*`.
+
+    Args:
+        term (str): The search term.
+
+    Returns:
+        str: The expression to bind to a `MATCH ?` placeholder, or "" if the term has no words.
+    """
+    words = re.findall(r"\w+", term.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def get_albums_by_artist(artist: str, mode: Optional[str] = None, limit: Optional[int] = None) -> List[AlbumRow]:
+    """Returns the albums of every artist matching `artist` (up to `limit` rows), best matches first in FTS mode."""
+    limit = -1 if limit is None else limit
+    if (mode or get_search_mode()) == SEARCH_MODE_LIKE:
+        return fetch_all(ALBUMS_BY_ARTIST, (contains_pattern(artist), limit), AlbumRow)
+    expression = match_expression(artist)
+    return fetch_all(ALBUMS_BY_ARTIST_SEARCH, (expression, limit), AlbumRow) if expression else []
+
+
+def get_tracks_by_artist(artist: str, mode: Optional[str] = None, limit: Optional[int] = None) -> List[TrackRow]:
+    """Returns the tracks of every artist matching `artist` (up to `limit` rows), best matches first in FTS mode."""
+    limit = -1 if limit is None else limit
+    if (mode or get_search_mode()) == SEARCH_MODE_LIKE:
+        return fetch_all(TRACKS_BY_ARTIST, (contains_pattern(artist), limit), TrackRow)
+    expression = match_expression(artist)
+    return fetch_all(TRACKS_BY_ARTIST_SEARCH, (expression, limit), TrackRow) if expression else []
+
+
+def search_albums_by_title(title: str, limit: int = 20) -> List[AlbumRow]:
+    """Returns albums whose title prefix-matches `title`, best matches first."""
+    expression = match_expression(title)
+    return fetch_all(ALBUMS_BY_TITLE_SEARCH, (expression, limit), AlbumRow) if expression else []
+
+
+def get_genres_by_name(genre: str) -> List[GenreRow]:
+    """Returns the genres whose name contains `genre`."""
+    return fetch_all(GENRES_BY_NAME, (contains_pattern(genre),), GenreRow)
+
+
+def get_songs_by_genre(
+    genre: str,
+    sample_size: Optional[int] = None,
+    order: Optional[str] = None,
+    tracks_per_artist: int = 1
+) -> List[TrackRow]:
+    """
+    Returns representative songs for every genre whose name contains `genre`.
+
+    Answered from the GenreArtistSample table built with the snapshot in a single query. An artist
+    contributes at most `tracks_per_artist` songs, even when several of its genres match.
+
+    Args:
+        genre (str): The genre name to search for.
+        sample_size (int): Maximum number of songs. Defaults to GENRE_SAMPLE_SIZE or 10.
+        order (str): One of GENRE_ORDERINGS. Defaults to GENRE_SAMPLE_ORDER or "artist".
+        tracks_per_artist (int): Songs per artist, up to GENRE_SAMPLE_TRACKS_PER_ARTIST.
+
+    Returns:
+        List[TrackRow]: The sampled songs.
+    """
+    if sample_size is None:
+        sample_size = int(os.getenv("GENRE_SAMPLE_SIZE", DEFAULT_GENRE_SAMPLE_SIZE))
+    order = (order or os.getenv("GENRE_SAMPLE_ORDER", DEFAULT_GENRE_ORDER)).strip().lower()
+    if order not in GENRE_ORDERINGS:
+        raise ValueError(f"Unsupported genre order '{order}', expected one of {sorted(GENRE_ORDERINGS)}")
+    statement = GENRE_SAMPLE.format(ordering=GENRE_ORDERINGS[order])
+    return fetch_all(statement, (contains_pattern(genre), tracks_per_artist, tracks_per_artist, sample_size), TrackRow)
+
+
+def get_songs_by_title(song_title: str, limit: int = 20, mode: Optional[str] = None) -> List[SongMatchRow]:
+    """Returns songs whose title matches `song_title`, up to `limit` rows, best matches first in FTS mode."""
+    if (mode or get_search_mode()) == SEARCH_MODE_LIKE:
+        return fetch_all(SONGS_BY_TITLE, (contains_pattern(song_title), limit), SongMatchRow)
+    expression = match_expression(song_title)
+    return fetch_all(SONGS_BY_TITLE_SEARCH, (expression, limit), SongMatchRow) if expression else []
+
+
+def get_invoices_by_customer_sorted_by_date(customer_id: int, limit: int = 10) -> List[InvoiceRow]:
+    """Returns the customer's `limit` most recent invoices, newest first."""
+    return fetch_all(INVOICES_BY_CUSTOMER_SORTED_BY_DATE, (customer_id, limit), InvoiceRow)
+
+
+def get_invoice_summary(customer_id: int) -> Optional[InvoiceSummaryRow]:
+    """Returns the materialized invoice summary for the customer, if they have any invoices."""
+    rows = fetch_all(INVOICE_SUMMARY_BY_CUSTOMER, (customer_id,), InvoiceSummaryRow)
+    return rows[0] if rows else None
+
+
+def get_line_items_sorted_by_unit_price(customer_id: int, limit: int = 10) -> List[LineItemRow]:
+    """Returns the customer's `limit` most expensive invoice lines."""
+    return fetch_all(LINE_ITEMS_BY_CUSTOMER_SORTED_BY_UNIT_PRICE, (customer_id, limit), LineItemRow)
+
+
+def get_employee_by_invoice_and_customer(invoice_id: int, customer_id: int) -> List[EmployeeRow]:
+    """Returns the support representative for the customer's invoice."""
+    return fetch_all(EMPLOYEE_BY_INVOICE_AND_CUSTOMER, (invoice_id, customer_id), EmployeeRow)
+
+
+def get_customer_identifiers() -> List[CustomerIdentifierRow]:
+    """Returns the ID, email and phone number of every customer."""
+    return fetch_all(CUSTOMER_IDENTIFIERS, (), CustomerIdentifierRow)
+
+
+def get_table_version(table: str) -> int:
+    """Returns the change counter of a table tracked in TableVersion."""
+    return fetch_scalar(TABLE_VERSION, (table,)) or 0
+
+
+def as_dicts(rows: Sequence[tuple]) -> List[dict]:
+    """
+    Converts typed rows into plain dictionaries for tool output.
+
+    Args:
+        rows (Sequence): NamedTuple rows returned by the query functions.
+
+    Returns:
+        List[dict]: One dictionary per row keyed by column name.
+    """
+    return [row._asdict() for row in rows]
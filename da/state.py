@@ -1,5 +1,5 @@
 from typing_extensions import TypedDict
-from typing import Annotated
+from typing import Annotated, Dict
 from langgraph.graph.message import AnyMessage, add_messages
 from langgraph.managed.is_last_step import RemainingSteps
 
@@ -24,4 +24,7 @@ class State(TypedDict, total=False):
     loaded_memory: str
     
     # next_agent: Used by supervisor to route to the next agent
-    next_agent: str
\ No newline at end of file
+    next_agent: str
+
+    # intent_parts: Set by the supervisor for multi-intent messages, mapping each intent to its part of the message
+    intent_parts: Dict[str, str]
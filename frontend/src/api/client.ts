@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { ChatRequest, ChatResponse, ConversationHistory } from '../types';
+import type { ChatRequest, ChatResponse, ConversationHistory, ConversationQuery, StreamEvent } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -10,15 +10,90 @@ const apiClient = axios.create({
   },
 });
 
+/** Parses one Server-Sent Events message into the event carried in its data lines. */
+function parseStreamEvent(message: string): StreamEvent | null {
+  const data = message
+    .split('\n')
+    .filter((line) => line.startsWith('data:'))
+    .map((line) => line.slice(5).trimStart())
+    .join('\n');
+  return data ? (JSON.parse(data) as StreamEvent) : null;
+}
+
 export const chatApi = {
   async sendMessage(request: ChatRequest): Promise<ChatResponse> {
     const response = await apiClient.post<ChatResponse>('/api/chat', request);
     return response.data;
   },
 
-  async getConversation(threadId: string): Promise<ConversationHistory> {
+  /**
+   * Sends a message to /api/chat/stream and calls onEvent for each Server-Sent Event
+   * (routing, tool calls, reply tokens) as it arrives. Resolves with the final reply.
+   */
+  async streamMessage(
+    request: ChatRequest,
+    onEvent: (event: StreamEvent) => void,
+    signal?: AbortSignal
+  ): Promise<ChatResponse> {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: 'text/event-stream',
+      },
+      body: JSON.stringify(request),
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let reply: ChatResponse | null = null;
+
+    const handle = (message: string) => {
+      const event = parseStreamEvent(message);
+      if (!event) return;
+      onEvent(event);
+      if (event.type === 'message') {
+        reply = {
+          message: event.message,
+          thread_id: event.thread_id,
+          customer_id: event.customer_id,
+          agent_name: event.agent_name,
+        };
+      } else if (event.type === 'error') {
+        throw new Error(event.detail);
+      }
+    };
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        handle(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+    handle(buffer + decoder.decode());
+
+    const finalReply = reply as ChatResponse | null;
+    if (!finalReply) {
+      throw new Error('The response stream ended without a reply');
+    }
+    return finalReply;
+  },
+
+  // The browser revalidates with the page's ETag, so polling an unchanged thread costs a 304
+  async getConversation(threadId: string, query: ConversationQuery = {}): Promise<ConversationHistory> {
     const response = await apiClient.get<ConversationHistory>(
-      `/api/conversation/${threadId}`
+      `/api/conversation/${threadId}`,
+      { params: query }
     );
     return response.data;
   },
@@ -1,15 +1,23 @@
 import { useState, useRef, useEffect } from 'react';
 import { chatApi } from '../api/client';
-import type { ChatMessage } from '../types';
+import type { ChatMessage, StreamEvent } from '../types';
 import MessageList from './MessageList';
 import MessageInput from './MessageInput';
 import './ChatInterface.css';
 
+const ROUTE_STATUS: Record<string, string> = {
+  music_catalog_subagent: 'Searching the music catalog...',
+  invoice_info_subagent: 'Checking your purchases...',
+  fan_out: 'Checking the catalog and your purchases...',
+};
+
 function ChatInterface() {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [isLoading, setIsLoading] = useState(false);
   const [threadId, setThreadId] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [streamingReply, setStreamingReply] = useState('');
+  const [status, setStatus] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -18,7 +26,27 @@ function ChatInterface() {
 
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [messages, streamingReply]);
+
+  const handleStreamEvent = (event: StreamEvent) => {
+    switch (event.type) {
+      case 'start':
+        if (!threadId) setThreadId(event.thread_id);
+        break;
+      case 'route':
+        setStatus(ROUTE_STATUS[event.agent] ?? null);
+        break;
+      case 'tool_start':
+        setStatus(`Looking up ${event.tool.replace(/_/g, ' ')}...`);
+        break;
+      case 'tool_end':
+        setStatus('Writing the answer...');
+        break;
+      case 'token':
+        setStreamingReply((prev) => prev + event.content);
+        break;
+    }
+  };
 
   const handleSendMessage = async (content: string) => {
     if (!content.trim() || isLoading) return;
@@ -32,12 +60,18 @@ function ChatInterface() {
     setMessages((prev) => [...prev, userMessage]);
     setIsLoading(true);
     setError(null);
+    setStreamingReply('');
+    setStatus(null);
 
     try {
-      const response = await chatApi.sendMessage({
-        message: content.trim(),
-        thread_id: threadId || undefined,
-      });
+      // Routing, tool calls and reply tokens arrive as they happen; the final reply replaces the tokens
+      const response = await chatApi.streamMessage(
+        {
+          message: content.trim(),
+          thread_id: threadId || undefined,
+        },
+        handleStreamEvent
+      );
 
       if (response.thread_id && !threadId) {
         setThreadId(response.thread_id);
@@ -63,6 +97,8 @@ function ChatInterface() {
       setMessages((prev) => [...prev, errorResponse]);
     } finally {
       setIsLoading(false);
+      setStreamingReply('');
+      setStatus(null);
     }
   };
 
@@ -79,6 +115,8 @@ function ChatInterface() {
           messages={messages}
           isLoading={isLoading}
           error={error}
+          streamingReply={streamingReply}
+          status={status}
         />
         <div ref={messagesEndRef} />
       </div>
@@ -1,6 +1,10 @@
 import './LoadingIndicator.css';
 
-function LoadingIndicator() {
+interface LoadingIndicatorProps {
+  status?: string | null;
+}
+
+function LoadingIndicator({ status }: LoadingIndicatorProps) {
   return (
     <div className="loading-indicator">
       <div className="loading-dots">
@@ -8,7 +12,7 @@ function LoadingIndicator() {
         <span></span>
         <span></span>
       </div>
-      <p>Assistant is thinking...</p>
+      <p>{status || 'Assistant is thinking...'}</p>
     </div>
   );
 }
@@ -7,9 +7,11 @@ interface MessageListProps {
   messages: ChatMessage[];
   isLoading: boolean;
   error: string | null;
+  streamingReply?: string;
+  status?: string | null;
 }
 
-function MessageList({ messages, isLoading, error }: MessageListProps) {
+function MessageList({ messages, isLoading, error, streamingReply, status }: MessageListProps) {
   if (messages.length === 0 && !isLoading && !error) {
     return (
       <div className="message-list empty">
@@ -34,7 +36,10 @@ function MessageList({ messages, isLoading, error }: MessageListProps) {
       {messages.map((message, index) => (
         <Message key={index} message={message} />
       ))}
-      {isLoading && <LoadingIndicator />}
+      {isLoading && streamingReply && (
+        <Message message={{ role: 'assistant', content: streamingReply }} />
+      )}
+      {isLoading && !streamingReply && <LoadingIndicator status={status} />}
       {error && (
         <div className="error-message">
           ⚠️ {error}
@@ -2,6 +2,7 @@ export interface ChatMessage {
   role: 'user' | 'assistant';
   content: string;
   timestamp?: string;
+  id?: string;
 }
 
 export interface ChatRequest {
@@ -21,5 +22,25 @@ export interface ConversationHistory {
   thread_id: string;
   messages: ChatMessage[];
   customer_id?: string;
+  prev_cursor?: string | null;
+  next_cursor?: string | null;
+  reset?: boolean;
 }
 
+export interface ConversationQuery {
+  limit?: number;
+  before?: string;
+  after?: string;
+  since?: string;
+  chat_only?: boolean;
+}
+
+
+export type StreamEvent =
+  | { type: 'start'; thread_id: string }
+  | { type: 'route'; agent: string; intents?: string[] }
+  | { type: 'token'; content: string; agent?: string }
+  | { type: 'tool_start'; id: string; tool: string; input: unknown }
+  | { type: 'tool_end'; id: string; tool: string; status: 'ok' | 'error'; output: string }
+  | ({ type: 'message' } & ChatResponse)
+  | { type: 'error'; detail: string };
@@ -6,10 +6,15 @@ customer queries about music catalog and invoice information.
 """
 import sys
 import os
+import json
 import uuid
+import asyncio
 import logging
+import contextlib
+from typing import Optional
 from langchain_core.messages import HumanMessage
 from agents.supervisor.digital_store import get_digital_store_agent
+from utils.batch import arun_batch
 from utils.state_utils import create_initial_state
 from utils.env import load_environment_variables
 
@@ -112,6 +117,46 @@ def run_example_queries():
     print("="*60 + "\n")
 
 
+def run_batch(input_path: str, output_path: Optional[str] = None, concurrency: Optional[int] = None) -> int:
+    """
+    Answer a JSONL file of {message, thread_id, customer_id, id} items concurrently.
+    
+    Results are written as NDJSON, one line per item in completion order, with the same fields
+    as /api/chat/batch.
+    
+    Args:
+        input_path (str): The JSONL file of items.
+        output_path (str): The NDJSON file to write. Defaults to stdout.
+        concurrency (int): Turns in flight at once. Defaults to BATCH_CONCURRENCY.
+    
+    Returns:
+        int: The number of items that failed.
+    """
+    # Keep stdout for the results
+    with contextlib.redirect_stdout(sys.stderr):
+        load_environment_variables()
+    
+    with open(input_path) as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    agent = get_digital_store_agent()
+    
+    async def run(output) -> int:
+        failed = 0
+        async for result in arun_batch(agent, items, concurrency):
+            failed += result["status"] != "ok"
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+        return failed
+    
+    if output_path:
+        with open(output_path, "w") as output:
+            failed = asyncio.run(run(output))
+    else:
+        failed = asyncio.run(run(sys.stdout))
+    logging.info(f"Batch finished: {len(items) - failed} answered, {failed} failed")
+    return failed
+
+
 def interactive_mode():
     """
     Run the agent in interactive mode where users can enter queries.
@@ -159,6 +204,15 @@ def interactive_mode():
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--interactive":
         interactive_mode()
+    elif len(sys.argv) > 2 and sys.argv[1] == "--batch":
+        # python main.py --batch questions.jsonl [results.ndjson] [--concurrency N]
+        args = sys.argv[2:]
+        concurrency = None
+        if "--concurrency" in args:
+            position = args.index("--concurrency")
+            concurrency = int(args[position + 1])
+            del args[position:position + 2]
+        sys.exit(1 if run_batch(args[0], args[1] if len(args) > 1 else None, concurrency) else 0)
     else:
         run_example_queries()
 
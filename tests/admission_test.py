@@ -0,0 +1,190 @@
+import json
+import asyncio
+import pytest
+from fastapi import HTTPException, WebSocketDisconnect
+import api.server as server
+from api.admission import (
+    ABORTED,
+    QUEUE_DEPTH,
+    SHED,
+    AdmissionController,
+    AdmissionRejected,
+    ClientDisconnected,
+    DeadlineExceeded,
+    run_until_done,
+)
+
+
+def test_requests_queue_for_a_slot_in_arrival_order():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_per_key=0, max_queue=5, queue_timeout=1)
+        order = []
+
+        async def turn(name):
+            async with controller.admit():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.ensure_future(turn("a"))
+        await asyncio.sleep(0)
+        rest = [asyncio.ensure_future(turn(name)) for name in "bcd"]
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 3
+        assert QUEUE_DEPTH.value() == 3
+        await asyncio.gather(first, *rest)
+        return order, controller.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["a", "b", "c", "d"]
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_full_queue_and_wait_timeout_are_shed_with_503():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_per_key=0, max_queue=1, queue_timeout=0.05)
+        holder = await controller.acquire()
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire()
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await waiting
+        holder.release()
+        return full.value, timed_out.value, controller.stats()
+
+    before = SHED.value(reason="queue_full")
+    full, timed_out, stats = asyncio.run(run())
+    assert (full.status_code, full.reason) == (503, "queue_full")
+    assert (timed_out.status_code, timed_out.reason) == (503, "queue_timeout")
+    assert full.retry_after >= 1
+    assert SHED.value(reason="queue_full") == before + 1
+    assert stats == {"in_flight": 0, "queued": 0, "latency": stats["latency"]}
+
+
+def test_per_customer_limit_returns_429():
+    async def run():
+        controller = AdmissionController(max_in_flight=10, max_per_key=2, max_queue=10)
+        tickets = [await controller.acquire("customer-1"), await controller.acquire("customer-1")]
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("customer-1")
+        # Other customers and anonymous requests are unaffected
+        other = await controller.acquire("customer-2")
+        anonymous = [await controller.acquire("") for _ in range(3)]
+        for ticket in tickets + [other] + anonymous:
+            ticket.release()
+        tickets[0].release()
+        return rejected.value, controller.stats()
+
+    rejected, stats = asyncio.run(run())
+    assert rejected.status_code == 429
+    assert stats["in_flight"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_per_key=0, max_queue=5, queue_timeout=1)
+        holder = await controller.acquire("a")
+        waiting = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        holder.release()
+        return controller.stats()
+
+    stats = asyncio.run(run())
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_turns_are_cancelled_at_the_deadline_or_on_disconnect():
+    async def run():
+        loop = asyncio.get_running_loop()
+        cancelled = []
+
+        async def slow_turn():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with pytest.raises(DeadlineExceeded):
+            await run_until_done(slow_turn(), loop.time() + 0.05)
+
+        async def disconnected():
+            return True
+
+        with pytest.raises(ClientDisconnected):
+            await run_until_done(slow_turn(), None, disconnected)
+
+        assert await run_until_done(asyncio.sleep(0, result="done"), loop.time() + 1) == "done"
+        await asyncio.sleep(0)
+        return cancelled
+
+    assert asyncio.run(run()) == [True, True]
+
+
+def test_chat_endpoint_sheds_with_retry_after(monkeypatch):
+    controller = AdmissionController(max_in_flight=0, max_per_key=0, max_queue=0)
+    monkeypatch.setattr(server, "get_admission_controller", lambda: controller)
+
+    with pytest.raises(HTTPException) as shed:
+        asyncio.run(server.chat(server.ChatRequest(message="What albums do you have by U2?"), None))
+    assert shed.value.status_code == 503
+    assert shed.value.headers == {"Retry-After": "1"}
+
+
+class DisconnectingWebSocket:
+    """Sends one chat request, then disconnects while the turn is still running."""
+
+    def __init__(self, request):
+        self.frames = [request]
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        if self.frames:
+            return self.frames.pop(0)
+        await asyncio.sleep(0.05)
+        self.closed = True
+        raise WebSocketDisconnect(1001)
+
+    async def send_text(self, text):
+        if self.closed:
+            # What uvicorn raises for a send after the client closed the socket
+            raise RuntimeError("Unexpected ASGI message 'websocket.send', after sending 'websocket.close'.")
+        self.sent.append(json.loads(text))
+
+
+@pytest.mark.parametrize("next_event_after", [10, 0.1])
+def test_websocket_turn_is_cancelled_when_the_client_disconnects(monkeypatch, next_event_after):
+    controller = AdmissionController(max_in_flight=1)
+    monkeypatch.setattr(server, "get_admission_controller", lambda: controller)
+    cancelled = []
+
+    async def slow_turn(request, deadline=None):
+        yield {"type": "start", "thread_id": "t"}
+        try:
+            await asyncio.sleep(next_event_after)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        yield {"type": "message", "message": "too late"}
+
+    monkeypatch.setattr(server, "stream_turn", slow_turn)
+    websocket = DisconnectingWebSocket(json.dumps({"message": "What albums do you have by U2?"}))
+    before = ABORTED.value(reason="disconnected")
+
+    async def run():
+        await asyncio.wait_for(server.chat_websocket(websocket), 2)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert [event["type"] for event in websocket.sent] == ["start"]
+    # A slow turn is cancelled; one whose next event beats the disconnect check stops at the closed socket
+    assert cancelled == ([True] if next_event_after > 1 else [])
+    assert ABORTED.value(reason="disconnected") == before + 1
+    assert controller.stats()["in_flight"] == 0
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from agents.music_catalog.tools import music_tools
+from agents.invoice_info.tools import invoice_tools
+from agents.supervisor.supervisor_utils import create_supervisor
+from utils.executor import run_blocking
+
+
+def test_tools_run_on_the_blocking_executor(chinook_sample):
+    """
+    ainvoke offloads tool bodies to the shared executor and returns the same result as invoke.
+    """
+    async def run():
+        albums = await music_tools.get_albums_by_artist.ainvoke({"artist": "U2"})
+        summary = await invoice_tools.get_invoice_summary.ainvoke({"customer_id": "1"})
+        thread_name = await run_blocking(lambda: threading.current_thread().name)
+        return albums, summary, thread_name
+
+    albums, summary, thread_name = asyncio.run(run())
+    assert albums == music_tools.get_albums_by_artist.invoke({"artist": "U2"})
+    assert summary[0]["LatestInvoiceId"] == 382
+    assert thread_name.startswith("blocking")
+
+
+def test_supervisor_routes_asynchronously(monkeypatch):
+    """
+    The supervisor awaits the routing model when keywords do not decide, and graphs run with ainvoke.
+    """
+    monkeypatch.setenv("ROUTING_CLASSIFIER", "off")
+
+    def agent(name):
+        async def respond(state):
+            return {"messages": [AIMessage(content=name)]}
+        return RunnableLambda(lambda state: {"messages": [AIMessage(content=name)]}, afunc=respond)
+
+    graph = create_supervisor(
+        agents=[agent("music"), agent("invoice")],
+        model=FakeListChatModel(responses=["2"])
+    ).compile()
+
+    async def ask(text):
+        result = await graph.ainvoke({"messages": [HumanMessage(content=text)], "customer_id": "", "loaded_memory": "None"})
+        return result["messages"][-1].content
+
+    assert asyncio.run(ask("What did I spend last month?")) == "invoice"
+    assert asyncio.run(ask("Any new albums?")) == "music"
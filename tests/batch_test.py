@@ -0,0 +1,97 @@
+import asyncio
+from langchain_core.messages import AIMessage
+from api.admission import AdmissionController
+from utils.batch import arun_batch, get_batch_concurrency, group_by_thread
+
+
+class SlowAgent:
+    """Answers after a delay, recording how many turns run at once and the order per thread."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = []
+
+    async def ainvoke(self, state, config):
+        message = state["messages"][-1].content
+        self.calls.append((config["configurable"]["thread_id"], message))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if message == "fail":
+                raise RuntimeError("provider error")
+            return {"messages": state["messages"] + [AIMessage(content=f"answer to {message}")], "customer_id": "7"}
+        finally:
+            self.in_flight -= 1
+
+
+def collect(agent, items, concurrency, controller=None):
+    async def run():
+        return [result async for result in arun_batch(agent, items, concurrency, controller)]
+    return asyncio.run(run())
+
+
+def test_batch_runs_items_concurrently_up_to_the_limit(chinook_sample):
+    agent = SlowAgent()
+    items = [{"message": f"question {i}", "id": str(i)} for i in range(10)]
+
+    results = collect(agent, items, concurrency=4)
+
+    assert agent.peak == 4
+    assert sorted(result["index"] for result in results) == list(range(10))
+    assert all(result["status"] == "ok" and result["elapsed_ms"] >= 20 for result in results)
+    assert {result["id"]: result["message"] for result in results}["3"] == "answer to question 3"
+
+
+def test_batch_reports_errors_per_item(chinook_sample):
+    results = collect(SlowAgent(), [{"message": "fail"}, {"message": "fine"}], concurrency=2)
+    by_index = {result["index"]: result for result in results}
+    assert by_index[0]["status"] == "error"
+    assert "provider error" in by_index[0]["error"]
+    assert by_index[1]["status"] == "ok"
+
+
+def test_items_of_one_thread_run_in_order(chinook_sample):
+    agent = SlowAgent()
+    items = [{"message": "first", "thread_id": "t"}, {"message": "other"}, {"message": "second", "thread_id": "t"}]
+
+    collect(agent, items, concurrency=3)
+
+    assert [message for thread, message in agent.calls if thread == "t"] == ["first", "second"]
+    assert len(group_by_thread(items)) == 2
+
+
+def test_concurrency_is_capped(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_CONCURRENCY", "5")
+    monkeypatch.setenv("BATCH_CONCURRENCY", "3")
+    assert get_batch_concurrency() == 3
+    assert get_batch_concurrency(50) == 5
+    assert get_batch_concurrency(0) == 3
+
+
+def test_batch_turns_take_admission_slots(chinook_sample, monkeypatch):
+    monkeypatch.setenv("REQUEST_DEADLINE", "0")
+    agent = SlowAgent()
+    controller = AdmissionController(max_in_flight=2, max_per_key=1, max_queue=10, queue_timeout=5)
+    items = [{"message": f"question {i}", "customer_id": "1"} for i in range(6)]
+
+    results = collect(agent, items, concurrency=4, controller=controller)
+
+    # The global limit applies; the per-customer limit does not shed batch items
+    assert agent.peak == 2
+    assert all(result["status"] == "ok" for result in results)
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_batch_items_are_shed_or_cancelled_like_chat_turns(chinook_sample, monkeypatch):
+    full = AdmissionController(max_in_flight=1, max_per_key=0, max_queue=0)
+    results = collect(SlowAgent(), [{"message": "a"}, {"message": "b"}], concurrency=2, controller=full)
+    shed = [result for result in results if result["status"] == "error"]
+    assert len(shed) == 1 and shed[0]["retry_after"] >= 1
+
+    monkeypatch.setenv("REQUEST_DEADLINE", "0.05")
+    results = collect(SlowAgent(delay=1), [{"message": "slow"}], concurrency=1, controller=AdmissionController())
+    assert results[0]["status"] == "error" and "deadline" in results[0]["error"]
+    assert results[0]["elapsed_ms"] < 500
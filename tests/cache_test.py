@@ -0,0 +1,71 @@
+import os
+from da import db, queries
+from agents.music_catalog.tools import music_tools
+from utils.cache import LRUCache, normalize_cache_key
+
+
+def test_lru_cache_evicts_and_expires():
+    """
+    Entries beyond maxsize are evicted least-recently-used first and expire after the TTL.
+    """
+    now = [0.0]
+    cache = LRUCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_music_tools_share_cache_across_spellings(chinook_sample, monkeypatch):
+    """
+    Lookups are keyed on the normalized argument and invalidated when the catalog is reset.
+    """
+    music_tools.catalog_cache.clear()
+    calls = []
+    lookup = queries.get_albums_by_artist
+
+    def counting_lookup(artist, mode=None, limit=None):
+        calls.append(artist)
+        return lookup(artist, mode, limit)
+
+    monkeypatch.setattr(queries, "get_albums_by_artist", counting_lookup)
+
+    first = music_tools.get_albums_by_artist.invoke({"artist": "U2"})
+    second = music_tools.get_albums_by_artist.invoke({"artist": "  u2 "})
+    assert first == second
+    assert len(calls) == 1
+    assert normalize_cache_key("  The  Rolling Stones ") == "the rolling stones"
+
+    db.reset_chinook_db()
+    music_tools.get_albums_by_artist.invoke({"artist": "U2"})
+    assert len(calls) == 2
+
+
+def test_music_tool_cache_is_keyed_on_search_mode_and_backend(chinook_sample, monkeypatch):
+    """
+    Switching MUSIC_SEARCH_MODE or MUSIC_CATALOG_BACKEND at runtime reruns the lookup.
+    """
+    music_tools.catalog_cache.clear()
+    calls = []
+
+    def load():
+        calls.append((os.getenv("MUSIC_CATALOG_BACKEND"), os.getenv("MUSIC_SEARCH_MODE")))
+        return len(calls)
+
+    monkeypatch.setenv("MUSIC_SEARCH_MODE", "fts")
+    assert music_tools.cached_lookup("albums_by_artist", "U2", load) == 1
+    assert music_tools.cached_lookup("albums_by_artist", "u2", load) == 1
+    monkeypatch.setenv("MUSIC_SEARCH_MODE", "like")
+    assert music_tools.cached_lookup("albums_by_artist", "U2", load) == 2
+    monkeypatch.setenv("MUSIC_CATALOG_BACKEND", "arrays")
+    assert music_tools.cached_lookup("albums_by_artist", "U2", load) == 3
+    monkeypatch.setenv("MUSIC_SEARCH_MODE", "fts")
+    monkeypatch.delenv("MUSIC_CATALOG_BACKEND")
+    assert music_tools.cached_lookup("albums_by_artist", "U2", load) == 1
+    assert len(calls) == 3
@@ -0,0 +1,60 @@
+import sqlite3
+from da import catalog_engine, db, queries
+from agents.music_catalog.tools import music_tools
+
+
+def test_columnar_catalog_matches_sqlite(chinook_sample):
+    """
+    The array engine returns the same rows as SQL; LIKE mode also in the same order.
+    """
+    catalog = catalog_engine.get_columnar_catalog()
+    for mode in (queries.SEARCH_MODE_FTS, queries.SEARCH_MODE_LIKE):
+        for artist in ("u2", "roll", "AC/DC", "%"):
+            assert set(catalog.get_albums_by_artist(artist, mode)) == set(queries.get_albums_by_artist(artist, mode))
+            assert set(catalog.get_tracks_by_artist(artist, mode)) == set(queries.get_tracks_by_artist(artist, mode))
+        assert set(catalog.get_songs_by_title("one", mode=mode)) == set(queries.get_songs_by_title("one", mode=mode))
+    assert catalog.get_albums_by_artist("u2", queries.SEARCH_MODE_LIKE) == queries.get_albums_by_artist("u2", queries.SEARCH_MODE_LIKE)
+    assert catalog.get_tracks_by_artist("u2", limit=2) == catalog.get_tracks_by_artist("u2")[:2]
+
+    for order in queries.GENRE_ORDERINGS:
+        assert catalog.get_songs_by_genre("rock", 50, order, 3) == queries.get_songs_by_genre("rock", 50, order, 3)
+    assert catalog.get_genres_by_name("jazz") == queries.get_genres_by_name("jazz")
+    assert catalog.search_albums_by_title("achtung")[0].Title == "Achtung Baby"
+
+
+def test_tools_use_the_configured_backend(chinook_sample, monkeypatch):
+    """
+    MUSIC_CATALOG_BACKEND switches the music tools to the array engine, reloaded on reset.
+    """
+    monkeypatch.setenv("MUSIC_CATALOG_BACKEND", "arrays")
+    music_tools.catalog_cache.clear()
+    assert catalog_engine.get_catalog_backend() is catalog_engine.get_columnar_catalog()
+
+    albums = music_tools.get_albums_by_artist.invoke({"artist": "U2"})
+    assert {album["ArtistName"] for album in albums["results"]} == {"U2"}
+
+    catalog = catalog_engine.get_columnar_catalog()
+    db.reset_chinook_db()
+    assert catalog_engine.get_columnar_catalog() is not catalog
+
+    monkeypatch.setenv("MUSIC_CATALOG_BACKEND", "sqlite")
+    assert catalog_engine.get_catalog_backend() is queries
+
+
+def test_like_mode_folds_case_like_sqlite_and_fts_mode_folds_diacritics():
+    """
+    LIKE mode matches SQLite's LIKE (ASCII-only case folding); FTS mode also strips diacritics.
+    """
+    names = ["Motörhead", "MOTORHEAD", "Ölsen", "Beyoncé"]
+    column = catalog_engine.NameColumn(names)
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE Artist (Name TEXT)")
+    connection.executemany("INSERT INTO Artist VALUES (?)", [(name,) for name in names])
+    for term in ("motor", "MOTÖR", "ö", "Ö", "beyonce", "BEYONCÉ"):
+        expected = {row[0] for row in connection.execute(
+            "SELECT Name FROM Artist WHERE Name LIKE ? ESCAPE '\\'", (queries.contains_pattern(term),))}
+        assert set(column.names[column.match(term, queries.SEARCH_MODE_LIKE)]) == expected
+    connection.close()
+
+    assert set(column.names[column.match("motor", queries.SEARCH_MODE_FTS)]) == {"Motörhead", "MOTORHEAD"}
+    assert set(column.names[column.match("beyonce", queries.SEARCH_MODE_FTS)]) == {"Beyoncé"}
@@ -0,0 +1,47 @@
+import os
+import pytest
+from da import db
+import utils.llm as llm_utils
+
+SAMPLE_CHINOOK_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "chinook_sample.sql")
+
+
+@pytest.fixture
+def chinook_sample(tmp_path, monkeypatch):
+    """
+    Points the Chinook database at the bundled sample script and a temporary snapshot path.
+    """
+    monkeypatch.setenv("CHINOOK_SQL_PATH", SAMPLE_CHINOOK_SQL)
+    monkeypatch.setenv("CHINOOK_DB_PATH", str(tmp_path / "chinook.sqlite"))
+    db.reset_chinook_db()
+    yield
+    db.reset_chinook_db()
+
+
+@pytest.fixture
+def scripted_llm(monkeypatch):
+    """
+    Answers every LLM call with the offline scripted model, with the response cache disabled.
+    """
+    monkeypatch.setenv("LLM_PROVIDER", "scripted")
+    monkeypatch.setenv("LLM_CACHE_SIZE", "0")
+    llm_utils.reset_llm_clients()
+    yield
+    llm_utils.reset_llm_clients()
+
+
+@pytest.fixture
+def scripted_llm_without_fast_path(scripted_llm, monkeypatch):
+    """
+    Like scripted_llm, but with the fast path off so templated questions still reach the model.
+    """
+    monkeypatch.setenv("FAST_PATH_INTENTS", "none")
+
+
+@pytest.fixture
+def scripted_server(chinook_sample, scripted_llm_without_fast_path, monkeypatch):
+    """
+    Serves the API endpoints from a freshly compiled agent driven by the scripted model.
+    """
+    import api.server as server
+    monkeypatch.setattr(server, "_agent", None)
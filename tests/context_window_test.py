@@ -0,0 +1,81 @@
+import asyncio
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from utils.context_window import ContextWindow, SUMMARY_HEADER, count_tokens, split_turns
+
+SYSTEM = SystemMessage(content="You are a music store assistant.")
+
+
+def conversation(turns):
+    """Builds a history of question, tool call, large tool result and answer turns."""
+    messages = []
+    for i in range(turns):
+        messages += [
+            HumanMessage(content=f"Question {i}: what albums do you have by artist {i}?", id=f"h{i}"),
+            AIMessage(content="", tool_calls=[{"name": "get_albums_by_artist", "args": {"artist": f"artist {i}"},
+                                               "id": f"call_{i}", "type": "tool_call"}], id=f"c{i}"),
+            ToolMessage(content="album " * 400, tool_call_id=f"call_{i}", id=f"t{i}"),
+            AIMessage(content=f"Answer {i}: here are the albums.", id=f"a{i}"),
+        ]
+    return messages
+
+
+def test_split_turns_keeps_tool_results_with_their_calls():
+    turns = split_turns(conversation(3))
+    assert len(turns) == 3
+    assert all(isinstance(turn[0], HumanMessage) and len(turn) == 4 for turn in turns)
+
+
+def test_window_keeps_recent_turns_and_summarizes_older_ones():
+    """
+    The last turns stay verbatim, finished tool outputs shrink and older turns become a summary.
+    """
+    window = ContextWindow(max_tokens=0, keep_turns=2, tool_output_chars=100)
+    messages = conversation(6) + [HumanMessage(content="And by U2?", id="h6")]
+    prompt = window.build(SYSTEM, messages)
+
+    assert prompt[0].content.startswith(SYSTEM.content)
+    assert SUMMARY_HEADER in prompt[0].content
+    assert "- Customer: Question 0" in prompt[0].content
+    assert "Answer 4" in prompt[0].content
+    # Turn 5 is kept with a shortened tool output, the current question is kept as is
+    assert [m.id for m in prompt[1:]] == ["h5", "c5", "t5", "a5", "h6"]
+    assert len(prompt[3].content) < 150
+    assert prompt[3].tool_call_id == "call_5"
+
+    stats = window.stats()
+    assert stats["calls"] == 1
+    assert stats["tokens_after"] == count_tokens(prompt)
+    assert stats["tokens_saved"] > stats["tokens_after"]
+    assert stats["summarized_turns"] == 5
+
+
+def test_window_gives_up_recent_turns_over_the_token_budget():
+    window = ContextWindow(max_tokens=200, keep_turns=3, tool_output_chars=0)
+    prompt = window.build(SYSTEM, conversation(3))
+    # Each turn is ~600 tokens, so only the latest one fits
+    assert [m.id for m in prompt[1:]] == ["h2", "c2", "t2", "a2"]
+    assert "Question 1" in prompt[0].content
+
+
+def test_short_conversations_are_unchanged():
+    window = ContextWindow()
+    messages = [HumanMessage(content="What albums do you have by U2?")]
+    assert window.build(SYSTEM, messages) == [SYSTEM] + messages
+
+
+def test_llm_summary_is_rolled_forward():
+    """
+    The LLM summary is reused while no turn ages out and extended with only the new turns.
+    """
+    summarizer = FakeListChatModel(responses=["summary one", "summary two"])
+    window = ContextWindow(max_tokens=0, keep_turns=1, summary_mode="llm", summarizer=summarizer)
+
+    prompt = window.build(SYSTEM, conversation(3))
+    assert prompt[0].content.endswith("summary one")
+    assert window.build(SYSTEM, conversation(3))[0].content.endswith("summary one")
+    assert window.stats()["summary_calls"] == 1
+
+    prompt = asyncio.run(window.abuild(SYSTEM, conversation(4)))
+    assert prompt[0].content.endswith("summary two")
+    assert window.stats()["summary_calls"] == 2
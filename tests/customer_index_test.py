@@ -0,0 +1,47 @@
+from langchain_core.messages import HumanMessage
+from da import db
+from da.customer_index import CustomerIdentifierIndex, normalize_phone
+from agents.customer_service.customer_service_agent import get_customer_id_from_identifier
+from agents.supervisor.nodes.initialize_state import extract_customer_id_from_messages
+
+
+def test_identifiers_are_normalized():
+    """
+    Phone numbers are reduced to an E.164-style string of digits.
+    """
+    assert normalize_phone("+55 (12) 3923-5555") == "+551239235555"
+    assert normalize_phone("0711-2842222") == "07112842222"
+
+
+def test_customer_lookup_by_email_and_phone(chinook_sample):
+    """
+    Emails match case-insensitively and phones match regardless of formatting.
+    """
+    assert get_customer_id_from_identifier("LuisG@Embraer.com.br") == 1
+    assert get_customer_id_from_identifier("+55 12 3923 5555") == 1
+    assert get_customer_id_from_identifier("+49 0711 2842222") == 2
+    assert get_customer_id_from_identifier("nobody@example.com") is None
+
+    messages = [HumanMessage(content="Hi, my number is +55 (12) 3923-5555. What did I buy?")]
+    assert extract_customer_id_from_messages(messages) == ("1", "+55 (12) 3923-5555")
+
+
+def test_index_refreshes_when_customer_table_changes(chinook_sample):
+    """
+    A new customer becomes visible once the Customer change counter moves.
+    """
+    index = CustomerIdentifierIndex(refresh_interval=0)
+    assert index.get_by_email("new@example.com") is None
+
+    connection = db.get_chinook_engine().raw_connection()
+    try:
+        connection.cursor().execute(
+            "INSERT INTO Customer (CustomerId, FirstName, LastName, Email, Phone) "
+            "VALUES (60, 'New', 'Customer', 'new@example.com', '+1 555 0100')"
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+    assert index.get_by_email("new@example.com") == 60
+    assert index.get_by_phone("+15550100") == 60
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import threading
+import pytest
+from da import db
+
+
+def test_chinook_db_is_built_once(chinook_sample):
+    """
+    The snapshot is built on first use and the database handle is shared afterwards.
+    """
+    first = db.get_chinook_db()
+    assert os.path.exists(db.get_chinook_db_path())
+    assert db.get_chinook_db() is first
+    assert "U2" in first.run("SELECT Name FROM Artist WHERE ArtistId = 150")
+
+
+def test_chinook_db_loads_snapshot_offline(chinook_sample, monkeypatch):
+    """
+    Once the snapshot exists the SQL script is never fetched again.
+    """
+    db.get_chinook_db()
+    db.reset_chinook_db()
+
+    def fail():
+        raise AssertionError("SQL script should not be loaded when a snapshot exists")
+
+    monkeypatch.setattr(db, "load_chinook_sql_script", fail)
+    assert "AC/DC" in db.get_chinook_db().run("SELECT Name FROM Artist WHERE ArtistId = 1")
+
+
+def test_snapshot_build_recovers_from_an_interrupted_build(chinook_sample, monkeypatch):
+    """
+    A temporary file left by an interrupted build is replaced, and a failed build removes its own.
+    """
+    path = db.get_chinook_db_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    stale = sqlite3.connect(tmp_path)
+    stale.execute("CREATE TABLE Genre (GenreId INTEGER)")
+    stale.close()
+
+    db.build_chinook_snapshot(path)
+    assert os.path.exists(path) and not os.path.exists(tmp_path)
+
+    monkeypatch.setattr(db, "load_chinook_sql_script", lambda: "CREATE TABLE Broken (")
+    with pytest.raises(sqlite3.OperationalError):
+        db.build_chinook_snapshot(path)
+    assert not os.path.exists(tmp_path)
+
+
+def read_concurrently(engine, threads):
+    """
+    Runs a query on a raw connection from each of several threads at once.
+
+    Returns:
+        tuple: (driver connections used, row counts or exceptions), collected for the main thread to check.
+    """
+    connections = []
+    results = []
+    barrier = threading.Barrier(threads)
+
+    def read():
+        try:
+            connection = engine.raw_connection()
+            try:
+                connections.append(connection.driver_connection)
+                barrier.wait()
+                results.append(connection.cursor().execute("SELECT COUNT(*) FROM Artist").fetchone()[0])
+            finally:
+                connection.close()
+        except Exception as e:
+            results.append(e)
+
+    workers = [threading.Thread(target=read) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return connections, results
+
+
+def test_read_engine_uses_concurrent_read_only_connections(chinook_sample):
+    """
+    The read engine hands each concurrent reader its own query-only connection to the snapshot.
+    """
+    engine = db.get_engine_for_chinook_db(mode=db.CHINOOK_DB_MODE_READ)
+    connections, results = read_concurrently(engine, 4)
+    assert len({id(connection) for connection in connections}) == 4
+    assert len(results) == 4 and all(isinstance(count, int) and count > 0 for count in results)
+
+    connection = engine.raw_connection()
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            connection.cursor().execute("DELETE FROM Artist")
+    finally:
+        connection.close()
+        engine.dispose()
+
+
+def test_read_engine_serves_more_threads_than_its_pool_size(chinook_sample):
+    """
+    Readers beyond the pool size get extra connections instead of having theirs closed under them.
+    """
+    db.ensure_chinook_snapshot()
+    engine = db.get_read_engine_for_chinook_db(pool_size=2)
+    try:
+        _, results = read_concurrently(engine, 16)
+        assert [result for result in results if not isinstance(result, int)] == []
+        assert len(results) == 16
+    finally:
+        engine.dispose()
+
+
+def test_read_pool_defaults_to_the_executor_size(chinook_sample, monkeypatch):
+    monkeypatch.setenv("BLOCKING_EXECUTOR_WORKERS", "12")
+    engine = db.get_read_engine_for_chinook_db()
+    assert engine.pool.size() == 12
+    engine.dispose()
@@ -0,0 +1,82 @@
+import time
+import uuid
+import asyncio
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from agents.supervisor.digital_store import get_digital_store_agent
+from agents.supervisor.intent_classifier import INTENT_INVOICE, INTENT_MUSIC
+from agents.supervisor.supervisor_utils import FAN_OUT_NODE, create_supervisor, split_by_intent
+from utils.state_utils import create_initial_state
+
+COMBINED_QUESTION = ("My customer ID is 1. How much was my most recent purchase? "
+                     "Also, what albums do you have by The Rolling Stones?")
+
+
+def keyword_intent(sentence):
+    lowered = sentence.lower()
+    if "purchase" in lowered:
+        return INTENT_INVOICE
+    if "album" in lowered:
+        return INTENT_MUSIC
+    return None
+
+
+def test_split_by_intent_shares_context_sentences():
+    """
+    Each intent gets its own sentences plus the sentences that identify the customer.
+    """
+    parts = split_by_intent(COMBINED_QUESTION, keyword_intent)
+    assert parts == {
+        INTENT_INVOICE: "My customer ID is 1. How much was my most recent purchase?",
+        INTENT_MUSIC: "My customer ID is 1. Also, what albums do you have by The Rolling Stones?",
+    }
+    assert split_by_intent("What albums do you have by U2? Any other albums?", keyword_intent) == {}
+
+
+def slow_agent(name, delay):
+    def answer(state):
+        time.sleep(delay)
+        return {"messages": [AIMessage(content=f"{name}: {state['messages'][-1].content}")]}
+
+    async def aanswer(state):
+        await asyncio.sleep(delay)
+        return {"messages": [AIMessage(content=f"{name}: {state['messages'][-1].content}")]}
+
+    return RunnableLambda(answer, afunc=aanswer, name=name)
+
+
+def test_fan_out_runs_sub_agents_concurrently():
+    """
+    A combined question is answered by both sub-agents in about the time of the slower one.
+    """
+    graph = create_supervisor(
+        agents=[slow_agent("music", 0.3), slow_agent("invoice", 0.3)],
+        model=FakeListChatModel(responses=["1"]),
+        intent_classifier=None
+    ).compile()
+    state = {"messages": [HumanMessage(content=COMBINED_QUESTION)], "customer_id": "1"}
+
+    start = time.perf_counter()
+    result = graph.invoke(state)
+    assert time.perf_counter() - start < 0.5
+    assert result["next_agent"] == FAN_OUT_NODE
+    answer = result["messages"][-1].content
+    assert answer.startswith("invoice: My customer ID is 1. How much was my most recent purchase?")
+    assert "music: My customer ID is 1. Also, what albums" in answer
+
+    start = time.perf_counter()
+    result = asyncio.run(graph.ainvoke(state))
+    assert time.perf_counter() - start < 0.5
+    assert "music:" in result["messages"][-1].content
+
+
+def test_combined_question_gets_one_merged_answer(chinook_sample, scripted_llm):
+    """
+    The digital store agent answers both parts of a combined question in one message.
+    """
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    messages = get_digital_store_agent().invoke(create_initial_state(COMBINED_QUESTION, config=config), config)["messages"]
+    assert len(messages) == 2
+    assert "382" in messages[-1].content
+    assert "Rolling Stones" in messages[-1].content
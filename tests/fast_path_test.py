@@ -0,0 +1,61 @@
+import uuid
+import asyncio
+from langchain_core.messages import HumanMessage
+from agents.supervisor.digital_store import get_digital_store_agent
+from agents.supervisor.fast_path import (
+    FAST_PATH_INTENTS,
+    INTENT_ARTIST_ALBUMS,
+    INTENT_LATEST_PURCHASE,
+    afast_path_answer,
+    fast_path_answer,
+    get_fast_path_intents,
+    match_fast_path,
+)
+from utils.state_utils import create_initial_state
+
+ALL_INTENTS = frozenset(FAST_PATH_INTENTS)
+
+
+def state_for(question, customer_id=""):
+    return {"messages": [HumanMessage(content=question)], "customer_id": customer_id}
+
+
+def test_templates_match_only_plain_questions():
+    assert match_fast_path(state_for("What albums do you have by U2?"), ALL_INTENTS)[0] == INTENT_ARTIST_ALBUMS
+    assert match_fast_path(state_for("My customer ID is 1. How much was my most recent purchase?"), ALL_INTENTS) == \
+        (INTENT_LATEST_PURCHASE, {"customer_id": "1"})
+    # No customer, several questions, or a disabled intent fall through
+    assert match_fast_path(state_for("What was my last purchase?"), ALL_INTENTS) is None
+    assert match_fast_path(state_for("What albums do you have by U2? Any jazz?"), ALL_INTENTS) is None
+    assert match_fast_path(state_for("What albums do you have by U2?"), frozenset({INTENT_LATEST_PURCHASE})) is None
+
+
+def test_fast_path_intents_are_configurable(monkeypatch):
+    monkeypatch.setenv("FAST_PATH_INTENTS", "artist_albums, unknown")
+    assert get_fast_path_intents() == {INTENT_ARTIST_ALBUMS}
+    monkeypatch.setenv("FAST_PATH_INTENTS", "none")
+    assert get_fast_path_intents() == frozenset()
+
+
+def test_answers_come_from_the_tools(chinook_sample):
+    answer = fast_path_answer(state_for("How much was my most recent purchase?", "1"), ALL_INTENTS)
+    assert "invoice 382" in answer and "$7.93" in answer
+    answer = asyncio.run(afast_path_answer(state_for("albums by the rolling stones"), ALL_INTENTS))
+    assert answer.startswith("We have 2 albums by The Rolling Stones")
+    # Unknown artists and customers without invoices fall through to the full graph
+    assert fast_path_answer(state_for("What albums do you have by Nobody Here?"), ALL_INTENTS) is None
+    assert fast_path_answer(state_for("How much was my last purchase?", "999"), ALL_INTENTS) is None
+
+
+def test_graph_answers_common_questions_without_the_model(chinook_sample, scripted_llm):
+    """
+    A templated question is answered by the fast path node; other questions still reach the sub-agents.
+    """
+    agent = get_digital_store_agent()
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    result = asyncio.run(agent.ainvoke(create_initial_state("What albums do you have by U2?", config=config), config))
+    assert [type(m).__name__ for m in result["messages"]] == ["HumanMessage", "AIMessage"]
+    assert "Achtung Baby" in result["messages"][-1].content
+
+    result = agent.invoke({"messages": [HumanMessage(content="Which songs by U2 do you have?")]}, config)
+    assert result["messages"][-3].tool_calls[0]["name"] == "get_tracks_by_artist"
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from fastapi import HTTPException, Response
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+import api.server as server
+from api.history import UnknownCursorError, etag_matches, page_history
+
+
+def thread_messages(turns):
+    """A thread of turns, each a question, a tool call, its result and the reply."""
+    messages = []
+    for turn in range(turns):
+        messages += [
+            HumanMessage(content=f"question {turn}", id=f"q{turn}"),
+            AIMessage(content="", id=f"call{turn}", tool_calls=[{"name": "lookup", "args": {}, "id": f"tc{turn}"}]),
+            ToolMessage(content="rows", id=f"tool{turn}", tool_call_id=f"tc{turn}"),
+            AIMessage(content=f"answer {turn}", id=f"a{turn}"),
+        ]
+    return messages
+
+
+def ids(page):
+    return [message["id"] for message in page["messages"]]
+
+
+def test_pages_walk_backward_and_forward_through_the_chat():
+    messages = thread_messages(5)
+
+    latest = page_history(messages, 4, chat_only=True)
+    assert ids(latest) == ["q3", "a3", "q4", "a4"]
+    assert latest["prev_cursor"] == "q3" and latest["next_cursor"] is None
+    assert latest["messages"][0] == {"id": "q3", "role": "user", "content": "question 3"}
+
+    older = page_history(messages, 4, before=latest["prev_cursor"], chat_only=True)
+    assert ids(older) == ["q1", "a1", "q2", "a2"]
+    oldest = page_history(messages, 4, before=older["prev_cursor"], chat_only=True)
+    assert ids(oldest) == ["q0", "a0"] and oldest["prev_cursor"] is None
+
+    newer = page_history(messages, 4, after=oldest["next_cursor"], chat_only=True)
+    assert ids(newer) == ids(older)
+    assert len(page_history(messages, 100)["messages"]) == 20
+
+
+def test_since_returns_new_messages_or_resets():
+    messages = thread_messages(3)
+    assert ids(page_history(messages, 10, since="a1")) == ["q2", "call2", "tool2", "a2"]
+    assert page_history(messages, 10, since="a2")["messages"] == []
+
+    # The client's last message was summarized away: start over from the latest page
+    gone = page_history(messages, 2, since="summarized")
+    assert gone["reset"] and ids(gone) == ["tool2", "a2"]
+    with pytest.raises(UnknownCursorError):
+        page_history(messages, 2, after="summarized")
+
+
+def test_etag_matching():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"other", "abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"old"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+def get_history(thread_id, if_none_match=None, **query):
+    """Calls the history endpoint and returns its result and the headers it set."""
+    params = dict(limit=None, before=None, after=None, since=None, chat_only=False)
+    params.update(query)
+    response = Response()
+    result = asyncio.run(server.get_conversation(thread_id, response, if_none_match=if_none_match, **params))
+    return result, response.headers
+
+
+def run_turn(message, thread_id):
+    async def run():
+        return [event async for event in server.stream_turn(server.ChatRequest(message=message, thread_id=thread_id))]
+    asyncio.run(run())
+
+
+def test_unchanged_thread_returns_304_until_a_new_turn(scripted_server):
+    run_turn("What albums do you have by U2?", "history-thread")
+
+    history, headers = get_history("history-thread", chat_only=True)
+    assert [message.role for message in history.messages] == ["user", "assistant"]
+    assert "Achtung Baby" in history.messages[1].content
+    etag = headers["etag"]
+
+    unchanged, _ = get_history("history-thread", if_none_match=etag, chat_only=True)
+    assert unchanged.status_code == 304 and unchanged.headers["etag"] == etag
+    # Another page of the same thread is a different representation
+    full, full_headers = get_history("history-thread", if_none_match=etag)
+    assert len(full.messages) == 4 and full_headers["etag"] != etag
+
+    run_turn("Show me albums by AC/DC", "history-thread")
+    changed, _ = get_history("history-thread", if_none_match=etag, chat_only=True, since=history.messages[-1].id)
+    assert [message.role for message in changed.messages] == ["user", "assistant"]
+    assert changed.messages[0].content == "Show me albums by AC/DC"
+
+
+def test_unknown_thread_and_cursor_errors(scripted_server):
+    with pytest.raises(HTTPException) as missing:
+        get_history("no-such-thread")
+    assert missing.value.status_code == 404
+
+    run_turn("What albums do you have by U2?", "cursor-thread")
+    with pytest.raises(HTTPException) as unknown:
+        get_history("cursor-thread", before="nope")
+    assert unknown.value.status_code == 400
+    with pytest.raises(HTTPException) as both:
+        get_history("cursor-thread", before="a", after="b")
+    assert both.value.status_code == 400
@@ -0,0 +1,40 @@
+import json
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.supervisor.intent_classifier import get_intent_classifier
+from agents.supervisor.supervisor_utils import create_supervisor
+
+
+def test_classifier_routes_messages_without_keywords():
+    """
+    Messages without routing keywords are classified with a confidence score.
+    """
+    classifier = get_intent_classifier()
+    assert classifier.predict("How much have I spent so far?")[0] == "invoice"
+    assert classifier.predict("Anything similar to Radiohead?")[0] == "music"
+    intent, confidence = classifier.predict("Who handled my account?")
+    assert intent == "invoice" and 0.5 < confidence <= 1.0
+
+
+def test_supervisor_uses_the_llm_only_below_the_threshold(monkeypatch, tmp_path):
+    """
+    Confident predictions skip the LLM; every decision is appended to the routing log.
+    """
+    log_path = tmp_path / "routing.jsonl"
+    monkeypatch.setenv("ROUTING_LOG_PATH", str(log_path))
+    model = FakeListChatModel(responses=["2", "1"])
+    agents = [lambda state, name=name: {"messages": [AIMessage(content=name)]} for name in ("music", "invoice")]
+
+    monkeypatch.setenv("ROUTING_CONFIDENCE_THRESHOLD", "0.7")
+    graph = create_supervisor(agents=agents, model=model).compile()
+    result = graph.invoke({"messages": [HumanMessage(content="How much have I spent so far?")]})
+    assert result["messages"][-1].content == "invoice" and model.i == 0
+
+    # Above any reachable confidence, the classifier defers to the LLM
+    monkeypatch.setenv("ROUTING_CONFIDENCE_THRESHOLD", "1.01")
+    graph = create_supervisor(agents=agents, model=model).compile()
+    result = graph.invoke({"messages": [HumanMessage(content="Anything similar to Radiohead?")]})
+    assert result["messages"][-1].content == "invoice" and model.i == 1
+
+    sources = [json.loads(line)["source"] for line in log_path.read_text().splitlines()]
+    assert sources == ["classifier", "llm"]
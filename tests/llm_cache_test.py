@@ -0,0 +1,41 @@
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from utils.llm_cache import ResponseCache, llm_cache_scope
+
+
+def ask(model, question, system="You are a music store assistant."):
+    return model.invoke([SystemMessage(content=system), HumanMessage(content=question)]).content
+
+
+def test_exact_hits_skip_the_model_and_are_scoped():
+    """
+    Repeated prompts are answered from the cache, separately per scope.
+    """
+    cache = ResponseCache(maxsize=8)
+    model = FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+
+    assert ask(model, "Albums by U2?") == "first"
+    assert ask(model, "Albums by U2?") == "first"
+    assert ask(model, "Albums by U2?", system="Customer likes jazz.") == "second"
+    with llm_cache_scope("42"):
+        assert ask(model, "Albums by U2?") == "third"
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["misses"], stats["size"]) == (1, 3, 3)
+
+
+def test_similar_questions_reuse_responses_above_the_threshold():
+    """
+    The similarity tier matches near-identical final questions within the same context only.
+    """
+    cache = ResponseCache(maxsize=8, similarity_threshold=0.7)
+    model = FakeListChatModel(responses=["u2 albums", "invoices", "other context"], cache=cache)
+
+    assert ask(model, "What albums do you have by U2") == "u2 albums"
+    assert ask(model, "what albums do you have by u2?") == "u2 albums"
+    assert ask(model, "Show my latest invoice") == "invoices"
+    assert ask(model, "What albums do you have by U2", system="Customer likes jazz.") == "other context"
+    assert cache.stats()["similar_hits"] == 1
+
+    cache.clear()
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,39 @@
+import utils.llm as llm_utils
+from agents.invoice_info.tools import invoice_tools
+
+
+def test_llm_clients_and_bindings_are_reused(monkeypatch):
+    """
+    Clients are shared per (provider, model, temperature) and tool bindings per tool set.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("TOGETHER_API_KEY", raising=False)
+    llm_utils.reset_llm_clients()
+
+    llm = llm_utils.get_llm("gpt-3.5-turbo")
+    assert llm_utils.get_llm("gpt-3.5-turbo") is llm
+    assert llm_utils.get_llm("gpt-3.5-turbo", temperature=0.5) is not llm
+    assert llm.http_client is llm_utils.get_http_client()
+    assert llm.http_async_client is llm_utils.get_http_async_client()
+    assert llm_utils.get_http_async_client().timeout.read == llm_utils.get_http_client().timeout.read
+
+    bound = llm_utils.get_llm_bind(llm)
+    assert llm_utils.get_llm_bind(llm) is bound
+    assert llm_utils.get_llm_bind(llm, invoice_tools.get_invoice_tools()) is not bound
+
+    stats = llm_utils.get_llm_pool_stats()
+    assert (stats["clients"], stats["client_hits"], stats["bindings"], stats["bind_hits"]) == (2, 1, 2, 1)
+    llm_utils.reset_llm_clients()
+
+
+def test_response_cache_is_opt_in(monkeypatch):
+    """
+    The response cache stays off unless LLM_CACHE_SIZE is set.
+    """
+    monkeypatch.delenv("LLM_CACHE_SIZE", raising=False)
+    llm_utils.reset_llm_clients()
+    assert llm_utils.get_llm_cache() is None and llm_utils.get_llm_cache_stats() == {}
+
+    monkeypatch.setenv("LLM_CACHE_SIZE", "8")
+    assert llm_utils.get_llm_cache() is not None
+    llm_utils.reset_llm_clients()
@@ -0,0 +1,52 @@
+import uuid
+from agents.supervisor.digital_store import get_digital_store_agent
+from utils.metrics import (
+    LLM_COMPLETION_TOKENS,
+    LLM_PROMPT_TOKENS,
+    NODE_DURATION,
+    SQL_DURATION,
+    TOOL_DURATION,
+    Histogram,
+    get_metrics_registry,
+)
+from utils.state_utils import create_initial_state
+
+
+def test_histogram_renders_prometheus_text():
+    histogram = Histogram("test_seconds", "A test histogram.", ["node"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, node="a")
+    histogram.observe(0.5, node="a")
+    histogram.observe(5, node='say "hi"')
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP test_seconds A test histogram.", "# TYPE test_seconds histogram"]
+    assert 'test_seconds_bucket{node="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{node="a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{node="a",le="+Inf"} 2' in lines
+    assert 'test_seconds_sum{node="a"} 0.55' in lines
+    assert 'test_seconds_count{node="say \\"hi\\""} 1' in lines
+    assert histogram.snapshot(node="a")["count"] == 2
+
+
+def test_graph_run_records_nodes_llm_tools_and_sql(chinook_sample, scripted_llm_without_fast_path):
+    """
+    A run of the instrumented graph records every node, LLM call, tool call and catalog query.
+    """
+    get_metrics_registry().clear()
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    question = "My customer ID is 1. How much was my most recent purchase?"
+    get_digital_store_agent().invoke(create_initial_state(question, config=config), config)
+
+    assert NODE_DURATION.snapshot(node="digital_store_agent")["count"] == 1
+    assert NODE_DURATION.snapshot(node="supervisor")["count"] == 1
+    assert NODE_DURATION.snapshot(node="invoice_info_subagent/agent")["count"] == 2
+    assert NODE_DURATION.snapshot(node="invoice_info_subagent/tools")["count"] == 1
+    assert TOOL_DURATION.snapshot(tool="get_invoice_summary", status="ok")["count"] == 1
+    assert SQL_DURATION.snapshot(query="InvoiceSummaryRow")["count"] >= 1
+
+    model = "\n".join(LLM_PROMPT_TOKENS.render()).split('model="')[1].split('"')[0]
+    assert LLM_PROMPT_TOKENS.snapshot(model=model)["count"] >= 2
+    assert LLM_COMPLETION_TOKENS.snapshot(model=model)["sum"] > 0
+
+    text = get_metrics_registry().render()
+    assert 'agent_node_duration_seconds_count{node="invoice_info_subagent/tools"} 1' in text
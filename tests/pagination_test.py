@@ -0,0 +1,47 @@
+import pytest
+from da import queries
+from agents.music_catalog.tools import music_tools
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor, get_page_size
+
+
+def test_cursor_round_trip_is_scoped():
+    """
+    A cursor decodes to its offset only for the lookup it was issued for.
+    """
+    cursor = encode_cursor("albums_by_artist:u2", 20)
+    assert decode_cursor(cursor, "albums_by_artist:u2") == 20
+    assert decode_cursor(None, "albums_by_artist:u2") == 0
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "albums_by_artist:ac/dc")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not a cursor", "albums_by_artist:u2")
+    assert get_page_size(None, 20, 50) == 20
+    assert get_page_size(500, 20, 50) == 50
+
+
+def test_catalog_tools_page_through_results(chinook_sample):
+    """
+    Tools return bounded pages with a total-count hint and a cursor to the next page.
+    """
+    music_tools.catalog_cache.clear()
+    first = music_tools.get_albums_by_artist.invoke({"artist": "U2", "page_size": 2})
+    assert len(first["results"]) == 2 and first["total"] == 3
+    assert first["next_cursor"]
+
+    second = music_tools.get_albums_by_artist.invoke({"artist": "u2", "page_size": 2, "cursor": first["next_cursor"]})
+    assert len(second["results"]) == 1 and second["next_cursor"] is None
+    titles = [album["Title"] for album in first["results"] + second["results"]]
+    assert titles == [album.Title for album in queries.get_albums_by_artist("U2")]
+
+    # A cursor from one lookup cannot be replayed against another
+    other = music_tools.get_albums_by_artist.invoke({"artist": "AC/DC", "cursor": first["next_cursor"]})
+    assert other.startswith("Error:")
+
+
+def test_catalog_lookups_are_capped(chinook_sample):
+    """
+    The row cap is applied in SQL in both search modes.
+    """
+    for mode in (queries.SEARCH_MODE_FTS, queries.SEARCH_MODE_LIKE):
+        assert len(queries.get_tracks_by_artist("U2", mode=mode, limit=2)) == 2
+        assert len(queries.get_albums_by_artist("U2", mode=mode, limit=1)) == 1
@@ -0,0 +1,133 @@
+import sqlite3
+from da import catalog_engine, db, queries
+from da.catalog_index import create_genre_sample_index
+from agents.music_catalog.tools import music_tools
+from agents.invoice_info.tools import invoice_tools
+from agents.customer_service.customer_service_agent import get_customer_id_from_identifier
+
+
+def test_queries_return_typed_rows(chinook_sample):
+    """
+    Query functions return NamedTuple rows instead of a stringified result.
+    """
+    albums = queries.get_albums_by_artist("u2")
+    assert {album.Title for album in albums} >= {"Achtung Baby", "All That You Can't Leave Behind"}
+    assert all(isinstance(album, queries.AlbumRow) for album in albums)
+
+    invoices = queries.get_invoices_by_customer_sorted_by_date(1)
+    assert [invoice.InvoiceId for invoice in invoices] == [382, 121, 98]
+
+
+def test_like_terms_are_bound_and_escaped(chinook_sample):
+    """
+    User input is bound as a parameter and LIKE wildcards match literally.
+    """
+    assert queries.get_albums_by_artist("%") == []
+    assert queries.get_albums_by_artist("' OR '1'='1") == []
+    assert queries.get_albums_by_artist("AC/DC")
+
+
+def test_tools_return_rows_as_dicts(chinook_sample):
+    """
+    Tools hand structured rows to the LLM without an ast.literal_eval round trip.
+    """
+    songs = music_tools.get_songs_by_genre.invoke({"genre": "jazz"})
+    assert songs["total"] == 1 and songs["results"][0]["Artist"] == "Miles Davis"
+
+    employee = invoice_tools.get_employee_by_invoice_and_customer.invoke({"invoice_id": "382", "customer_id": "1"})
+    assert employee == [{"FirstName": "Jane", "Title": "Sales Support Agent", "Email": "jane@chinookcorp.com"}]
+
+    assert get_customer_id_from_identifier("luisg@embraer.com.br") == 1
+
+
+def test_full_text_search_ranks_prefix_matches(chinook_sample):
+    """
+    FTS mode prefix-matches whole words, so "u2" no longer drags in every artist containing "u".
+    """
+    assert {album.ArtistName for album in queries.get_albums_by_artist("roll", mode=queries.SEARCH_MODE_FTS)} == {"The Rolling Stones"}
+    assert {track.ArtistName for track in queries.get_tracks_by_artist("U2", mode=queries.SEARCH_MODE_FTS)} == {"U2"}
+    assert queries.get_songs_by_title("satisf", mode=queries.SEARCH_MODE_FTS)[0].Name == "Satisfaction"
+    assert queries.search_albums_by_title("achtung")[0].Title == "Achtung Baby"
+
+
+def test_search_index_follows_base_table_changes(chinook_sample):
+    """
+    Triggers keep the FTS tables in sync when the base tables change.
+    """
+    connection = sqlite3.connect(db.ensure_chinook_snapshot())
+    try:
+        connection.execute("INSERT INTO Artist (ArtistId, Name) VALUES (999, 'Queen')")
+        connection.execute("INSERT INTO Album (AlbumId, Title, ArtistId) VALUES (999, 'Greatest Hits', 999)")
+        connection.execute("UPDATE Artist SET Name = 'Rush Revisited' WHERE ArtistId = 128")
+        connection.commit()
+        found = {row[0] for row in connection.execute("SELECT rowid FROM ArtistSearch WHERE ArtistSearch MATCH ?", ('"queen"*',))}
+        assert found == {999}
+        assert connection.execute("SELECT rowid FROM ArtistSearch WHERE ArtistSearch MATCH ?", ('"revisited"',)).fetchall() == [(128,)]
+    finally:
+        connection.close()
+
+
+def test_genre_sample_is_answered_from_the_precomputed_index(chinook_sample):
+    """
+    Genre browsing reads GenreArtistSample with configurable size and ordering.
+    """
+    by_artist = queries.get_songs_by_genre("rock", sample_size=3, order="artist")
+    assert [song.ArtistName for song in by_artist] == ["AC/DC", "Accept", "Led Zeppelin"]
+
+    by_popularity = queries.get_songs_by_genre("rock", sample_size=1, order="popularity")
+    assert by_popularity == [queries.TrackRow("Gimmie Shelter", "The Rolling Stones")]
+
+    rolling_stones = [song for song in queries.get_songs_by_genre("rock", sample_size=50, tracks_per_artist=3)
+                      if song.ArtistName == "The Rolling Stones"]
+    assert len(rolling_stones) == 3
+
+
+def test_genre_sample_lists_each_artist_once_across_matching_genres(chinook_sample):
+    """
+    An artist with tracks in "Rock" and "Rock And Roll" appears once (per requested track), on both backends.
+    """
+    connection = sqlite3.connect(db.ensure_chinook_snapshot())
+    try:
+        connection.execute("INSERT INTO Track (TrackId, Name, AlbumId, MediaTypeId, GenreId, Milliseconds, UnitPrice) "
+                           "VALUES (9001, 'Rock And Roll Train', 1, 1, 5, 261000, 0.99)")
+        create_genre_sample_index(connection)
+        connection.commit()
+    finally:
+        connection.close()
+    db.reset_chinook_db()
+
+    assert len(queries.get_genres_by_name("rock")) == 2
+    artists = [song.ArtistName for song in queries.get_songs_by_genre("rock", sample_size=50)]
+    assert artists.count("AC/DC") == 1 and len(artists) == len(set(artists))
+    three_each = [song for song in queries.get_songs_by_genre("rock", sample_size=50, tracks_per_artist=3)
+                  if song.ArtistName == "AC/DC"]
+    assert len(three_each) == 3
+
+    catalog = catalog_engine.get_columnar_catalog()
+    for order in queries.GENRE_ORDERINGS:
+        for tracks_per_artist in (1, 3):
+            assert catalog.get_songs_by_genre("rock", 50, order, tracks_per_artist) == \
+                queries.get_songs_by_genre("rock", 50, order, tracks_per_artist)
+
+
+def test_invoice_summary_is_refreshed_when_invoices_are_added(chinook_sample):
+    """
+    The per-customer summary and line items follow new invoices through triggers.
+    """
+    summary = invoice_tools.get_invoice_summary.invoke({"customer_id": "1"})[0]
+    assert (summary["InvoiceCount"], summary["LatestInvoiceId"], summary["LineItemCount"]) == (3, 382, 10)
+
+    connection = sqlite3.connect(db.ensure_chinook_snapshot())
+    try:
+        connection.execute("INSERT INTO Invoice (InvoiceId, CustomerId, InvoiceDate, Total) VALUES (500, 1, '2014-01-01 00:00:00', 2.99)")
+        connection.execute("INSERT INTO InvoiceLine (InvoiceLineId, InvoiceId, TrackId, UnitPrice, Quantity) VALUES (9000, 500, 1, 2.99, 1)")
+        connection.commit()
+    finally:
+        connection.close()
+    db.reset_chinook_db()
+
+    summary = queries.get_invoice_summary(1)
+    assert (summary.InvoiceCount, summary.LatestInvoiceId, summary.LineItemCount) == (4, 500, 11)
+    top_item = invoice_tools.get_invoices_sorted_by_unit_price.invoke({"customer_id": "1"})[0]
+    assert top_item["TrackName"] == "For Those About To Rock (We Salute You)"
+    assert len(queries.get_line_items_sorted_by_unit_price(1, limit=2)) == 2
@@ -0,0 +1,33 @@
+import uuid
+from agents.supervisor.digital_store import get_digital_store_agent
+from utils.scripted_llm import ScriptedChatModel
+from utils.state_utils import create_initial_state
+
+
+def ask(question):
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    return get_digital_store_agent().invoke(create_initial_state(question, config=config), config)["messages"]
+
+
+def test_scripted_model_drives_the_graph_offline(chinook_sample, scripted_llm_without_fast_path):
+    """
+    With LLM_PROVIDER=scripted the whole graph runs without a provider, calling realistic tools.
+    """
+    messages = ask("What albums do you have by U2?")
+    assert messages[1].tool_calls[0]["name"] == "get_albums_by_artist"
+    assert messages[1].tool_calls[0]["args"] == {"artist": "U2"}
+    assert "Achtung Baby" in messages[-1].content
+
+    messages = ask("My customer ID is 1. How much was my most recent purchase?")
+    assert messages[1].tool_calls[0]["name"] == "get_invoice_summary"
+    assert "382" in messages[-1].content
+
+
+def test_scripted_model_reports_simulated_tokens():
+    """
+    Completions are capped at the configured token count and usage is reported.
+    """
+    model = ScriptedChatModel(tokens=5)
+    response = model.invoke("hello")
+    assert len(response.content.split()) == 5
+    assert response.usage_metadata["output_tokens"] > 0
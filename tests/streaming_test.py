@@ -0,0 +1,68 @@
+import json
+import asyncio
+import api.server as server
+from api.server import ChatRequest
+
+
+def post_stream(message):
+    """Calls the SSE endpoint and returns the response and its body."""
+    async def run():
+        response = await server.chat_stream(ChatRequest(message=message))
+        return response, "".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(run())
+
+
+def turn_events(message):
+    """Collects the events stream_turn yields for a message, as sent over the WebSocket."""
+    async def run():
+        return [json.loads(server.event_json(event)) async for event in server.stream_turn(ChatRequest(message=message))]
+    return asyncio.run(run())
+
+
+def sse_events(body):
+    """Parses a text/event-stream body into (event name, data) pairs."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_sse_streams_route_tools_and_tokens_before_the_reply(scripted_server):
+    response, body = post_stream("What albums do you have by U2?")
+    assert response.media_type == "text/event-stream"
+
+    events = sse_events(body)
+    types = [name for name, _ in events]
+    assert types[0] == "start"
+    assert types[-1] == "message"
+    assert types.index("route") < types.index("tool_start") < types.index("tool_end") < types.index("token")
+
+    data = dict(events)
+    assert data["route"]["agent"] == "music_catalog_subagent"
+    assert data["tool_start"]["tool"] == "get_albums_by_artist"
+    assert data["tool_end"]["status"] == "ok"
+    tokens = "".join(event["content"] for name, event in events if name == "token")
+    assert tokens == data["message"]["message"]
+    assert "Achtung Baby" in tokens
+    assert data["message"]["thread_id"] == data["start"]["thread_id"]
+
+
+def test_routing_llm_answer_is_not_streamed(scripted_server):
+    """
+    When the supervisor asks the LLM to route, its "1" or "2" never reaches the client.
+    """
+    _, body = post_stream("Hello there")
+    events = sse_events(body)
+    tokens = "".join(event["content"] for name, event in events if name == "token")
+    assert tokens == events[-1][1]["message"]
+
+
+def test_turn_events_report_the_reply_and_customer(scripted_server):
+    events = turn_events("My customer ID is 1. How much was my most recent purchase?")
+
+    assert events[-1]["type"] == "message"
+    assert events[-1]["customer_id"] == "1"
+    assert "382" in events[-1]["message"]
+    assert {"type": "route", "agent": "invoice_info_subagent"} in events
+    assert any(event["type"] == "tool_end" and event["tool"] == "get_invoice_summary" for event in events)
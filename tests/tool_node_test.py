@@ -0,0 +1,64 @@
+import time
+import asyncio
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph, START, END
+from da.state import State
+from utils.executor import offload_tool
+from utils.tool_node import create_tool_node
+
+
+@offload_tool
+@tool
+def slow_lookup(artist: str, delay: float) -> str:
+    """Looks up an artist slowly."""
+    time.sleep(delay)
+    return f"albums by {artist}"
+
+
+def tool_graph(**kwargs):
+    """Compiles a graph running only the tool node, which needs the graph runtime."""
+    workflow = StateGraph(State)
+    workflow.add_node("tools", create_tool_node([slow_lookup], **kwargs))
+    workflow.add_edge(START, "tools")
+    workflow.add_edge("tools", END)
+    return workflow.compile()
+
+
+def tool_calls_state(*calls):
+    return {"messages": [AIMessage(content="", tool_calls=[
+        {"name": "slow_lookup", "args": {"artist": artist, "delay": delay}, "id": f"call_{i}", "type": "tool_call"}
+        for i, (artist, delay) in enumerate(calls)
+    ])]}
+
+
+def test_tool_calls_run_concurrently_in_order():
+    """
+    Three 0.3s calls take about 0.3s in total, with results in call order, for invoke and ainvoke.
+    """
+    graph = tool_graph(default_timeout=5)
+    state = tool_calls_state(("U2", 0.3), ("AC/DC", 0.3), ("Rush", 0.3))
+
+    start = time.perf_counter()
+    messages = graph.invoke(state)["messages"][1:]
+    assert time.perf_counter() - start < 0.6
+    assert [m.content for m in messages] == ["albums by U2", "albums by AC/DC", "albums by Rush"]
+    assert [m.tool_call_id for m in messages] == ["call_0", "call_1", "call_2"]
+
+    start = time.perf_counter()
+    messages = asyncio.run(graph.ainvoke(state))["messages"][1:]
+    assert time.perf_counter() - start < 0.6
+    assert [m.content for m in messages] == ["albums by U2", "albums by AC/DC", "albums by Rush"]
+
+
+def test_slow_tool_calls_time_out():
+    """
+    A call over its tool's timeout returns an error result while the other calls complete.
+    """
+    graph = tool_graph(default_timeout=5, timeouts={"slow_lookup": 0.2})
+    state = tool_calls_state(("U2", 0.0), ("Rush", 1.0))
+
+    for messages in (graph.invoke(state)["messages"][1:], asyncio.run(graph.ainvoke(state))["messages"][1:]):
+        assert messages[0].content == "albums by U2"
+        assert messages[1].status == "error"
+        assert "did not finish within 0.2 seconds" in messages[1].content
@@ -0,0 +1,50 @@
+import json
+import asyncio
+import api.server as server
+from agents.supervisor.digital_store import get_digital_store_agent
+from utils.warmup import WarmupStatus, awarm_up
+
+
+def test_warm_up_times_every_phase_and_becomes_ready(chinook_sample, scripted_llm):
+    agents = []
+
+    def get_agent():
+        if not agents:
+            agents.append(get_digital_store_agent())
+        return agents[0]
+
+    status = asyncio.run(awarm_up(get_agent, WarmupStatus(), run_turn=True))
+    snapshot = status.snapshot()
+
+    assert snapshot["ready"]
+    assert list(snapshot["phases_ms"]) == ["database", "indexes", "llm", "graphs", "turn"]
+    assert snapshot["errors"] == {}
+    # The synthetic turn leaves no conversation behind
+    threads = {checkpoint.config["configurable"]["thread_id"] for checkpoint in agents[0].checkpointer.list(None)}
+    assert not [thread for thread in threads if thread.startswith("warmup-")]
+
+
+def test_failed_warm_up_is_not_ready(chinook_sample, scripted_llm):
+    def get_agent():
+        raise RuntimeError("graph compilation failed")
+
+    status = asyncio.run(awarm_up(get_agent, WarmupStatus(), run_turn=True))
+    snapshot = status.snapshot()
+
+    assert not snapshot["ready"]
+    assert "graph compilation failed" in snapshot["errors"]["graphs"]
+    assert "turn" not in snapshot["phases_ms"]
+
+
+def test_ready_endpoint_reports_warm_up(monkeypatch):
+    status = WarmupStatus()
+    monkeypatch.setattr(server, "_warmup_status", status)
+
+    response = asyncio.run(server.ready())
+    assert response.status_code == 503
+
+    status.record("database", 0.25)
+    status.mark_ready()
+    response = asyncio.run(server.ready())
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"ready": True, "phases_ms": {"database": 250.0}, "errors": {}}
@@ -0,0 +1,148 @@
+"""
+Batch execution of chat turns for bulk and offline workloads.
+
+arun_batch() answers many {message, thread_id, customer_id} items concurrently with a bounded
+number of turns in flight, and yields each result as soon as it completes, so throughput is
+limited by the provider rather than by serial request handling. Items that share a thread_id
+are turns of one conversation and run in order; every other item runs independently.
+
+BATCH_CONCURRENCY sets the default number of concurrent turns (default 8) and
+BATCH_MAX_CONCURRENCY caps what a caller may ask for (default 32). Given an admission controller,
+as the API does, every turn also takes one of the controller's slots and is cancelled at
+REQUEST_DEADLINE, so batches share the global in-flight limit with interactive traffic.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from api.admission import AdmissionController, AdmissionRejected, get_request_deadline, run_until_done
+from utils.llm_cache import llm_cache_scope
+from utils.state_utils import acreate_initial_state
+
+DEFAULT_BATCH_CONCURRENCY = 8
+DEFAULT_BATCH_MAX_CONCURRENCY = 32
+
+
+def get_batch_concurrency(requested: Optional[int] = None) -> int:
+    """
+    Returns the number of concurrent turns: the requested number or BATCH_CONCURRENCY, capped by BATCH_MAX_CONCURRENCY.
+
+    Args:
+        requested (int): The caller's requested concurrency, if any.
+
+    Returns:
+        int: A concurrency of at least 1.
+    """
+    limit = int(os.getenv("BATCH_MAX_CONCURRENCY", DEFAULT_BATCH_MAX_CONCURRENCY))
+    concurrency = requested or int(os.getenv("BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY))
+    return max(1, min(concurrency, limit))
+
+
+def group_by_thread(items: Sequence[Dict[str, Any]]) -> List[List[Tuple[int, Dict[str, Any]]]]:
+    """
+    Groups (index, item) pairs into jobs: one job per thread_id, in order, and one per item without a thread_id.
+    """
+    jobs: "OrderedDict[str, List[Tuple[int, Dict[str, Any]]]]" = OrderedDict()
+    for index, item in enumerate(items):
+        thread_id = item.get("thread_id") or f"batch-{uuid.uuid4()}"
+        jobs.setdefault(thread_id, []).append((index, dict(item, thread_id=thread_id)))
+    return list(jobs.values())
+
+
+async def arun_turn(agent: Any, message: str, thread_id: str, customer_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs one chat turn, as /api/chat does, and returns the reply and the customer ID.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    state = await acreate_initial_state(message, customer_id=customer_id or "", config=config)
+    with llm_cache_scope(state.get('customer_id')):
+        result = await agent.ainvoke(state, config)
+    messages = result.get('messages', [])
+    if not messages:
+        raise ValueError("No response from agent")
+    last_message = messages[-1]
+    return {
+        "message": last_message.content if hasattr(last_message, 'content') else str(last_message),
+        "customer_id": result.get('customer_id', state.get('customer_id')),
+    }
+
+
+async def _run_item(
+    agent: Any,
+    index: int,
+    item: Dict[str, Any],
+    controller: Optional[AdmissionController] = None
+) -> Dict[str, Any]:
+    result = {"index": index, "thread_id": item["thread_id"]}
+    if item.get("id") is not None:
+        result["id"] = item["id"]
+    start = time.perf_counter()
+    try:
+        if controller is None:
+            result.update(await arun_turn(agent, item["message"], item["thread_id"], item.get("customer_id")))
+        else:
+            # Batch turns only take global slots: the per-customer limit sheds instead of queueing
+            deadline = get_request_deadline()
+            async with controller.admit("", deadline):
+                turn = arun_turn(agent, item["message"], item["thread_id"], item.get("customer_id"))
+                result.update(await run_until_done(turn, deadline))
+        result["status"] = "ok"
+    except AdmissionRejected as e:
+        logging.warning(f"Batch item {index} shed: {e.detail}")
+        result.update(status="error", error=e.detail, retry_after=e.retry_after)
+    except Exception as e:
+        logging.error(f"Error in batch item {index}: {e}")
+        result.update(status="error", error=str(e))
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def arun_batch(
+    agent: Any,
+    items: Sequence[Dict[str, Any]],
+    concurrency: Optional[int] = None,
+    controller: Optional[AdmissionController] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Answers the items concurrently and yields each result as it completes.
+
+    Args:
+        agent: The compiled supervisor graph.
+        items (Sequence[dict]): The items, each with a message and an optional thread_id, customer_id and id.
+        concurrency (int): Turns in flight at once. Defaults to BATCH_CONCURRENCY.
+        controller (AdmissionController): Admits every turn, if given; shed items are reported as
+                                          errors with retry_after.
+
+    Yields:
+        dict: Per item, in completion order: index, id (if given), thread_id, status ("ok" or
+              "error"), message and customer_id or error, and elapsed_ms.
+    """
+    jobs: asyncio.Queue = asyncio.Queue()
+    for job in group_by_thread(items):
+        jobs.put_nowait(job)
+    results: asyncio.Queue = asyncio.Queue()
+    workers_count = min(get_batch_concurrency(concurrency), jobs.qsize())
+
+    async def worker() -> None:
+        while True:
+            try:
+                job = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            for index, item in job:
+                await results.put(await _run_item(agent, index, item, controller))
+
+    workers = [asyncio.create_task(worker()) for _ in range(workers_count)]
+    start = time.perf_counter()
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        # The consumer went away (e.g. the client disconnected) or the batch is done
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    logging.info(f"Batch of {len(items)} items with concurrency {workers_count} took {time.perf_counter() - start:.1f}s")
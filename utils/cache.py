@@ -0,0 +1,113 @@
+"""
+Bounded in-process caches.
+
+LRUCache is a thread-safe least-recently-used cache with an optional time-to-live and hit/miss
+counters. It is used in front of read-only lookups whose results only change when the
+underlying data is rebuilt.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def normalize_cache_key(value: str) -> str:
+    """
+    Normalizes a free-text argument so equivalent spellings share a cache entry.
+
+    Case is folded and runs of whitespace collapse to a single space,
+    e.g. "  The  Rolling Stones " and "the rolling stones" map to the same key.
+
+    Args:
+        value (str): The argument to normalize.
+
+    Returns:
+        str: The normalized key.
+    """
+    return " ".join(value.casefold().split())
+
+
+class LRUCache:
+    """
+    A thread-safe LRU cache with an optional time-to-live per entry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, timer: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize (int): Maximum number of entries; the least recently used entry is evicted beyond it.
+            ttl (float): Seconds an entry stays valid. None or 0 keeps entries until evicted.
+            timer (Callable): Clock used for expiry, monotonic by default.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for the key, or the default on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > self._timer():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries beyond maxsize.
+        """
+        expires_at = self._timer() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for the key, calling the loader and caching its result on a miss.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Drops every entry. Counters are kept so hit rates survive invalidation.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache size and hit/miss/eviction counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
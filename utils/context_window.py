@@ -0,0 +1,311 @@
+"""
+Token-budgeted message history for sub-agent prompts.
+
+Sub-agents used to send the whole thread to the LLM on every turn, so prompts grew with every
+question and every tool result. ContextWindow builds the prompt from:
+
+- the system prompt, extended with a compact summary of older turns;
+- the last CONTEXT_KEEP_TURNS turns verbatim (a turn is a user message and everything after it),
+  with tool outputs of finished turns cut to CONTEXT_TOOL_OUTPUT_CHARS characters;
+- fewer recent turns when the system prompt and recent turns are above CONTEXT_MAX_TOKENS.
+
+Older turns are summarized extractively (the user's questions and the assistant's answers,
+shortened, at most 20 lines) by default. With CONTEXT_SUMMARY_MODE=llm the LLM writes a rolling
+summary instead: each summary is cached and extended with the newly aged-out turns, so a
+conversation pays for at most one summarization call per turn. CONTEXT_SUMMARY_MODE=off drops older turns.
+Every build logs the prompt tokens before and after, and get_context_stats() reports the totals.
+"""
+import os
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.constants import TAG_NOSTREAM
+from utils.cache import LRUCache
+
+DEFAULT_MAX_TOKENS = 3000
+DEFAULT_KEEP_TURNS = 3
+DEFAULT_TOOL_OUTPUT_CHARS = 600
+# Characters kept per message in an extractive summary, and summary lines kept
+SUMMARY_LINE_CHARS = 200
+SUMMARY_MAX_LINES = 20
+
+SUMMARY_EXTRACTIVE = "extractive"
+SUMMARY_LLM = "llm"
+SUMMARY_OFF = "off"
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+SUMMARIZE_PROMPT = (
+    "Update the summary of a customer support conversation with the new messages below. Keep the customer's "
+    "identity, stated preferences, the questions asked and the key facts found (artists, albums, invoice IDs, "
+    "totals). Reply with the summary only, in at most 8 short bullet points.\n\n"
+    "Current summary:\n{summary}\n\nNew messages:\n{messages}"
+)
+# Summary calls run inside the agent's node; keep their tokens out of streamed replies
+SUMMARY_CONFIG = {"tags": [TAG_NOSTREAM]}
+
+
+def text_of(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def count_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Approximates the prompt tokens of messages (about four characters per token)."""
+    return count_tokens_approximately(messages)
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """
+    Groups messages into turns, each starting at a user message.
+
+    Tool calls and their results always stay in the same turn, so turns can be dropped or
+    summarized without leaving a tool result without its call.
+    """
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else f"{text[:limit]}... [{len(text) - limit} more characters]"
+
+
+def compress_tool_outputs(turn: List[BaseMessage], limit: int) -> List[BaseMessage]:
+    """Returns the turn with tool outputs longer than limit characters cut down."""
+    if not limit:
+        return turn
+    return [
+        message.model_copy(update={"content": shorten(text_of(message), limit)})
+        if isinstance(message, ToolMessage) and len(text_of(message)) > limit else message
+        for message in turn
+    ]
+
+
+def render_turns(turns: Sequence[List[BaseMessage]]) -> str:
+    """Renders turns as "Customer:"/"Assistant:" lines, leaving out tool calls and results."""
+    lines = []
+    for turn in turns:
+        for message in turn:
+            text = text_of(message).strip()
+            if not text:
+                continue
+            if isinstance(message, HumanMessage):
+                lines.append(f"- Customer: {shorten(text, SUMMARY_LINE_CHARS)}")
+            elif isinstance(message, AIMessage):
+                lines.append(f"- Assistant: {shorten(text, SUMMARY_LINE_CHARS)}")
+    return "\n".join(lines)
+
+
+def turns_key(turns: Sequence[List[BaseMessage]]) -> str:
+    """Identifies a run of turns by their message IDs (or contents when a message has no ID)."""
+    parts = [message.id or f"{message.type}:{text_of(message)}" for turn in turns for message in turn]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ContextWindow:
+    """
+    Builds token-budgeted prompts from a system prompt and the message history.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        keep_turns: int = DEFAULT_KEEP_TURNS,
+        tool_output_chars: int = DEFAULT_TOOL_OUTPUT_CHARS,
+        summary_mode: str = SUMMARY_EXTRACTIVE,
+        summarizer: Any = None
+    ):
+        """
+        Args:
+            max_tokens (int): Token budget for the system prompt and recent turns. Turns before the latest
+                              one are summarized until they fit. 0 disables the budget.
+            keep_turns (int): Most recent turns kept verbatim. 0 keeps every turn.
+            tool_output_chars (int): Characters kept of each tool output in finished turns. 0 keeps them whole.
+            summary_mode (str): "extractive", "llm" or "off".
+            summarizer: Chat model for the "llm" summary mode. Defaults to the shared LLM.
+        """
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.tool_output_chars = tool_output_chars
+        self.summary_mode = summary_mode
+        self.summarizer = summarizer
+        # turns_key of the summarized turns -> rolling LLM summary
+        self._summaries = LRUCache(maxsize=1024)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.summarized_turns = 0
+        self.summary_calls = 0
+
+    def _select(self, system: SystemMessage, messages: Sequence[BaseMessage]):
+        """Splits the history into turns to summarize and recent turns to keep."""
+        turns = split_turns(messages)
+        keep = len(turns) if self.keep_turns <= 0 else min(self.keep_turns, len(turns))
+        older, recent = turns[:len(turns) - keep], turns[len(turns) - keep:]
+        # The latest turn is in progress and needs its tool results whole
+        recent = [compress_tool_outputs(turn, self.tool_output_chars) for turn in recent[:-1]] + recent[-1:]
+
+        if self.max_tokens:
+            # Give up the oldest recent turns until the system prompt and recent turns fit the budget
+            sizes = [count_tokens(turn) for turn in recent]
+            total = count_tokens([system]) + sum(sizes)
+            while len(recent) > 1 and total > self.max_tokens:
+                total -= sizes.pop(0)
+                older.append(recent.pop(0))
+        return older, recent
+
+    def _extractive_summary(self, older: List[List[BaseMessage]]) -> str:
+        lines = render_turns(older).splitlines()
+        return "\n".join(lines[-SUMMARY_MAX_LINES:])
+
+    def _cached_summary(self, older: List[List[BaseMessage]]):
+        """Returns (summary, turns it covers) for the longest summarized prefix of older."""
+        for covered in range(len(older), 0, -1):
+            summary = self._summaries.get(turns_key(older[:covered]))
+            if summary is not None:
+                return summary, covered
+        return "None", 0
+
+    def _summarize_messages(self, summary: str, new_turns: List[List[BaseMessage]]) -> List[BaseMessage]:
+        return [HumanMessage(content=SUMMARIZE_PROMPT.format(summary=summary, messages=render_turns(new_turns)))]
+
+    def _summarizer(self):
+        if self.summarizer is None:
+            import utils.llm as llm_utils
+            return llm_utils.get_llm()
+        return self.summarizer
+
+    def _llm_summary(self, older: List[List[BaseMessage]]) -> str:
+        summary, covered = self._cached_summary(older)
+        if covered < len(older):
+            response = self._summarizer().invoke(self._summarize_messages(summary, older[covered:]), SUMMARY_CONFIG)
+            summary = text_of(response).strip()
+            self._summaries.set(turns_key(older), summary)
+            self._count(summary_calls=1)
+        return summary
+
+    async def _allm_summary(self, older: List[List[BaseMessage]]) -> str:
+        summary, covered = self._cached_summary(older)
+        if covered < len(older):
+            response = await self._summarizer().ainvoke(self._summarize_messages(summary, older[covered:]), SUMMARY_CONFIG)
+            summary = text_of(response).strip()
+            self._summaries.set(turns_key(older), summary)
+            self._count(summary_calls=1)
+        return summary
+
+    def _assemble(self, system: SystemMessage, messages: Sequence[BaseMessage], older, recent, summary: str):
+        """Builds the prompt and records the token savings."""
+        if summary:
+            # Keep a single leading system message; some providers reject more than one
+            system = SystemMessage(content=f"{text_of(system)}\n\n{SUMMARY_HEADER}\n{summary}")
+        prompt = [system] + [message for turn in recent for message in turn]
+
+        before = count_tokens([system] + list(messages))
+        after = count_tokens(prompt)
+        self._count(calls=1, tokens_before=before, tokens_after=after, summarized_turns=len(older))
+        if before > after:
+            logging.info(f"Context window: {before} -> {after} prompt tokens "
+                         f"({before - after} saved, {len(older)} turns summarized)")
+        return prompt
+
+    def build(self, system: SystemMessage, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """
+        Builds the prompt for the system message and history.
+
+        Args:
+            system (SystemMessage): The agent's system prompt.
+            messages (Sequence[BaseMessage]): The conversation so far.
+
+        Returns:
+            list: The system message, with a summary of older turns if any, followed by the recent turns.
+        """
+        older, recent = self._select(system, messages)
+        summary = ""
+        if older and self.summary_mode == SUMMARY_LLM:
+            summary = self._llm_summary(older)
+        elif older and self.summary_mode != SUMMARY_OFF:
+            summary = self._extractive_summary(older)
+        return self._assemble(system, messages, older, recent, summary)
+
+    async def abuild(self, system: SystemMessage, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """
+        Async variant of build, awaiting the LLM in the "llm" summary mode.
+        """
+        older, recent = self._select(system, messages)
+        summary = ""
+        if older and self.summary_mode == SUMMARY_LLM:
+            summary = await self._allm_summary(older)
+        elif older and self.summary_mode != SUMMARY_OFF:
+            summary = self._extractive_summary(older)
+        return self._assemble(system, messages, older, recent, summary)
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for counter, value in increments.items():
+                setattr(self, counter, getattr(self, counter) + value)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of prompts built and the prompt tokens before and after windowing.
+        """
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                "calls": self.calls,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": saved,
+                "saved_ratio": saved / self.tokens_before if self.tokens_before else 0.0,
+                "summarized_turns": self.summarized_turns,
+                "summary_calls": self.summary_calls,
+            }
+
+
+_context_window: Optional[ContextWindow] = None
+_context_window_lock = threading.Lock()
+
+
+def get_context_window() -> ContextWindow:
+    """
+    Returns the shared context window.
+
+    It is configured by CONTEXT_MAX_TOKENS (default 3000), CONTEXT_KEEP_TURNS (default 3),
+    CONTEXT_TOOL_OUTPUT_CHARS (default 600) and CONTEXT_SUMMARY_MODE (extractive, llm or off).
+
+    Returns:
+        ContextWindow: The process-wide context window.
+    """
+    global _context_window
+    if _context_window is None:
+        with _context_window_lock:
+            if _context_window is None:
+                _context_window = ContextWindow(
+                    max_tokens=int(os.getenv("CONTEXT_MAX_TOKENS", DEFAULT_MAX_TOKENS)),
+                    keep_turns=int(os.getenv("CONTEXT_KEEP_TURNS", DEFAULT_KEEP_TURNS)),
+                    tool_output_chars=int(os.getenv("CONTEXT_TOOL_OUTPUT_CHARS", DEFAULT_TOOL_OUTPUT_CHARS)),
+                    summary_mode=os.getenv("CONTEXT_SUMMARY_MODE", SUMMARY_EXTRACTIVE).strip().lower()
+                )
+    return _context_window
+
+
+def get_context_stats() -> Dict[str, Any]:
+    """
+    Returns the prompt token savings of the shared context window.
+    """
+    return get_context_window().stats()
+
+
+def reset_context_window() -> None:
+    """
+    Drops the shared context window so the next call re-reads its settings.
+    """
+    global _context_window
+    with _context_window_lock:
+        _context_window = None
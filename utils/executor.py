@@ -0,0 +1,89 @@
+"""
+Bounded executor for blocking work on the async path.
+
+Async graph nodes, tools and API handlers offload SQLite queries and other blocking calls to
+one shared thread pool instead of running them on the event loop, so a single worker can serve
+many concurrent conversations. The pool size bounds how many blocking calls run at once.
+"""
+import os
+import asyncio
+import functools
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from langchain_core.tools import BaseTool
+
+DEFAULT_BLOCKING_WORKERS = 16
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_workers() -> int:
+    """
+    Returns the number of blocking executor threads, from BLOCKING_EXECUTOR_WORKERS (default 16).
+    """
+    return int(os.getenv("BLOCKING_EXECUTOR_WORKERS", DEFAULT_BLOCKING_WORKERS))
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared executor for blocking calls.
+
+    BLOCKING_EXECUTOR_WORKERS (default 16) sets the number of threads.
+
+    Returns:
+        ThreadPoolExecutor: The process-wide executor.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_blocking_workers(),
+                    thread_name_prefix="blocking"
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking function on the shared executor and awaits its result.
+
+    The caller's context variables (e.g. LangChain callbacks and tracing) are carried over.
+
+    Args:
+        func (Callable): The blocking function.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        Any: The function's return value.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_blocking_executor(), call)
+
+
+def offload_tool(blocking_tool: BaseTool) -> BaseTool:
+    """
+    Gives a synchronous tool an async variant that runs it on the shared executor.
+
+    Use as a decorator above @tool. `ainvoke` then awaits the executor instead of blocking the
+    event loop, while `invoke` keeps calling the function directly.
+
+    Args:
+        blocking_tool (BaseTool): A tool created with @tool from a synchronous function.
+
+    Returns:
+        BaseTool: The same tool with its coroutine set.
+    """
+    func = blocking_tool.func
+
+    @functools.wraps(func)
+    async def coroutine(*args: Any, **kwargs: Any) -> Any:
+        return await run_blocking(func, *args, **kwargs)
+
+    blocking_tool.coroutine = coroutine
+    return blocking_tool
@@ -1,6 +1,12 @@
 import os
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+import httpx
 from langchain_openai import ChatOpenAI
 from agents.music_catalog.tools import music_tools
+from utils.executor import run_blocking
+from utils.llm_cache import ResponseCache
+from utils.scripted_llm import get_scripted_llm
 import logging
 
 try:
@@ -10,20 +16,153 @@ except ImportError:
     TOGETHER_AVAILABLE = False
     logging.warning("langchain-together not available. Install with: pip install langchain-together")
 
-def get_llm(model_name: str = None):
+PROVIDER_OPENAI = "openai"
+PROVIDER_TOGETHER = "together"
+PROVIDER_SCRIPTED = "scripted"
+
+# Process-wide registry of LLM clients keyed by (provider, model, temperature) and of
+# tool-bound runnables keyed by (client key, tool names). Clients share one HTTP connection
+# pool, so keep-alive connections survive across turns instead of a new TLS handshake per call.
+_llm_clients: Dict[Tuple[str, str, float], Any] = {}
+_llm_bindings: Dict[Tuple[Tuple[str, str, float], Tuple[str, ...]], Any] = {}
+_llm_keys: Dict[int, Tuple[str, str, float]] = {}
+_llm_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+_llm_pool_stats = {"client_hits": 0, "client_misses": 0, "bind_hits": 0, "bind_misses": 0}
+_llm_cache: Optional[ResponseCache] = None
+
+
+def get_llm_cache() -> Optional[ResponseCache]:
+    """
+    Returns the response cache shared by every LLM client, or None if it is disabled.
+
+    The cache is opt-in: LLM_CACHE_SIZE (default 0, disabled) bounds the number of responses,
+    LLM_CACHE_TTL (default 0, no expiry) sets their lifetime in seconds and
+    LLM_CACHE_SIMILARITY_THRESHOLD (default 0, disabled) enables the TF-IDF similarity tier.
+
+    Returns:
+        ResponseCache: The process-wide cache, or None if LLM_CACHE_SIZE is not set.
+    """
+    global _llm_cache
+    size = int(os.getenv("LLM_CACHE_SIZE", 0))
+    if size <= 0:
+        return None
+    if _llm_cache is None:
+        with _llm_lock:
+            if _llm_cache is None:
+                _llm_cache = ResponseCache(
+                    maxsize=size,
+                    ttl=float(os.getenv("LLM_CACHE_TTL", 0)),
+                    similarity_threshold=float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", 0))
+                )
+    return _llm_cache
+
+
+def get_llm_cache_stats() -> dict:
+    """
+    Returns the LLM response cache statistics, empty if the cache is disabled.
+
+    Returns:
+        dict: The size, hit (exact and similar), miss and eviction counters and hit rate.
+    """
+    cache = get_llm_cache()
+    return cache.stats() if cache else {}
+
+
+def _http_client_options() -> Dict[str, Any]:
+    """
+    Returns the pool limits and timeout shared by the sync and async HTTP clients.
+    """
+    return {
+        "limits": httpx.Limits(
+            max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 20)),
+            max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", 10)),
+        ),
+        "timeout": httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT", 60)), connect=10.0),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Returns the HTTP client shared by every LLM client.
+
+    LLM_HTTP_MAX_CONNECTIONS (default 20) and LLM_HTTP_MAX_KEEPALIVE (default 10) size the pool.
+
+    Returns:
+        httpx.Client: The shared client.
+    """
+    global _http_client
+    if _http_client is None:
+        with _llm_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(**_http_client_options())
+    return _http_client
+
+
+def get_http_async_client() -> httpx.AsyncClient:
+    """
+    Returns the async HTTP client shared by every LLM client for ainvoke and astream calls.
+
+    It has the same pool limits and timeout as get_http_client().
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    global _http_async_client
+    if _http_async_client is None:
+        with _llm_lock:
+            if _http_async_client is None:
+                _http_async_client = httpx.AsyncClient(**_http_client_options())
+    return _http_async_client
+
+
+def _get_or_create_client(key: Tuple[str, str, float], create) -> Any:
+    """
+    Returns the registered client for the key, creating it on first use.
+    """
+    with _llm_lock:
+        client = _llm_clients.get(key)
+        if client is not None:
+            _llm_pool_stats["client_hits"] += 1
+            return client
+    client = create()
+    with _llm_lock:
+        # Another thread may have registered the same key meanwhile; keep the first one
+        if key in _llm_clients:
+            _llm_pool_stats["client_hits"] += 1
+            return _llm_clients[key]
+        _llm_pool_stats["client_misses"] += 1
+        _llm_clients[key] = client
+        _llm_keys[id(client)] = key
+    logging.info(f"Created {key[0]} LLM client for model {key[1]} (temperature {key[2]})")
+    return client
+
+
+def get_llm(model_name: str = None, temperature: float = 0.0):
     """
     Returns an LLM instance configured with the specified model name.
     
     Supports both OpenAI and Together AI models based on environment variables.
+    Set LLM_PROVIDER=scripted to use the offline ScriptedChatModel instead (no API key needed).
+    Instances are shared process-wide per provider, model and temperature.
     
     Args:
         model_name (str): The name of the model to use. If None, will auto-detect based on env vars.
                          For OpenAI: "gpt-4", "gpt-3.5-turbo", etc.
                          For Together: "meta-llama/Llama-3.3-70B-Instruct", etc.
+        temperature (float): The sampling temperature.
     
     Returns:
         ChatOpenAI or ChatTogether: An instance of the LLM configured with the specified model.
     """
+    # Offline deterministic model for load tests and benchmarks
+    if os.getenv("LLM_PROVIDER", "").strip().lower() == PROVIDER_SCRIPTED:
+        return _get_or_create_client(
+            (PROVIDER_SCRIPTED, model_name or "scripted", temperature),
+            lambda: get_scripted_llm().model_copy(update={"cache": get_llm_cache()})
+        )
+    
     # Check for API keys
     openai_key = os.getenv("OPENAI_API_KEY")
     together_key = os.getenv("TOGETHER_API_KEY")
@@ -45,11 +184,16 @@ def get_llm(model_name: str = None):
     
     # Use Together AI if available and model name suggests it
     if is_together_model and TOGETHER_AVAILABLE and together_key:
-        logging.info(f"Using Together AI model: {model_name}")
-        return ChatTogether(
-            model=model_name,
-            temperature=0.0,
-            together_api_key=together_key
+        return _get_or_create_client(
+            (PROVIDER_TOGETHER, model_name, temperature),
+            lambda: ChatTogether(
+                model=model_name,
+                temperature=temperature,
+                together_api_key=together_key,
+                http_client=get_http_client(),
+                http_async_client=get_http_async_client(),
+                cache=get_llm_cache()
+            )
         )
     
     # Fall back to OpenAI
@@ -65,20 +209,92 @@ def get_llm(model_name: str = None):
                 "Please set OPENAI_API_KEY in your environment variables or .env file."
             )
     
-    logging.info(f"Using OpenAI model: {model_name}")
-    return ChatOpenAI(model=model_name, temperature=0.0)
+    return _get_or_create_client(
+        (PROVIDER_OPENAI, model_name, temperature),
+        lambda: ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            http_client=get_http_client(),
+            http_async_client=get_http_async_client(),
+            cache=get_llm_cache()
+        )
+    )
 
-def get_llm_bind(llm):
+def get_llm_bind(llm, tools: Optional[Sequence] = None):
     """
     Binds the provided LLM to music tools.
     
     This function binds tools to the LLM instance, allowing it to call music-related tools.
+    Bindings of registry clients are memoized per tool set, so tool schemas are serialized once.
     
     Args:
         llm: The LLM instance (ChatOpenAI or ChatTogether) to bind.
+        tools (Sequence): The tools to bind. Defaults to the music tools.
     
     Returns:
         The LLM instance with tools bound.
     """
-    logging.info("Binding LLM to music tools.")
-    return llm.bind_tools(music_tools.get_music_tools())
\ No newline at end of file
+    tools = list(tools) if tools is not None else music_tools.get_music_tools()
+    client_key = _llm_keys.get(id(llm))
+    if client_key is None or _llm_clients.get(client_key) is not llm:
+        # Not a registry client, so there is nothing stable to memoize against
+        return llm.bind_tools(tools)
+
+    key = (client_key, tuple(tool.name for tool in tools))
+    with _llm_lock:
+        bound = _llm_bindings.get(key)
+        if bound is not None:
+            _llm_pool_stats["bind_hits"] += 1
+            return bound
+    logging.info(f"Binding {client_key[1]} to tools: {', '.join(key[1])}")
+    bound = llm.bind_tools(tools)
+    with _llm_lock:
+        _llm_pool_stats["bind_misses"] += 1
+        return _llm_bindings.setdefault(key, bound)
+
+def get_llm_pool_stats() -> dict:
+    """
+    Returns the number of registered clients and bindings with their reuse counters.
+
+    Returns:
+        dict: The client and binding counts and hit/miss counters.
+    """
+    with _llm_lock:
+        return {"clients": len(_llm_clients), "bindings": len(_llm_bindings), **_llm_pool_stats}
+
+async def apreconnect_llm_clients() -> int:
+    """
+    Opens the connections of every registered provider client ahead of the first LLM call.
+
+    Lists the provider's models through both the sync and the async client, so the TLS handshakes
+    happen now and the keep-alive connections are pooled. The scripted model has nothing to connect.
+
+    Returns:
+        int: The number of clients connected.
+    """
+    with _llm_lock:
+        clients = list(_llm_clients.values())
+    connected = 0
+    for client in clients:
+        root_client = getattr(client, "root_client", None)
+        root_async_client = getattr(client, "root_async_client", None)
+        if root_client is None:
+            continue
+        await run_blocking(root_client.models.list)
+        if root_async_client is not None:
+            await root_async_client.models.list()
+        connected += 1
+    return connected
+
+def reset_llm_clients() -> None:
+    """
+    Drops every registered client, binding and cached response and resets the counters, e.g. after API keys change.
+    """
+    global _llm_cache
+    with _llm_lock:
+        _llm_cache = None
+        _llm_clients.clear()
+        _llm_bindings.clear()
+        _llm_keys.clear()
+        for counter in _llm_pool_stats:
+            _llm_pool_stats[counter] = 0
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Response cache for LLM calls.
+
+ResponseCache implements LangChain's BaseCache, so chat models consult it before calling the
+provider and a hit skips the provider call entirely. It has two tiers:
+
+- exact: a hash of the serialized messages (system prompt and history) and the model string,
+  which includes the model parameters and bound tools;
+- similarity (optional): when the conversation context matches exactly and only the final user
+  question differs, the question is compared with previously cached questions using character
+  n-gram TF-IDF vectors, and a cached response is reused above a cosine similarity threshold.
+
+Entries are scoped, e.g. per customer, through llm_cache_scope(), so responses to personalized
+prompts are never served to another customer.
+"""
+import json
+import hashlib
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from utils.cache import LRUCache, normalize_cache_key
+
+# Cached questions kept per conversation context for the similarity tier
+DEFAULT_SIMILARITY_CANDIDATES = 256
+
+_llm_cache_scope: contextvars.ContextVar[str] = contextvars.ContextVar("llm_cache_scope", default="")
+
+
+@contextmanager
+def llm_cache_scope(scope: Optional[str]) -> Iterator[None]:
+    """
+    Scopes LLM cache entries created and read inside the block, e.g. to one customer.
+
+    Args:
+        scope (str): The scope, typically the customer ID. None or "" is the shared scope.
+    """
+    token = _llm_cache_scope.set(str(scope or ""))
+    try:
+        yield
+    finally:
+        _llm_cache_scope.reset(token)
+
+
+def split_prompt(prompt: str) -> Tuple[str, Optional[str]]:
+    """
+    Splits a serialized message list into its context and final user question.
+
+    Args:
+        prompt (str): The messages serialized by langchain_core.load.dumps.
+
+    Returns:
+        tuple: (context, question). question is None unless the last message is a plain-text
+               human message, in which case context covers every message before it.
+    """
+    try:
+        messages = json.loads(prompt)
+        last = messages[-1].get("kwargs", {})
+    except (ValueError, AttributeError, IndexError, TypeError):
+        return prompt, None
+    if last.get("type") != "human" or not isinstance(last.get("content"), str):
+        return prompt, None
+    return json.dumps(messages[:-1], sort_keys=True), last["content"]
+
+
+def digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache(BaseCache):
+    """
+    Exact-match LLM response cache with an optional TF-IDF similarity tier.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        similarity_candidates: int = DEFAULT_SIMILARITY_CANDIDATES
+    ):
+        """
+        Args:
+            maxsize (int): Maximum number of cached responses, evicted least recently used first.
+            ttl (float): Seconds a response stays valid. None or 0 keeps it until evicted.
+            similarity_threshold (float): Minimum cosine similarity (0-1] for the similarity tier.
+                                          None or 0 disables it.
+            similarity_candidates (int): Questions remembered per conversation context.
+        """
+        self._responses = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.similarity_threshold = similarity_threshold or None
+        self.similarity_candidates = similarity_candidates
+        # (scope, model, context) digest -> question -> exact key
+        self._questions: "OrderedDict[str, OrderedDict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _keys(self, prompt: str, llm_string: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Returns the exact key, the similarity bucket key and the normalized question."""
+        scope = _llm_cache_scope.get()
+        exact_key = digest(scope, llm_string, prompt)
+        if not self.similarity_threshold:
+            return exact_key, None, None
+        context, question = split_prompt(prompt)
+        if question is None:
+            return exact_key, None, None
+        return exact_key, digest(scope, llm_string, context), normalize_cache_key(question)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """
+        Returns the cached generations for the prompt, or None on a miss.
+        """
+        exact_key, bucket_key, question = self._keys(prompt, llm_string)
+        generations = self._responses.get(exact_key)
+        if generations is not None:
+            self._count("exact_hits")
+            return generations
+
+        if bucket_key is not None:
+            with self._lock:
+                candidates = list(self._questions.get(bucket_key, {}).items())
+            match = self._most_similar(question, [candidate for candidate, _ in candidates])
+            if match is not None:
+                generations = self._responses.get(candidates[match][1])
+                if generations is not None:
+                    self._count("similar_hits")
+                    logging.debug(f"LLM cache similarity hit: '{question}' ~ '{candidates[match][0]}'")
+                    return generations
+        self._count("misses")
+        return None
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _most_similar(self, question: str, candidates: Sequence[str]) -> Optional[int]:
+        """Returns the index of the candidate most similar to the question above the threshold."""
+        if not candidates:
+            return None
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import linear_kernel
+
+        vectors = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4)).fit_transform(list(candidates) + [question])
+        # TF-IDF rows are L2-normalized, so the linear kernel is the cosine similarity
+        similarities = linear_kernel(vectors[-1], vectors[:-1]).ravel()
+        best = int(similarities.argmax())
+        return best if similarities[best] >= self.similarity_threshold else None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        Caches the generations returned for the prompt.
+        """
+        exact_key, bucket_key, question = self._keys(prompt, llm_string)
+        self._responses.set(exact_key, return_val)
+        if bucket_key is None:
+            return
+        with self._lock:
+            questions = self._questions.setdefault(bucket_key, OrderedDict())
+            questions[question] = exact_key
+            questions.move_to_end(question)
+            while len(questions) > self.similarity_candidates:
+                questions.popitem(last=False)
+            self._questions.move_to_end(bucket_key)
+            # Bound the number of contexts as well; their responses age out of the LRU anyway
+            while len(self._questions) > self._responses.maxsize:
+                self._questions.popitem(last=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        """
+        Drops every cached response.
+        """
+        self._responses.clear()
+        with self._lock:
+            self._questions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache size and hit/miss counters, with similarity-tier hits counted separately.
+        """
+        responses = self._responses.stats()
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "size": responses["size"],
+                "maxsize": responses["maxsize"],
+                "evictions": responses["evictions"],
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,422 @@
+"""
+Latency and token instrumentation exported in the Prometheus text format.
+
+MetricsCallbackHandler is attached to the compiled graphs (see instrument_graph) and records into
+histograms:
+
+- agent_node_duration_seconds: wall time of every graph node, labelled with its path through the
+  subgraphs (e.g. "music_catalog_subagent/music_tool_node") and of whole graph runs;
+- llm_call_duration_seconds, llm_prompt_tokens and llm_completion_tokens per model;
+- tool_call_duration_seconds per tool;
+- catalog_sql_duration_seconds and catalog_db_init_seconds, recorded by the data access layer.
+
+Other modules register counters and gauges in the same registry, e.g. the API admission controller.
+
+The API serves the registry at /metrics. METRICS_ENABLED=false stops attaching the handler, and
+METRICS_DEBUG_LOG=true logs every node timing tagged with its thread_id.
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def label_set(labels: List[str]) -> str:
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """
+    A thread-safe cumulative histogram with labels.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        """
+        Args:
+            name (str): The metric name.
+            documentation (str): The HELP text.
+            labelnames (Sequence[str]): Label names, in the order they are rendered.
+            buckets (Sequence[float]): Upper bounds of the buckets; +Inf is implied.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Records a value for the given label values.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Observes the wall time of the block in seconds.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels: Any) -> Dict[str, float]:
+        """
+        Returns the count and sum recorded for the given label values.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return {"count": series[-1], "sum": series[-2]} if series else {"count": 0, "sum": 0.0}
+
+    def render(self) -> List[str]:
+        """
+        Returns the histogram in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            labels = ['%s="%s"' % (name, escape_label(value)) for name, value in zip(self.labelnames, key)]
+            for bound, count in zip(self.buckets, values):
+                le = 'le="%s"' % format_number(bound)
+                lines.append(f"{self.name}_bucket{label_set(labels + [le])} {count}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{label_set(labels + [le])} {values[-1]}")
+            lines.append(f"{self.name}_sum{label_set(labels)} {format_number(values[-2])}")
+            lines.append(f"{self.name}_count{label_set(labels)} {values[-1]}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class _ScalarMetric:
+    """
+    A thread-safe metric holding one value per label set.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def value(self, **labels: Any) -> float:
+        """
+        Returns the current value for the given label values.
+        """
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        """
+        Returns the metric in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            labels = ['%s="%s"' % (name, escape_label(label)) for name, label in zip(self.labelnames, key)]
+            lines.append(f"{self.name}{label_set(labels)} {format_number(value)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_ScalarMetric):
+    """
+    A monotonically increasing count with labels.
+    """
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_ScalarMetric):
+    """
+    A value that goes up and down, with labels.
+    """
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class MetricsRegistry:
+    """
+    The set of metrics exported at /metrics.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, create: Any) -> Any:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = create()
+            return self._metrics[name]
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        """
+        Returns the histogram with the given name, creating it on first use.
+        """
+        return self._register(name, lambda: Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Returns the counter with the given name, creating it on first use.
+        """
+        return self._register(name, lambda: Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """
+        Returns the gauge with the given name, creating it on first use.
+        """
+        return self._register(name, lambda: Gauge(name, documentation, labelnames))
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def clear(self) -> None:
+        """
+        Drops all recorded observations, keeping the metrics registered.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    Returns the process-wide metrics registry.
+    """
+    return _registry
+
+
+NODE_DURATION = _registry.histogram(
+    "agent_node_duration_seconds", "Wall time of graph nodes and whole graph runs.", ("node",))
+LLM_DURATION = _registry.histogram(
+    "llm_call_duration_seconds", "Wall time of LLM calls.", ("model",))
+LLM_PROMPT_TOKENS = _registry.histogram(
+    "llm_prompt_tokens", "Prompt tokens per LLM call.", ("model",), TOKEN_BUCKETS)
+LLM_COMPLETION_TOKENS = _registry.histogram(
+    "llm_completion_tokens", "Completion tokens per LLM call.", ("model",), TOKEN_BUCKETS)
+TOOL_DURATION = _registry.histogram(
+    "tool_call_duration_seconds", "Wall time of tool calls.", ("tool", "status"))
+SQL_DURATION = _registry.histogram(
+    "catalog_sql_duration_seconds", "Wall time of catalog database queries.", ("query",))
+DB_INIT_DURATION = _registry.histogram(
+    "catalog_db_init_seconds", "Time to create the catalog database engine and SQLDatabase.", ("component",))
+
+
+def node_path(metadata: Dict[str, Any]) -> str:
+    """Returns a node's path through the subgraphs, e.g. "invoice_info_subagent/tools"."""
+    namespace = metadata.get("langgraph_checkpoint_ns") or metadata.get("langgraph_node", "")
+    return "/".join(segment.split(":")[0] for segment in namespace.split("|") if segment)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records node, LLM and tool timings and LLM token usage into the metrics registry.
+    """
+
+    # Recording is cheap, so run inline rather than on an executor for async graphs
+    run_inline = True
+
+    def __init__(self, debug_log: bool = False):
+        """
+        Args:
+            debug_log (bool): Log each node timing tagged with the conversation's thread_id.
+        """
+        self.debug_log = debug_log
+        # run_id -> (label, thread_id, start) for timed runs
+        self._nodes: Dict[UUID, Tuple[str, Optional[str], float]] = {}
+        # run_id -> (scope, node) for every chain run: the label of the enclosing node and its node name
+        self._scopes: Dict[UUID, Tuple[str, Optional[str]]] = {}
+        self._llm_calls: Dict[UUID, Tuple[str, float]] = {}
+        self._tool_calls: Dict[UUID, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID,
+                       parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        name = kwargs.get("name")
+        node = metadata.get("langgraph_node")
+        with self._lock:
+            scope, parent_node = self._scopes.get(parent_run_id, ("", None))
+            if parent_run_id is None:
+                # A whole graph run
+                self._nodes[run_id] = (name or "graph", metadata.get("thread_id"), time.perf_counter())
+                self._scopes[run_id] = ("", None)
+            elif node is not None and name == node and parent_node != node:
+                # A node (not the runnable of the same name inside it). Nodes of a graph started from
+                # inside another node, e.g. by fan_out, have no namespace of their own and nest under it.
+                label = node_path(metadata)
+                if scope and "/" not in label:
+                    label = f"{scope}/{label}"
+                self._nodes[run_id] = (label, metadata.get("thread_id"), time.perf_counter())
+                self._scopes[run_id] = (label, node)
+            elif parent_node is not None and name and name != parent_node:
+                self._scopes[run_id] = (f"{scope}/{name}", parent_node)
+            else:
+                self._scopes[run_id] = (scope, parent_node)
+
+    def _end_node(self, run_id: UUID) -> None:
+        with self._lock:
+            self._scopes.pop(run_id, None)
+            started = self._nodes.pop(run_id, None)
+        if started is None:
+            return
+        label, thread_id, start = started
+        elapsed = time.perf_counter() - start
+        NODE_DURATION.observe(elapsed, node=label)
+        if self.debug_log:
+            logging.info(f"[thread {thread_id}] {label} took {elapsed * 1000:.1f} ms")
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id)
+
+    def _start_llm(self, run_id: UUID, metadata: Optional[Dict[str, Any]]) -> None:
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or metadata.get("ls_provider") or "unknown"
+        with self._lock:
+            self._llm_calls[run_id] = (model, time.perf_counter())
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start_llm(run_id, metadata)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID,
+                     metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start_llm(run_id, metadata)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            started = self._llm_calls.pop(run_id, None)
+        if started is None:
+            return
+        model, start = started
+        LLM_DURATION.observe(time.perf_counter() - start, model=model)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    LLM_PROMPT_TOKENS.observe(usage.get("input_tokens", 0), model=model)
+                    LLM_COMPLETION_TOKENS.observe(usage.get("output_tokens", 0), model=model)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            started = self._llm_calls.pop(run_id, None)
+        if started is not None:
+            LLM_DURATION.observe(time.perf_counter() - started[1], model=started[0])
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._tool_calls[run_id] = ((serialized or {}).get("name") or kwargs.get("name") or "unknown", time.perf_counter())
+
+    def _end_tool(self, run_id: UUID, status: str) -> None:
+        with self._lock:
+            started = self._tool_calls.pop(run_id, None)
+        if started is not None:
+            TOOL_DURATION.observe(time.perf_counter() - started[1], tool=started[0], status=status)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id, "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id, "error")
+
+
+_handler: Optional[MetricsCallbackHandler] = None
+_handler_lock = threading.Lock()
+
+
+def get_metrics_callback_handler() -> MetricsCallbackHandler:
+    """
+    Returns the shared metrics callback handler (METRICS_DEBUG_LOG enables thread-tagged timing logs).
+    """
+    global _handler
+    if _handler is None:
+        with _handler_lock:
+            if _handler is None:
+                _handler = MetricsCallbackHandler(
+                    debug_log=os.getenv("METRICS_DEBUG_LOG", "false").strip().lower() in ("1", "true", "yes")
+                )
+    return _handler
+
+
+def instrument_graph(graph: Any) -> Any:
+    """
+    Attaches the metrics callback handler to a compiled graph, unless METRICS_ENABLED=false.
+
+    Sub-agents are instrumented as well so they report when run on their own; the shared handler
+    is only registered once when they run inside the supervisor graph.
+
+    Args:
+        graph: A compiled LangGraph graph.
+
+    Returns:
+        The graph with the handler in its default config (still a compiled graph).
+    """
+    if os.getenv("METRICS_ENABLED", "true").strip().lower() in ("0", "false", "no", "off"):
+        return graph
+    return graph.with_config(callbacks=[get_metrics_callback_handler()])
@@ -0,0 +1,100 @@
+"""
+Cursor-based pagination for tool results.
+
+Tools return one bounded page at a time together with a total-count hint and an opaque
+continuation cursor. The cursor encodes which lookup it belongs to and where the next page
+starts, so the LLM can only pass it back to the same tool with the same argument.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or belongs to a different lookup."""
+
+
+def get_page_size(page_size: Optional[int], default: int, maximum: int) -> int:
+    """
+    Returns the page size to use, clamped to the configured maximum.
+
+    Args:
+        page_size (int): The requested page size, or None/0 for the default.
+        default (int): The page size used when none is requested.
+        maximum (int): The largest page size a caller may request.
+
+    Returns:
+        int: A page size between 1 and maximum.
+    """
+    if not page_size or page_size < 1:
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+def encode_cursor(scope: str, offset: int) -> str:
+    """
+    Encodes an opaque continuation cursor.
+
+    Args:
+        scope (str): Identifies the lookup the cursor belongs to (tool name and normalized argument).
+        offset (int): Index of the first row of the next page.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    payload = json.dumps({"s": scope, "o": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], scope: str) -> int:
+    """
+    Decodes a continuation cursor and returns the offset it points to.
+
+    Args:
+        cursor (str): The cursor from a previous page, or None/"" for the first page.
+        scope (str): The lookup the cursor must belong to.
+
+    Returns:
+        int: The offset of the requested page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for another lookup.
+    """
+    if not cursor:
+        return 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_scope, offset = payload["s"], int(payload["o"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+    if cursor_scope != scope or offset < 0:
+        raise InvalidCursorError("Cursor does not belong to this lookup")
+    return offset
+
+
+def paginate(rows: Sequence[Any], scope: str, page_size: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Slices one page out of a result set.
+
+    Args:
+        rows (Sequence): The full (or capped) result set.
+        scope (str): Identifies the lookup for cursor validation.
+        page_size (int): Rows per page.
+        cursor (str): The continuation cursor from the previous page.
+
+    Returns:
+        dict: {"results": rows of the page, "total": total row count,
+               "next_cursor": cursor for the next page or None}.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for another lookup.
+    """
+    offset = decode_cursor(cursor, scope)
+    page: List[Any] = list(rows[offset:offset + page_size])
+    next_offset = offset + page_size
+    return {
+        "results": page,
+        "total": len(rows),
+        "next_cursor": encode_cursor(scope, next_offset) if next_offset < len(rows) else None,
+    }
@@ -0,0 +1,239 @@
+"""
+Deterministic offline chat model for load testing and benchmarks.
+
+ScriptedChatModel stands in for the provider when LLM_PROVIDER=scripted, so the graph, tools,
+checkpointer and API can be measured without network access or API keys. It answers from
+simple rules over the conversation:
+
+- supervisor routing prompts get "1" (music) or "2" (invoices) from keywords;
+- with music tools bound it looks up the artist, genre or song named in the question;
+- with invoice tools bound it looks up the customer's invoices when a customer ID is given;
+- after tool results it summarizes them and ends the turn.
+
+Streaming calls (e.g. astream_events) receive the answer word by word, as from a provider.
+
+SCRIPTED_LLM_LATENCY adds a simulated provider latency per call (seconds, default 0) and
+SCRIPTED_LLM_TOKENS sets the simulated completion length (default 32 tokens).
+"""
+import os
+import re
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+GENRES = (
+    "rock", "jazz", "metal", "blues", "pop", "latin", "reggae", "classical", "soundtrack",
+    "alternative", "punk", "grunge", "electronica", "hip hop", "r&b", "soul", "country", "bossa nova",
+)
+INVOICE_KEYWORDS = ("invoice", "purchase", "bill", "payment", "order", "transaction", "paid", "spent", "bought")
+
+ARTIST_PATTERN = re.compile(r"\b(?:by|from|of)\s+(?:the\s+band\s+|the\s+artist\s+)?([A-Z0-9][\w/&'.-]*(?:\s+[A-Z0-9][\w/&'.-]*)*)")
+QUOTED_PATTERN = re.compile(r"[\"“']([^\"”']{2,})[\"”']")
+CUSTOMER_ID_PATTERN = re.compile(r"customer\s*(?:id)?\s*(?:is|:|#|=)?\s*(\d+)", re.IGNORECASE)
+ROUTING_PATTERN = re.compile(r"User message:\s*(.*?)\n\s*\nWhich agent", re.DOTALL)
+
+
+def text_of(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def count_tokens(text: str) -> int:
+    """Approximates the token count of text as one token per word or punctuation mark."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    A chat model that answers from deterministic rules and supports bind_tools.
+    """
+
+    latency: float = 0.0
+    tokens: int = 32
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency": self.latency, "tokens": self.tokens}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """
+        Binds tools in the OpenAI function format, as the provider chat models do.
+        """
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools") or [])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools") or [])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for chunk in self._chunks(self._respond(messages, kwargs.get("tools") or [])):
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._respond(messages, kwargs.get("tools") or [])):
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _chunks(self, result: ChatResult) -> List[ChatGenerationChunk]:
+        """Splits a response into one chunk per word, with the tool calls and usage on the last chunk."""
+        message = result.generations[0].message
+        words = re.findall(r"\S+\s*", message.content) or [""]
+        tool_call_chunks = [
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index, "type": "tool_call_chunk"}
+            for index, call in enumerate(message.tool_calls)
+        ]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=word)) for word in words[:-1]]
+        chunks.append(ChatGenerationChunk(message=AIMessageChunk(
+            content=words[-1],
+            tool_call_chunks=tool_call_chunks,
+            usage_metadata=message.usage_metadata
+        )))
+        return chunks
+
+    def _respond(self, messages: List[BaseMessage], tools: List[dict]) -> ChatResult:
+        tool_names = {tool["function"]["name"] for tool in tools}
+        last = messages[-1] if messages else HumanMessage(content="")
+
+        if isinstance(last, ToolMessage):
+            message = AIMessage(content=self._summarize(messages))
+        elif "Respond with just the number" in text_of(last):
+            message = AIMessage(content=self._route(messages))
+        else:
+            tool_calls = self._tool_calls(messages, tool_names)
+            if tool_calls:
+                message = AIMessage(content="", tool_calls=tool_calls)
+            else:
+                message = AIMessage(content=self._truncate("I can help with music in our catalog and with your invoices. "
+                                                           "Which artist, album or genre are you interested in?"))
+
+        input_tokens = sum(count_tokens(text_of(m)) for m in messages)
+        output_tokens = count_tokens(text_of(message)) if message.content else 8 * len(message.tool_calls)
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _truncate(self, text: str) -> str:
+        """Caps the response at the simulated completion length."""
+        words = text.split()
+        return " ".join(words[:self.tokens])
+
+    def _route(self, messages: List[BaseMessage]) -> str:
+        """Answers a supervisor routing prompt: "2" for invoice questions, "1" otherwise."""
+        system = " ".join(text_of(m) for m in messages if isinstance(m, SystemMessage))
+        match = ROUTING_PATTERN.search(system)
+        question = (match.group(1) if match else system).lower()
+        return "2" if any(keyword in question for keyword in INVOICE_KEYWORDS) else "1"
+
+    def _summarize(self, messages: List[BaseMessage]) -> str:
+        """Summarizes the tool results since the last model turn."""
+        results = []
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            results.append(text_of(message))
+        summary = " ".join(reversed(results))
+        return self._truncate(f"Here is what I found: {summary}")
+
+    def _tool_calls(self, messages: List[BaseMessage], tool_names: set) -> List[dict]:
+        """Chooses tool calls for the latest user question from the bound tools."""
+        question = next((text_of(m) for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        lowered = question.lower()
+        calls = []
+
+        if tool_names & {"get_invoice_summary", "get_invoices_by_customer_sorted_by_date"}:
+            conversation = " ".join(text_of(m) for m in messages if isinstance(m, (HumanMessage, SystemMessage)))
+            customer = CUSTOMER_ID_PATTERN.search(conversation)
+            if customer:
+                customer_id = customer.group(1)
+                if any(word in lowered for word in ("employee", "support", "representative", "rep ")):
+                    invoice = re.search(r"invoice\s*(?:id|#)?\s*(\d+)", lowered)
+                    if invoice and "get_employee_by_invoice_and_customer" in tool_names:
+                        calls.append(("get_employee_by_invoice_and_customer",
+                                      {"invoice_id": invoice.group(1), "customer_id": customer_id}))
+                elif any(word in lowered for word in ("expensive", "price", "priciest")) \
+                        and "get_invoices_sorted_by_unit_price" in tool_names:
+                    calls.append(("get_invoices_sorted_by_unit_price", {"customer_id": customer_id}))
+                elif "get_invoice_summary" in tool_names:
+                    calls.append(("get_invoice_summary", {"customer_id": customer_id}))
+
+        if tool_names & {"get_albums_by_artist", "get_tracks_by_artist"}:
+            artist = ARTIST_PATTERN.search(question)
+            quoted = QUOTED_PATTERN.search(question)
+            genre = next((genre for genre in GENRES if re.search(rf"\b{re.escape(genre)}\b", lowered)), None)
+            if quoted and "check_for_songs" in tool_names:
+                calls.append(("check_for_songs", {"song_title": quoted.group(1)}))
+            elif artist:
+                name = artist.group(1).strip(" ?.!,")
+                if re.search(r"\b(songs?|tracks?)\b", lowered) and "get_tracks_by_artist" in tool_names:
+                    calls.append(("get_tracks_by_artist", {"artist": name}))
+                elif "get_albums_by_artist" in tool_names:
+                    calls.append(("get_albums_by_artist", {"artist": name}))
+            elif genre and "get_songs_by_genre" in tool_names:
+                calls.append(("get_songs_by_genre", {"genre": genre}))
+
+        turn = len(messages)
+        return [
+            {"name": name, "args": args, "id": f"call_{turn}_{index}", "type": "tool_call"}
+            for index, (name, args) in enumerate(calls)
+        ]
+
+
+def get_scripted_llm() -> ScriptedChatModel:
+    """
+    Returns a scripted chat model configured from SCRIPTED_LLM_LATENCY and SCRIPTED_LLM_TOKENS.
+
+    Returns:
+        ScriptedChatModel: The offline model.
+    """
+    return ScriptedChatModel(
+        latency=float(os.getenv("SCRIPTED_LLM_LATENCY", 0)),
+        tokens=int(os.getenv("SCRIPTED_LLM_TOKENS", 32))
+    )
@@ -4,6 +4,7 @@ State utility functions for initializing and managing agent state.
 from langchain_core.messages import HumanMessage
 from agents.supervisor.nodes.initialize_state import extract_customer_id_from_messages
 from da.memory_utils import load_user_preferences
+from utils.executor import run_blocking
 import logging
 
 
@@ -40,3 +41,11 @@ def create_initial_state(message: str, customer_id: str = "", config=None) -> di
     
     return state
 
+
+async def acreate_initial_state(message: str, customer_id: str = "", config=None) -> dict:
+    """
+    Async variant of create_initial_state.
+
+    Customer lookup and preference loading may query the database, so they run on the blocking executor.
+    """
+    return await run_blocking(create_initial_state, message, customer_id, config)
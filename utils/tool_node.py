@@ -0,0 +1,100 @@
+"""
+Tool execution node with concurrent dispatch and per-tool timeouts.
+
+When the LLM emits several tool calls in one turn (e.g. albums and tracks for two artists), the
+calls are independent, so the tool phase should take as long as the slowest call rather than the
+sum of all of them. create_tool_node() returns a LangGraph ToolNode that:
+
+- runs the calls of one turn concurrently and returns their results in call order;
+- executes every call on the shared blocking executor (BLOCKING_EXECUTOR_WORKERS), so the number
+  of tool calls in flight across all conversations is bounded;
+- answers a call that exceeds its timeout with an error ToolMessage instead of stalling the turn.
+
+TOOL_TIMEOUT sets the default timeout in seconds (default 30, 0 disables it) and TOOL_TIMEOUTS
+overrides it per tool, e.g. "get_songs_by_genre=5,check_for_songs=10". Catalog reads only run in
+parallel with CHINOOK_DB_MODE=read, where each concurrent query checks out its own read-only connection.
+"""
+import os
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Sequence
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolCallRequest
+from utils.executor import get_blocking_executor
+
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+
+def get_tool_timeouts() -> Dict[str, float]:
+    """
+    Returns the per-tool timeouts configured in TOOL_TIMEOUTS ("name=seconds,...").
+    """
+    timeouts = {}
+    for entry in os.getenv("TOOL_TIMEOUTS", "").split(","):
+        name, _, seconds = entry.partition("=")
+        if name.strip() and seconds.strip():
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+def timeout_message(request: ToolCallRequest, timeout: float) -> ToolMessage:
+    """Returns the error result for a tool call that ran out of time."""
+    name = request.tool_call["name"]
+    logging.warning(f"Tool call {name} timed out after {timeout:g}s")
+    return ToolMessage(
+        content=f"Error: {name} did not finish within {timeout:g} seconds. Try a narrower request or another tool.",
+        name=name,
+        tool_call_id=request.tool_call["id"],
+        status="error"
+    )
+
+
+def create_tool_node(
+    tools: Sequence[Any],
+    name: str = "tools",
+    default_timeout: Optional[float] = None,
+    timeouts: Optional[Dict[str, float]] = None
+) -> ToolNode:
+    """
+    Creates a ToolNode that runs a turn's tool calls concurrently on the blocking executor, with timeouts.
+
+    Args:
+        tools (Sequence): The tools to serve.
+        name (str): The node name.
+        default_timeout (float): Seconds a call may take. Defaults to TOOL_TIMEOUT; 0 disables it.
+        timeouts (Dict[str, float]): Per-tool timeouts. Defaults to TOOL_TIMEOUTS.
+
+    Returns:
+        ToolNode: The tool node, usable in a StateGraph or as create_react_agent's tools.
+    """
+    if default_timeout is None:
+        default_timeout = float(os.getenv("TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT))
+    timeouts = get_tool_timeouts() if timeouts is None else timeouts
+
+    def timeout_for(request: ToolCallRequest) -> Optional[float]:
+        return timeouts.get(request.tool_call["name"], default_timeout) or None
+
+    def wrap_tool_call(request: ToolCallRequest, execute: Callable[[ToolCallRequest], Any]) -> Any:
+        # ToolNode calls this from one thread per tool call; run the tool itself on the bounded
+        # executor so the wait can time out and concurrency stays capped across conversations
+        timeout = timeout_for(request)
+        future = get_blocking_executor().submit(contextvars.copy_context().run, execute, request)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # The call cannot be interrupted; it finishes in the background and its result is dropped
+            future.cancel()
+            return timeout_message(request, timeout)
+
+    async def awrap_tool_call(request: ToolCallRequest, execute: Callable[[ToolCallRequest], Any]) -> Any:
+        # ToolNode gathers the calls as tasks; offloaded tools await the same bounded executor
+        timeout = timeout_for(request)
+        try:
+            return await asyncio.wait_for(execute(request), timeout=timeout)
+        except asyncio.TimeoutError:
+            return timeout_message(request, timeout)
+
+    return ToolNode(tools, name=name, wrap_tool_call=wrap_tool_call, awrap_tool_call=awrap_tool_call)
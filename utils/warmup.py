@@ -0,0 +1,158 @@
+"""
+Eager warm-up of the agent at server startup.
+
+Without it the first request after a deploy builds the Chinook snapshot, trains the routing
+classifier, creates the LLM clients and compiles every graph before it can be answered.
+awarm_up() does that work up front, in phases, and records how long each phase took:
+
+- database: the Chinook snapshot, engine and SQLDatabase;
+- indexes: the customer identifier index, the routing classifier and the music catalog backend;
+- llm: the LLM client, with its provider connections opened;
+- graphs: the supervisor and sub-agent graphs;
+- turn (optional, WARMUP_TURN=true): one synthetic turn through the whole graph, on a throwaway thread.
+
+The server's /ready endpoint reports the WarmupStatus and only succeeds once warm-up is done.
+A failure in the llm or turn phase is logged and does not prevent readiness, since requests
+create the client and connect lazily as before.
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+import utils.llm as llm_utils
+from agents.supervisor.intent_classifier import get_intent_classifier
+from da.catalog_engine import get_catalog_backend
+from da.customer_index import get_customer_index
+from da.db import get_chinook_db
+from utils.executor import run_blocking
+from utils.state_utils import acreate_initial_state
+
+DEFAULT_WARMUP_QUESTION = "What songs do you have by Queen?"
+
+# Phases whose failure leaves the server not ready
+REQUIRED_PHASES = ("database", "indexes", "graphs")
+
+
+class WarmupStatus:
+    """
+    Thread-safe record of warm-up progress, as reported by /ready.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self._phases: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._ready
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            self._ready = True
+
+    def record(self, phase: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._phases[phase] = seconds
+            if error is not None:
+                self._errors[phase] = error
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the readiness, per-phase durations in milliseconds and errors.
+        """
+        with self._lock:
+            return {
+                "ready": self._ready,
+                "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self._phases.items()},
+                "errors": dict(self._errors),
+            }
+
+
+def warmup_enabled() -> bool:
+    """Returns whether the server warms up at startup (WARMUP_ON_STARTUP, default true)."""
+    return os.getenv("WARMUP_ON_STARTUP", "true").strip().lower() not in ("false", "0", "no", "off")
+
+
+def warmup_turn_enabled() -> bool:
+    """Returns whether warm-up runs a synthetic turn (WARMUP_TURN, default false)."""
+    return os.getenv("WARMUP_TURN", "false").strip().lower() in ("true", "1", "yes", "on")
+
+
+def load_indexes() -> None:
+    get_customer_index().refresh()
+    get_intent_classifier()
+    get_catalog_backend()
+
+
+async def aconnect_llm() -> None:
+    llm_utils.get_llm()
+    connected = await llm_utils.apreconnect_llm_clients()
+    logging.info(f"Connected {connected} LLM provider client(s)")
+
+
+async def arun_warmup_turn(agent: Any, question: Optional[str] = None) -> None:
+    """
+    Runs one turn on a throwaway thread and deletes the thread afterwards.
+    """
+    thread_id = f"warmup-{uuid.uuid4().hex}"
+    config = {"configurable": {"thread_id": thread_id}}
+    question = question or os.getenv("WARMUP_QUESTION", DEFAULT_WARMUP_QUESTION)
+    try:
+        state = await acreate_initial_state(question, config=config)
+        await agent.ainvoke(state, config)
+    finally:
+        checkpointer = getattr(agent, "checkpointer", None)
+        if hasattr(checkpointer, "delete_thread"):
+            checkpointer.delete_thread(thread_id)
+
+
+async def _phase(status: WarmupStatus, name: str, run: Callable[[], Any]) -> bool:
+    start = time.perf_counter()
+    try:
+        await run()
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        status.record(name, elapsed, str(e))
+        logging.error(f"Warm-up phase {name} failed after {elapsed * 1000:.0f} ms: {e}", exc_info=True)
+        return False
+    elapsed = time.perf_counter() - start
+    status.record(name, elapsed)
+    logging.info(f"Warm-up phase {name} took {elapsed * 1000:.0f} ms")
+    return True
+
+
+async def awarm_up(get_agent: Callable[[], Any], status: WarmupStatus, run_turn: Optional[bool] = None) -> WarmupStatus:
+    """
+    Warms up the agent phase by phase and marks the status ready when the required phases succeed.
+
+    Blocking phases run on the shared blocking executor, so the server keeps answering /health.
+
+    Args:
+        get_agent (Callable): Returns the compiled supervisor graph, compiling it on first call.
+        status (WarmupStatus): Receives the phase timings and readiness.
+        run_turn (bool): Whether to run a synthetic turn. Defaults to WARMUP_TURN.
+
+    Returns:
+        WarmupStatus: The status passed in.
+    """
+    start = time.perf_counter()
+    succeeded = {
+        "database": await _phase(status, "database", lambda: run_blocking(get_chinook_db)),
+        "indexes": await _phase(status, "indexes", lambda: run_blocking(load_indexes)),
+        "llm": await _phase(status, "llm", aconnect_llm),
+        "graphs": await _phase(status, "graphs", lambda: run_blocking(get_agent)),
+    }
+    if (warmup_turn_enabled() if run_turn is None else run_turn) and succeeded["graphs"]:
+        await _phase(status, "turn", lambda: arun_warmup_turn(get_agent()))
+
+    if all(succeeded[phase] for phase in REQUIRED_PHASES):
+        status.mark_ready()
+        logging.info(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms, ready to serve")
+    else:
+        logging.error("Warm-up failed, the server is not ready")
+    return status